@@ -0,0 +1,259 @@
+# aggregates.py
+#
+# Dakika seviyesindeki titreşim verisinden yükleme anında bir kez kurulan
+# özet tablolar. QA fonksiyonları ham satırlar yerine bu tablolardan okur.
+
+import numpy as np
+import pandas as pd
+
+from data_store import SITUATION_LEVELS, day_ordinals, month_ordinals
+
+LEVEL_COLS = tuple(l.lower() for l in SITUATION_LEVELS)  # green, yellow, orange, red
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Günlük özet tablosu
+def day_keys(df: pd.DataFrame) -> pd.Series:
+    return df['day'] if 'day' in df else pd.Series(day_ordinals(df['Timestamp']), index=df.index)
+
+def build_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gün (int32 gün sayısı) başına tek satır:
+      rows, green/yellow/orange/red sayıları,
+      vmin, vmax, vmean, vstd (Value), dominant (en sık seviye kodu).
+    """
+    key = day_keys(df)
+    v = df['Value'].groupby(key)
+    daily = pd.DataFrame({
+        "rows":  v.size(),
+        "vmin":  v.min(),
+        "vmax":  v.max(),
+        "vmean": v.mean(),
+        "vstd":  v.std(),
+    })
+    counts = (pd.crosstab(key, df['level'])
+              .reindex(columns=range(len(SITUATION_LEVELS)), fill_value=0)
+              .reindex(daily.index, fill_value=0))
+    counts.columns = list(LEVEL_COLS)
+    daily = daily.join(counts)
+    # eşitlikte küçük kod (GREEN < … < RED) kazanır
+    daily["dominant"] = counts.to_numpy().argmax(axis=1).astype("int8")
+    daily.index.name = "day"
+    return daily.sort_index()
+
+def extend_daily(daily: pd.DataFrame, df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Yeni eklenen satırların dokunduğu günleri `df` (tam veri) üzerinden
+    yeniden hesaplar; diğer günler olduğu gibi kalır.
+    """
+    if new_rows.empty:
+        return daily
+    touched = pd.unique(day_keys(new_rows))
+    fresh = build_daily(df[day_keys(df).isin(touched)])
+    return pd.concat([daily.drop(index=fresh.index, errors="ignore"), fresh]).sort_index()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Alarm segment indeksi (run-length)
+# Segment: aynı seviyede, aralarında 1 dakikadan uzun boşluk olmayan ardışık
+# satırlar. prev_level / next_level segmentten hemen önceki / sonraki satırın
+# seviyesidir (boşluk olsa da), yoksa -1.
+MAX_GAP = np.timedelta64(1, "m")
+
+def _sorted_arrays(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    ts = df['Timestamp'].to_numpy(dtype="datetime64[ns]")
+    lv = df['level'].to_numpy()
+    if not df['Timestamp'].is_monotonic_increasing:
+        order = np.argsort(ts, kind="stable")
+        ts, lv = ts[order], lv[order]
+    return ts, lv
+
+def _segments_from(ts: np.ndarray, lv: np.ndarray, offset: int = 0, prev: int = -1) -> pd.DataFrame:
+    n = len(ts)
+    if n == 0:
+        return pd.DataFrame(columns=["level", "day", "start", "end", "duration", "rows",
+                                     "prev_level", "next_level", "row_start", "row_end"])
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (lv[1:] != lv[:-1]) | ((ts[1:] - ts[:-1]) > MAX_GAP)
+    first = np.flatnonzero(boundary)
+    last  = np.append(first[1:] - 1, n - 1)
+    level = lv[first]
+    prev_level = np.where(first > 0, lv[np.maximum(first - 1, 0)], prev).astype("int8")
+    next_level = np.where(last < n - 1, lv[np.minimum(last + 1, n - 1)], -1).astype("int8")
+    return pd.DataFrame({
+        "level":      level,
+        "day":        day_ordinals(ts[first]),
+        "start":      ts[first],
+        "end":        ts[last],
+        "duration":   ts[last] - ts[first],
+        "rows":       last - first + 1,
+        "prev_level": prev_level,
+        "next_level": next_level,
+        "row_start":  first + offset,
+        "row_end":    last + offset,
+    })
+
+def build_segments(df: pd.DataFrame) -> pd.DataFrame:
+    """Tüm veri için segment tablosu (zaman sırasına göre)."""
+    return _segments_from(*_sorted_arrays(df))
+
+def extend_segments(segments: pd.DataFrame, df: pd.DataFrame, n_old: int) -> pd.DataFrame:
+    """
+    df'in ilk n_old satırı için kurulmuş segmentleri yeni satırlarla genişletir.
+    Yeni satırlar zaman olarak sona ekleniyorsa sadece son segmentten itibaren
+    yeniden hesaplanır; aksi halde tablo baştan kurulur.
+    """
+    ts = df['Timestamp']
+    if (segments.empty or not ts.iloc[:n_old].is_monotonic_increasing
+            or not ts.iloc[n_old - 1:].is_monotonic_increasing):
+        return build_segments(df)
+    restart = int(segments['row_start'].iloc[-1])
+    kept    = segments.iloc[:-1]
+    lv      = df['level'].to_numpy()
+    prev    = int(lv[restart - 1]) if restart > 0 else -1
+    tail    = _segments_from(ts.to_numpy(dtype="datetime64[ns]")[restart:], lv[restart:],
+                             offset=restart, prev=prev)
+    return pd.concat([kept, tail], ignore_index=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Aralık istatistikleri (prefix toplamları + blok sparse table)
+# Sıralı Value dizisinin herhangi bir [i, j) satır aralığı için sayı, ortalama,
+# std, min, max ve renk sayıları sabit sayıda dizi okumasıyla bulunur.
+# min/max için tam sparse table n·log n bellek ister (500k satırda ~150 MB);
+# bunun yerine BLOCK satırlık blokların min/max'ı üzerinde sparse table
+# kurulur, aralığın kenarlarındaki en fazla 2·BLOCK satır doğrudan taranır.
+class RangeStats:
+    BLOCK = 64
+
+    def __init__(self, values: np.ndarray, levels: np.ndarray):
+        self._build(np.asarray(values, dtype="float64"), np.asarray(levels))
+
+    def _build(self, values: np.ndarray, levels: np.ndarray) -> None:
+        self.values = values
+        self.levels = levels
+        valid = ~np.isnan(values)
+        v = np.where(valid, values, 0.0)
+        self._cnt = np.concatenate([[0], np.cumsum(valid, dtype="int64")])
+        self._sum = np.concatenate([[0.0], np.cumsum(v)])
+        self._sq  = np.concatenate([[0.0], np.cumsum(v * v)])
+        onehot = levels[None, :] == np.arange(len(SITUATION_LEVELS), dtype=levels.dtype)[:, None]
+        self._lv  = np.concatenate([np.zeros((len(SITUATION_LEVELS), 1), dtype="int64"),
+                                    np.cumsum(onehot, axis=1, dtype="int64")], axis=1)
+        self._lo = np.where(valid, values, np.inf)
+        self._hi = np.where(valid, values, -np.inf)
+        self._build_sparse()
+
+    def _build_sparse(self) -> None:
+        n_blocks = -(-len(self.values) // self.BLOCK)
+        pad = n_blocks * self.BLOCK - len(self.values)
+        lo = np.pad(self._lo, (0, pad), constant_values=np.inf).reshape(n_blocks, self.BLOCK).min(axis=1)
+        hi = np.pad(self._hi, (0, pad), constant_values=-np.inf).reshape(n_blocks, self.BLOCK).max(axis=1)
+        self._sp_lo, self._sp_hi = [lo], [hi]
+        k = 1
+        while (1 << k) <= n_blocks:
+            h = 1 << (k - 1)
+            self._sp_lo.append(np.minimum(self._sp_lo[-1][:-h], self._sp_lo[-1][h:]))
+            self._sp_hi.append(np.maximum(self._sp_hi[-1][:-h], self._sp_hi[-1][h:]))
+            k += 1
+
+    def extend(self, values: np.ndarray, levels: np.ndarray) -> None:
+        """Sona eklenen satırlar için tabloları yeniden kurar."""
+        self._build(np.concatenate([self.values, np.asarray(values, dtype="float64")]),
+                    np.concatenate([self.levels, np.asarray(levels)]))
+
+    def _minmax(self, i: int, j: int) -> tuple[float, float]:
+        B = self.BLOCK
+        bi, bj = -(-i // B), j // B          # tamamı aralıkta kalan bloklar [bi, bj)
+        if bi >= bj:
+            return self._lo[i:j].min(), self._hi[i:j].max()
+        k = (bj - bi).bit_length() - 1
+        lo = min(self._sp_lo[k][bi], self._sp_lo[k][bj - (1 << k)])
+        hi = max(self._sp_hi[k][bi], self._sp_hi[k][bj - (1 << k)])
+        if i < bi * B:
+            lo, hi = min(lo, self._lo[i:bi * B].min()), max(hi, self._hi[i:bi * B].max())
+        if bj * B < j:
+            lo, hi = min(lo, self._lo[bj * B:j].min()), max(hi, self._hi[bj * B:j].max())
+        return lo, hi
+
+    def query(self, i: int, j: int) -> dict:
+        """[i, j) satır aralığının istatistikleri (boş aralıkta değerler NaN)."""
+        i, j = int(i), int(j)                # numpy tamsayıları .bit_length() bilmez
+        n = int(self._cnt[j] - self._cnt[i]) if j > i else 0
+        counts = (self._lv[:, j] - self._lv[:, i]).tolist() if j > i else [0] * len(SITUATION_LEVELS)
+        out = dict(zip(LEVEL_COLS, counts), rows=max(j - i, 0), count=n,
+                   min=np.nan, max=np.nan, mean=np.nan, std=np.nan)
+        if n:
+            s, sq = self._sum[j] - self._sum[i], self._sq[j] - self._sq[i]
+            out["mean"] = s / n
+            if n > 1:
+                out["std"] = float(np.sqrt(max(sq - s * s / n, 0.0) / (n - 1)))
+            out["min"], out["max"] = map(float, self._minmax(i, j))
+        return out
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4️⃣ Ay × seviye küpü
+# Hücre başına rows, days (farklı gün), count (NaN olmayan Value), sum, sq
+# (Value²), vmin, vmax. Yıl ve çok seviyeli özetler hücrelerin toplanmasıyla
+# bulunur; seviyeler arası farklı gün sayısı toplanamadığı için ay toplamları
+# ayrıca tutulur.
+class PeriodCube:
+    def __init__(self, df: pd.DataFrame):
+        self.cells, self.totals = self._tables(df)
+
+    @staticmethod
+    def _tables(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        ts = df['Timestamp'].to_numpy(dtype="datetime64[ns]")
+        ok = ~np.isnat(ts)
+        v  = df['Value'].to_numpy(dtype="float64")[ok]
+        sub = pd.DataFrame({"month": month_ordinals(ts[ok]), "level": df['level'].to_numpy()[ok],
+                            "day": df['day'].to_numpy()[ok], "v": v, "sq": v * v})
+        def agg(keys):
+            g = sub.groupby(keys, sort=True)
+            return pd.DataFrame({"rows": g.size(), "days": g["day"].nunique(), "count": g["v"].count(),
+                                 "sum": g["v"].sum(), "sq": g["sq"].sum(),
+                                 "vmin": g["v"].min(), "vmax": g["v"].max()})
+        return agg(["month", "level"]), agg("month")
+
+    def extend(self, df: pd.DataFrame, new_rows: pd.DataFrame) -> None:
+        """
+        Yeni satırların dokunduğu ayları yeniden hesaplar. df zamana göre
+        sıralı olmalı: dokunulan ilk ayın başından sonrası taranır.
+        """
+        ts = new_rows['Timestamp'].dropna()
+        if ts.empty:
+            return
+        first = np.datetime64(ts.min().to_datetime64(), "M")
+        tail  = df.iloc[int(np.searchsorted(df['Timestamp'].to_numpy(dtype="datetime64[ns]"), first)):]
+        cells, totals = self._tables(tail)
+        months = totals.index
+        self.cells  = pd.concat([self.cells[~self.cells.index.get_level_values("month").isin(months)],
+                                 cells]).sort_index()
+        self.totals = pd.concat([self.totals.drop(index=months, errors="ignore"), totals]).sort_index()
+
+    def table(self, period: str = "month", level=None) -> pd.DataFrame:
+        """
+        period="month" → ay sayısı, "year" → yıl indeksli özet.
+        level: tek kod veya kod listesi; None ise tüm satırlar.
+        Sütunlar: rows, days, count, sum, sq, vmin, vmax, mean, std (ddof=1).
+        """
+        if level is None:
+            t = self.totals
+        else:
+            levels = np.atleast_1d(level)
+            c = self.cells[self.cells.index.get_level_values("level").isin(levels)]
+            g = c.groupby(level="month")
+            t = g[["rows", "days", "count", "sum", "sq"]].sum()
+            if len(levels) > 1:
+                t = t.drop(columns="days")   # seviyeler arası gün sayısı toplanamaz
+            t["vmin"], t["vmax"] = g["vmin"].min(), g["vmax"].max()
+        if period == "year":
+            g = t.groupby(1970 + t.index // 12)
+            mm = g[["vmin", "vmax"]].agg({"vmin": "min", "vmax": "max"})
+            t = g[[c for c in t.columns if c not in ("vmin", "vmax")]].sum().join(mm)
+            t.index.name = "year"
+        t = t.copy()
+        n = t["count"].to_numpy(dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t["mean"] = np.where(n > 0, t["sum"] / n, np.nan)
+            var = np.maximum(t["sq"] - t["sum"] ** 2 / n, 0.0) / (n - 1)
+            t["std"] = np.where(n > 1, np.sqrt(var), np.nan)
+        return t
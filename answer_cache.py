@@ -0,0 +1,106 @@
+# answer_cache.py
+#
+# Sadece df'e bağlı (tek parametreli) QA fonksiyonlarının cevaplarını her
+# dataset sürümü için bir kez hesaplayıp saklar. Eşleşen soru böylece
+# embedding aramasından sonra saf bir sözlük okumasıyla cevaplanır.
+# Veri sürümü değişince (append / refresh) yeniden hesaplama arka planda
+# yapılır; o sırada gelen soru eski cevabı değil, anlık hesaplananı alır.
+# Hata veren fonksiyon turu bitirmez: (fn, sürüm) hatalı olarak işaretlenir ve
+# o sürüm için bir daha denenmez.
+
+import inspect
+import threading
+import weakref
+
+import pandas as pd
+
+from dataset import VibrationDataset, dataset_for
+
+class AnswerCache:
+    def __init__(self, fns):
+        # aynı fonksiyon qa_map'te birden fazla soruya bağlı olabilir
+        self.fns = [fn for fn in dict.fromkeys(fns) if len(inspect.signature(fn).parameters) == 1]
+        # ds → {(fn, version): cevap}; dataset kayıttan düşünce cevapları da gider
+        self._answers = weakref.WeakKeyDictionary()
+        self._failed  = weakref.WeakKeyDictionary()   # ds → {(fn, version)}
+        self._running = weakref.WeakKeyDictionary()   # ds → hesaplanan sürüm
+        self._lock    = threading.Lock()
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Hesaplama
+    def materialize(self, ds: VibrationDataset, background: bool = True) -> threading.Thread | None:
+        """ds'in güncel sürümü için tüm statik cevapları hesaplar."""
+        version = ds.version
+        with self._lock:
+            if self._running.get(ds) == version:
+                return None
+            self._running[ds] = version
+        if not background:
+            self._run(ds, version)
+            return None
+        t = threading.Thread(target=self._run, args=(ds, version), daemon=True,
+                             name=f"answer-cache-v{version}")
+        t.start()
+        return t
+
+    def _run(self, ds: VibrationDataset, version: int) -> None:
+        df = ds.df
+        answers, failed = self._table(ds), self._failures(ds)
+        try:
+            for fn in self.fns:
+                if ds.version != version:        # veri değişti, yeni tur başlayacak
+                    return
+                if (fn, version) in answers or (fn, version) in failed:
+                    continue
+                try:
+                    answer = fn(df)
+                except Exception as e:
+                    print(f"⚠️ {fn.__name__} cevabı hesaplanamadı (sürüm {version}): {e!r}")
+                    with self._lock:
+                        failed.add((fn, version))
+                    continue
+                if ds.version == version:
+                    with self._lock:
+                        answers[(fn, version)] = answer
+            # eski sürümlerin cevapları ve hata kayıtları
+            with self._lock:
+                for key in [k for k in answers if k[1] < version]:
+                    del answers[key]
+                failed.difference_update([k for k in failed if k[1] < version])
+        finally:
+            with self._lock:
+                if self._running.get(ds) == version:
+                    del self._running[ds]
+
+    def _table(self, ds: VibrationDataset) -> dict:
+        with self._lock:
+            return self._answers.setdefault(ds, {})
+
+    def _failures(self, ds: VibrationDataset) -> set:
+        with self._lock:
+            return self._failed.setdefault(ds, set())
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Okuma
+    def get(self, fn, df: pd.DataFrame) -> str:
+        """
+        fn(df) cevabı. Güncel sürüm için hazırsa sözlükten döner; değilse
+        anlık hesaplar ve güncel sürümün arka planda hesaplanmasını başlatır.
+        fn hata verirse hata çağırana iletilir; (fn, sürüm) arka planda tekrar
+        denenmez.
+        """
+        ds      = dataset_for(df)
+        version = ds.version
+        answers = self._table(ds)
+        answer  = answers.get((fn, version))
+        if answer is None:
+            try:
+                answer = fn(ds.df)
+            except Exception:
+                with self._lock:
+                    self._failed.setdefault(ds, set()).add((fn, version))
+                raise
+            with self._lock:              # arka plan thread'i de aynı sözlüğe yazar
+                answers[(fn, version)] = answer
+            self.materialize(ds)
+        return answer
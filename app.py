@@ -1,11 +1,12 @@
 import gradio as gr
-from inference import generate_answer
+from inference import stream_answer
 
-def run_interface(user_question: str) -> str:
+def run_interface(user_question: str):
     """
-    Gradio’dan gelen metni alır, generate_answer() ile işleyip döner.
+    Gradio’dan gelen metni alır, stream_answer() ile işler; LLM fallback
+    cevabı tokenlar geldikçe kutuya yazılır.
     """
-    return generate_answer(user_question)
+    yield from stream_answer(user_question)
 
 demo = gr.Interface(
     fn=run_interface,
@@ -2,6 +2,8 @@ import gradio as gr
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.ensemble import IsolationForest
+from data_store import load_vibration_df
+from dataset import VibrationDataset
 from datetime import datetime
 import json
 import os
@@ -23,18 +25,26 @@ def load_chat_histories():
 def generate_answer(message):
     return f"🧠 (Mock Cevap): '{message}' sorusu alındı."
 
+def stream_answer(message):
+    # inference.stream_answer ile aynı sözleşme: birikmiş metni yield eder
+    yield generate_answer(message)
+
 def submit_message(message, history_id):
+    # Generator: cevap parçaları geldikçe sohbet ekranı güncellenir,
+    # geçmiş diske cevap tamamlanınca bir kez yazılır.
     if not history_id:
         history_id = f"Sohbet 1"
     if history_id not in chat_histories:
         chat_histories[history_id] = []
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    answer = generate_answer(message)
+    sohbetler = list(chat_histories.keys())
     chat_histories[history_id].append({"role": "user", "content": f"{timestamp}\n🧑 {message}"})
-    chat_histories[history_id].append({"role": "assistant", "content": f"{timestamp}\n🤖 {answer}"})
+    reply = {"role": "assistant", "content": f"{timestamp}\n🤖 "}
+    chat_histories[history_id].append(reply)
+    for partial in stream_answer(message):
+        reply["content"] = f"{timestamp}\n🤖 {partial}"
+        yield chat_histories[history_id], "", sohbetler, history_id
     save_chat_histories()
-    sohbetler = list(chat_histories.keys())
-    return chat_histories[history_id], "", sohbetler, history_id
 
 def new_chat():
     new_id = f"Sohbet {len(chat_histories)+1}"
@@ -76,16 +86,18 @@ def update_sidebar(sohbet_ids):
     ]
 
 # ------------------------------ Grafik Fonksiyonları ------------------------------
+_dataset = None
+
 def load_and_process_data():
-    df = pd.read_csv("vibration_df.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-        df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
-    df.dropna(subset=['Timestamp'], inplace=True)
-    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    df.dropna(subset=['Value'], inplace=True)
-    df.sort_values('Timestamp', inplace=True)
-    return df
+    # Veri bir kez yüklenir (yerel snapshot) ve zamana göre sıralı tutulur;
+    # her grafik isteği sadece searchsorted ile aralığı keser.
+    global _dataset
+    if _dataset is None:
+        df = load_vibration_df("vibration_df.csv")
+        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+        df = df.dropna(subset=['Timestamp', 'Value']).reset_index(drop=True)
+        _dataset = VibrationDataset(df)
+    return _dataset
 
 def get_color(v):
     if v < 2.8: return 'green'
@@ -109,9 +121,9 @@ def plot_graphs(start_date, end_date):
     if start < min_date or end > max_date:
         return f"❌ Tarih aralığı {min_date.date()} ile {max_date.date()} arasında olmalıdır.", None
 
-    df = load_and_process_data()
+    data = load_and_process_data()
     end += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-    filtered = df[(df['Timestamp'] >= start) & (df['Timestamp'] <= end)].copy()
+    filtered = data.slice(start, end).copy()
 
     if filtered.empty:
         return "⚠️ Seçilen tarih aralığında veri bulunamadı.", None
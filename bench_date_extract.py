@@ -0,0 +1,112 @@
+# bench_date_extract.py
+#
+# date_extract ile önceki regex + pd.to_datetime çıkarıcısının karşılaştırması.
+# Korpus: date_extract_corpus.csv (Chatbot_Sorular_Varyantlar*.csv soruları +
+# aralık / göreli ifade örnekleri; beklenen (ilk, son) gün, --today'e göre).
+#   doğruluk → extract_period sonucu beklenenle aynı mı
+#   gecikme  → soru başına extract_date ve extract_period (p50 / p95 / max µs)
+# Eski çıkarıcı göreli ifadeleri bilmez; yılı yazılmamış tarihler için ona
+# --today'in yılı verilir.
+#
+#   python bench_date_extract.py --repeat 20
+
+import argparse
+import re
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from date_extract import extract_date, extract_period
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Önceki çıkarıcı (rag_utils / inference.py), karşılaştırma için
+_TR_EN = {"ocak": "January", "şubat": "February", "mart": "March", "nisan": "April",
+          "mayıs": "May", "haziran": "June", "temmuz": "July", "ağustos": "August",
+          "eylül": "September", "ekim": "October", "kasım": "November", "aralık": "December"}
+_MONTHS_RE = "|".join(_TR_EN)
+
+def legacy_normalize(s: str) -> str | None:
+    s_clean = re.sub(r"[\,\.]", "", s.strip().lower())
+    for tr, en in _TR_EN.items():
+        if tr in s_clean:
+            s_clean = s_clean.replace(tr, en.lower())
+            break
+    dt = pd.to_datetime(s_clean, dayfirst=True, errors="coerce")
+    return dt.date().isoformat() if not pd.isna(dt) else None
+
+def legacy_extract_date(user_q: str) -> str | None:
+    m = re.search(r"(\d{4}-\d{2}-\d{2})|(\d{2}-\d{2}-\d{4})", user_q)
+    return legacy_normalize(m.group(0) if m else user_q)
+
+def legacy_extract_period(user_q: str, year: int | None = None) -> tuple[str, str] | None:
+    full = re.findall(r"\d{4}[-/.]\d{2}[-/.]\d{2}|\d{2}[-/.]\d{2}[-/.]\d{4}", user_q)
+    dates = [legacy_normalize(re.sub(r"[/.]", "-", d)) for d in full[:2]]
+    if len(full) < 2:
+        sfx = lambda y: f" {y or year or ''}"
+        m = re.search(rf"(\d{{1,2}})\s*[-–]\s*(\d{{1,2}})\s+({_MONTHS_RE})(?:\s+(\d{{4}}))?", user_q, flags=re.IGNORECASE)
+        if m:
+            dates = [legacy_normalize(f"{d} {m.group(3)}{sfx(m.group(4))}") for d in m.group(1, 2)]
+        else:
+            found = re.findall(rf"(\d{{1,2}})\s+({_MONTHS_RE})(?:\s+(\d{{4}}))?", user_q, flags=re.IGNORECASE)
+            dates = [legacy_normalize(f"{d} {mon}{sfx(y)}") for d, mon, y in found[:2]]
+    if len(dates) >= 2 and None not in dates:
+        return tuple(sorted(dates))
+    m = re.search(r"\d{4}[-/.]\d{2}[-/.]\d{2}|\d{2}[-/.]\d{2}[-/.]\d{4}", user_q)
+    d = re.search(rf"\d{{1,2}}\s+({_MONTHS_RE})(?:\s+\d{{4}})?", user_q, flags=re.IGNORECASE)
+    if m:
+        date = legacy_normalize(re.sub(r"[/.]", "-", m.group(0)))
+        return (date, date) if date else None
+    if d:
+        date = legacy_normalize(d.group(0) + ("" if re.search(r"\d{4}$", d.group(0)) else f" {year or ''}"))
+        return (date, date) if date else None
+    mon = re.search(rf"\b({_MONTHS_RE})(?:\w*'?\w*\s+(\d{{4}}))?", user_q, flags=re.IGNORECASE)
+    if mon and (mon.group(2) or year):
+        p = pd.Period(f"{mon.group(2) or year}-{list(_TR_EN).index(mon.group(1).lower()) + 1:02d}", "M")
+        return p.start_time.date().isoformat(), p.end_time.date().isoformat()
+    y = re.search(r"\b(\d{4})\s+yılı", user_q)
+    return (f"{y.group(1)}-01-01", f"{y.group(1)}-12-31") if y else None
+
+# ─────────────────────────────────────────────────────────────────────────────
+def timings_us(fn, texts: list[str], repeat: int) -> np.ndarray:
+    out = np.empty(len(texts))
+    for i, t in enumerate(texts):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn(t)
+        out[i] = (time.perf_counter() - t0) / repeat * 1e6
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default="date_extract_corpus.csv")
+    ap.add_argument("--today", default="2023-12-23")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    warnings.simplefilter("ignore")           # pd.to_datetime'ın format uyarıları
+
+    corpus = pd.read_csv(args.corpus, keep_default_na=False)
+    texts  = corpus["Soru"].tolist()
+    expect = [(a, b) if a else None for a, b in zip(corpus["ilk"], corpus["son"])]
+    today  = pd.Timestamp(args.today)
+
+    paths = {
+        "yeni": (lambda t: extract_period(t, today=today), extract_date),
+        "eski": (lambda t: legacy_extract_period(t, year=today.year), legacy_extract_date),
+    }
+    print(f"{len(texts)} soru, today={args.today}")
+    print(f"{'yol':<6}{'doğru':>8}{'period p50':>12}{'p95':>8}{'max':>9}{'date p50':>10}{'p95':>8}{'max':>9}  (µs)")
+    for name, (period, date) in paths.items():
+        got = [period(t) for t in texts]
+        ok  = sum(tuple(g) == e if g and e else g == e for g, e in zip(got, expect))
+        tp, td = timings_us(period, texts, args.repeat), timings_us(date, texts, args.repeat)
+        print(f"{name:<6}{ok:>5}/{len(texts):<3}{np.percentile(tp, 50):>11.1f}{np.percentile(tp, 95):>8.1f}{tp.max():>9.1f}"
+              f"{np.percentile(td, 50):>10.1f}{np.percentile(td, 95):>8.1f}{td.max():>9.1f}")
+        if name == "yeni":
+            for t, g, e in zip(texts, got, expect):
+                if (tuple(g) if g else None) != e:
+                    print(f"    beklenen {e}, bulunan {g}: {t}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_embedder_backends.py
+#
+# MiniLM embedder backend'lerinin fp32 torch'a göre kontrolü:
+#   - kosinüs uyumu: aynı metnin fp32 ve aday embedding'i arasındaki benzerlik
+#     (qa_map soruları + Chatbot_Sorular_Varyantlar*.csv paraphrase'leri)
+#   - yönlendirme: her paraphrase için idx_q top-1 eşleşmesi ve eşik kararı
+#     (rag_answer 0.65, generate_answer 0.40) fp32 ile aynı mı
+#   - gecikme: batch=1 encode medyanı / p95 ve tüm metinlerin toplu encode süresi
+#
+#   python bench_embedder_backends.py --backends int8,onnx,onnx-int8
+
+import argparse
+import glob
+import time
+
+import numpy as np
+import pandas as pd
+
+from embedding import EMBEDDER_BACKENDS, load_embedder
+from rag_utils import EMBEDDER_NAME, qa_map
+
+def encode(embedder, texts: list[str]) -> np.ndarray:
+    e = np.asarray(embedder.encode(texts, convert_to_numpy=True, batch_size=64), dtype="float32")
+    return e / np.linalg.norm(e, axis=1, keepdims=True)
+
+def latency_ms(embedder, texts: list[str]) -> tuple[float, float]:
+    times = []
+    for t in texts:
+        t0 = time.perf_counter()
+        embedder.encode([t], convert_to_numpy=True)
+        times.append((time.perf_counter() - t0) * 1e3)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 95))
+
+def routes(q_emb: np.ndarray, p_emb: np.ndarray, fns: list, threshold: float) -> list:
+    """Her paraphrase için (eşleşen fonksiyon, eşik geçildi mi)."""
+    scores = p_emb @ q_emb.T
+    best = scores.argmax(axis=1)
+    return [(fns[i], bool(s >= threshold)) for i, s in zip(best, scores[np.arange(len(best)), best])]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", default="int8,onnx,onnx-int8")
+    ap.add_argument("--csv", default="Chatbot_Sorular_Varyantlar*.csv")
+    ap.add_argument("--thresholds", default="0.65,0.40")
+    ap.add_argument("--latency-samples", type=int, default=200)
+    args = ap.parse_args()
+
+    questions = [q for q, _ in qa_map]
+    fns       = [fn for _, fn in qa_map]
+    paraphr   = list(dict.fromkeys(
+        pd.concat([pd.read_csv(f)["Soru"] for f in sorted(glob.glob(args.csv))]).dropna().astype(str)))
+    texts     = questions + paraphr
+    sample    = paraphr[:args.latency_samples]
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    print(f"{len(questions)} qa_map sorusu, {len(paraphr)} tekil paraphrase")
+
+    results = {}
+    for backend in ["torch"] + [b for b in args.backends.split(",") if b != "torch"]:
+        if backend not in EMBEDDER_BACKENDS:
+            raise SystemExit(f"Bilinmeyen backend: {backend}")
+        emb = load_embedder(EMBEDDER_NAME, backend)
+        encode(emb, texts[:16])                                    # ısınma
+        t0 = time.perf_counter()
+        e  = encode(emb, texts)
+        bulk = time.perf_counter() - t0
+        p50, p95 = latency_ms(emb, sample)
+        results[backend] = dict(emb=e, bulk=bulk, p50=p50, p95=p95)
+
+    ref = results["torch"]["emb"]
+    ref_routes = {t: routes(ref[:len(questions)], ref[len(questions):], fns, t) for t in thresholds}
+    print(f"{'backend':<11}{'cos min':>9}{'cos ort':>9}{'p50 ms':>9}{'p95 ms':>9}{'toplu s':>9}"
+          + "".join(f"{'yön.≠ @' + str(t):>14}" for t in thresholds))
+    for backend, r in results.items():
+        cos = (r["emb"] * ref).sum(axis=1)
+        diffs = []
+        for t in thresholds:
+            got = routes(r["emb"][:len(questions)], r["emb"][len(questions):], fns, t)
+            diffs.append([p for p, a, b in zip(paraphr, got, ref_routes[t]) if a != b])
+        print(f"{backend:<11}{cos.min():>9.4f}{cos.mean():>9.4f}{r['p50']:>9.2f}{r['p95']:>9.2f}"
+              f"{r['bulk']:>9.2f}" + "".join(f"{len(d):>14}" for d in diffs))
+        for t, d in zip(thresholds, diffs):
+            for p in d[:5]:
+                print(f"    @{t} farklı yönlendirme: {p}")
+
+if __name__ == "__main__":
+    main()
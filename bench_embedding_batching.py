@@ -0,0 +1,100 @@
+# bench_embedding_batching.py
+#
+# Eşzamanlı istemcilerde soru embedding throughput'u:
+#   direkt   → her istek embedder.encode([text]) (batch boyutu 1)
+#   batching → embedding.BatchingEncoder üzerinden (mikro-batch)
+# 1, 8 ve 32 eşzamanlı istemci için istek/s ve gecikme (p50 / p95) raporlanır.
+# Sorular Chatbot_Sorular_Varyantlar_.csv'den alınır; önbellek etkisini
+# dışarıda tutmak için her isteğe benzersiz bir ek yapılır.
+#
+#   python bench_embedding_batching.py --requests 400
+#   python bench_embedding_batching.py --backend numpy      # model indirilemiyorsa
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from embedding import BatchingEncoder
+
+class NumpyEncoder:
+    """
+    sentence-transformers yoksa CPU'da benzer iş yapan yedek: token
+    embedding'leri + 2 katmanlı MLP + ortalama havuzlama (384 boyut).
+    Batch'leme etkisi aynı mekanizmadan (BLAS matmul) gelir.
+    """
+    def __init__(self, dim: int = 384, hidden: int = 1536, vocab: int = 30522, seq: int = 32, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.seq = seq
+        self.tok = rng.standard_normal((vocab, dim), dtype=np.float32)
+        self.w1  = rng.standard_normal((dim, hidden), dtype=np.float32) / np.sqrt(dim)
+        self.w2  = rng.standard_normal((hidden, dim), dtype=np.float32) / np.sqrt(hidden)
+
+    def encode(self, texts, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        ids = np.zeros((len(texts), self.seq), dtype=np.int64)
+        for i, t in enumerate(texts):
+            w = [hash(x) % len(self.tok) for x in t.lower().split()][:self.seq]
+            ids[i, :len(w)] = w
+        h = self.tok[ids]                                              # B×T×D
+        for _ in range(6):                                             # 6 katman (MiniLM-L6)
+            h = h + np.maximum(h @ self.w1, 0) @ self.w2
+        return h.mean(axis=1)
+
+def load_embedder(backend: str, model: str):
+    if backend == "numpy":
+        return NumpyEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model)
+
+def run(encode_one, texts: list[str], clients: int) -> tuple[float, float, float]:
+    lat, lock = [], threading.Lock()
+    chunks = [texts[i::clients] for i in range(clients)]
+    def client(chunk):
+        mine = []
+        for t in chunk:
+            t0 = time.perf_counter()
+            encode_one(t)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            lat.extend(mine)
+    threads = [threading.Thread(target=client, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    wall = time.perf_counter() - t0
+    return len(texts) / wall, np.percentile(lat, 50) * 1e3, np.percentile(lat, 95) * 1e3
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", choices=["st", "numpy"], default="st")
+    ap.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--clients", default="1,8,32")
+    ap.add_argument("--max-wait-ms", type=float, default=5)
+    ap.add_argument("--max-batch", type=int, default=32)
+    args = ap.parse_args()
+
+    base = pd.read_csv("Chatbot_Sorular_Varyantlar_.csv")["Soru"].dropna().tolist()
+    embedder = load_embedder(args.backend, args.model)
+    embedder.encode(base[:8], convert_to_numpy=True)                  # ısınma
+    batcher = BatchingEncoder(embedder, args.max_wait_ms, args.max_batch)
+
+    print(f"Backend: {args.backend}, {args.requests} istek, "
+          f"max_wait={args.max_wait_ms} ms, max_batch={args.max_batch}")
+    print(f"{'istemci':>8}{'yol':>10}{'istek/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'batch':>7}")
+    for clients in map(int, args.clients.split(",")):
+        texts = [f"{base[i % len(base)]} #{clients}-{i}" for i in range(args.requests)]
+        for name, fn in (("direkt", lambda t: embedder.encode([t], convert_to_numpy=True)),
+                         ("batching", lambda t: batcher.encode([t]))):
+            before = batcher.batches
+            rps, p50, p95 = run(fn, texts, clients)
+            n = batcher.batches - before
+            avg = f"{args.requests / n:.1f}" if n else "-"
+            print(f"{clients:>8}{name:>10}{rps:>10.1f}{p50:>9.2f}{p95:>9.2f}{avg:>7}")
+
+if __name__ == "__main__":
+    main()
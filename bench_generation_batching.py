@@ -0,0 +1,95 @@
+# bench_generation_batching.py
+#
+# Eşzamanlı kullanıcılarda LLM fallback throughput'u:
+#   direkt   → her istek kendi model.generate çağrısı (bugünkü yol, generate_text)
+#   batching → generation.GenerationScheduler (sola dolgulu dinamik batch)
+# 1, 4 ve 16 eşzamanlı istemci için istek/s ve gecikme (p50 / p95), ortalama
+# batch boyutu, cevabı erken dönen satır sayısı ve en yüksek kuyruk derinliği
+# raporlanır. 8-bit LLaMA + LoRA yerine küçük bir yerel causal LM kullanılır;
+# --from-config ile ağırlık indirmeden rastgele başlatılmış model kurulur.
+# Cevap uzunlukları istek başına [--min-new, --max-new] aralığından seçilir
+# (rastgele modeller EOS'u nadiren üretir; satırlar kendi sınırında çıkar).
+#
+#   python bench_generation_batching.py --requests 64
+#   python bench_generation_batching.py --model sshleifer/tiny-gpt2 --clients 1,8
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from generation import GenerationScheduler, generate_text
+
+def load_model(name: str, from_config: bool, device: str):
+    from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(name, use_fast=True)
+    tokenizer.pad_token = tokenizer.eos_token
+    if from_config:
+        model = AutoModelForCausalLM.from_config(AutoConfig.from_pretrained(name))
+    else:
+        model = AutoModelForCausalLM.from_pretrained(name)
+    return model.to(device).eval(), tokenizer
+
+def run(generate_one, jobs: list[tuple[str, int]], clients: int) -> tuple[float, float, float]:
+    lat, lock = [], threading.Lock()
+    chunks = [jobs[i::clients] for i in range(clients)]
+    def client(chunk):
+        mine = []
+        for prompt, n in chunk:
+            t0 = time.perf_counter()
+            generate_one(prompt, n)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            lat.extend(mine)
+    threads = [threading.Thread(target=client, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    wall = time.perf_counter() - t0
+    return len(jobs) / wall, np.percentile(lat, 50) * 1e3, np.percentile(lat, 95) * 1e3
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="sshleifer/tiny-gpt2")
+    ap.add_argument("--from-config", action="store_true")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--clients", default="1,4,16")
+    ap.add_argument("--min-new", type=int, default=16)
+    ap.add_argument("--max-new", type=int, default=64)
+    ap.add_argument("--max-wait-ms", type=float, default=20)
+    ap.add_argument("--max-batch", type=int, default=8)
+    args = ap.parse_args()
+
+    import torch
+    torch.manual_seed(0)
+    model, tokenizer = load_model(args.model, args.from_config, args.device)
+    base = pd.read_csv("Chatbot_Sorular_Varyantlar_.csv")["Soru"].dropna().tolist()
+    rng  = np.random.default_rng(0)
+    jobs = [(f"Soru: {base[i % len(base)]}\nCevap:", int(rng.integers(args.min_new, args.max_new + 1)))
+            for i in range(args.requests)]                          # rag_utils.fallback_prompt biçimi
+    generate_text(model, tokenizer, jobs[0][0], 4)                  # ısınma
+    scheduler = GenerationScheduler(model, tokenizer, args.max_wait_ms, args.max_batch)
+
+    print(f"Model: {args.model}{' (rastgele)' if args.from_config else ''}, {args.requests} istek, "
+          f"max_new {args.min_new}–{args.max_new}, max_wait={args.max_wait_ms} ms, max_batch={args.max_batch}")
+    print(f"{'istemci':>8}{'yol':>10}{'istek/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'batch':>7}{'erken':>7}{'kuyruk':>8}")
+    for clients in map(int, args.clients.split(",")):
+        for name, fn in (("direkt", lambda p, n: generate_text(model, tokenizer, p, n)),
+                         ("batching", scheduler.generate)):
+            before = scheduler.stats()
+            scheduler.max_depth = 0
+            rps, p50, p95 = run(fn, jobs, clients)
+            after = scheduler.stats()
+            n = after["batches"] - before["batches"]
+            avg   = f"{(after['requests'] - before['requests']) / n:.1f}" if n else "-"
+            early = f"{after['early_exits'] - before['early_exits']}" if n else "-"
+            depth = f"{after['max_queue_depth']}" if n else "-"
+            print(f"{clients:>8}{name:>10}{rps:>10.2f}{p50:>10.1f}{p95:>10.1f}{avg:>7}{early:>7}{depth:>8}")
+
+if __name__ == "__main__":
+    main()
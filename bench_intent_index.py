@@ -0,0 +1,69 @@
+# bench_intent_index.py
+#
+# Niyet indeksinin fallback oranına etkisi (held-out paraphrase'ler üzerinde):
+#   önce  → sadece qa_map kanonik soruları (soru başına tek vektör)
+#   sonra → kanonik sorular + eğitim bölümündeki paraphrase'ler (çok vektör, max skor)
+# Paraphrase'ler her Soru No içinde rastgele eğitim / held-out olarak bölünür.
+# Her eşik için held-out sorularda: fallback (eşik altı), doğru yönlendirme,
+# yanlış yönlendirme oranları raporlanır.
+#
+#   python bench_intent_index.py --holdout 0.3 --seeds 5
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from intent_index import IntentIndex, intent_texts, load_paraphrases
+from rag_utils import SORU_NO, embedder_q, questions
+
+def evaluate(index: IntentIndex, q_emb: np.ndarray, labels: np.ndarray, threshold: float) -> dict:
+    best = [index.best(q_emb[i:i + 1]) for i in range(len(q_emb))]
+    score  = np.array([s for s, _ in best])
+    intent = np.array([i for _, i in best])
+    routed = score >= threshold
+    return {"fallback": float(np.mean(~routed)),
+            "doğru":    float(np.mean(routed & (intent == labels))),
+            "yanlış":   float(np.mean(routed & (intent != labels)))}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--holdout", type=float, default=0.3)
+    ap.add_argument("--seeds", type=int, default=5)
+    ap.add_argument("--thresholds", default="0.65,0.40")
+    args = ap.parse_args()
+
+    para = load_paraphrases()
+    para = para[para["soru_no"].isin(SORU_NO)].reset_index(drop=True)
+    para = para[~para["text"].isin(questions)].reset_index(drop=True)   # kanonik sorunun kendisi test edilmez
+    print(f"{len(questions)} niyet, {len(para)} etiketli paraphrase, held-out oranı {args.holdout}")
+
+    # tüm metinler bir kez encode edilir, bölmeler embedding'ler üzerinden kurulur
+    q_emb = np.asarray(embedder_q.encode(questions, convert_to_numpy=True), dtype="float32")
+    p_emb = np.asarray(embedder_q.encode(para["text"].tolist(), convert_to_numpy=True), dtype="float32")
+    for e in (q_emb, p_emb):
+        e /= np.linalg.norm(e, axis=1, keepdims=True)
+    labels = para["soru_no"].map(SORU_NO).to_numpy()
+    before = IntentIndex.from_embeddings(q_emb, np.arange(len(questions)), len(questions))
+
+    rows = []
+    for seed in range(args.seeds):
+        rng  = np.random.default_rng(seed)
+        test = np.zeros(len(para), dtype=bool)
+        for _, idx in para.groupby("soru_no").indices.items():
+            n = max(1, int(round(len(idx) * args.holdout)))
+            test[rng.choice(idx, size=n, replace=False)] = True
+        train = ~test
+        after = IntentIndex.from_embeddings(np.vstack([q_emb, p_emb[train]]),
+                                            np.concatenate([np.arange(len(questions)), labels[train]]),
+                                            len(questions))
+        for t in map(float, args.thresholds.split(",")):
+            for name, index in (("önce", before), ("sonra", after)):
+                rows.append({"eşik": t, "indeks": name, "seed": seed,
+                             **evaluate(index, p_emb[test], labels[test], t)})
+
+    res = pd.DataFrame(rows).groupby(["eşik", "indeks"], sort=False)[["fallback", "doğru", "yanlış"]].mean()
+    print((res * 100).round(1).astype(str).add(" %").to_string())
+
+if __name__ == "__main__":
+    main()
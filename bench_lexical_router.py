@@ -0,0 +1,71 @@
+# bench_lexical_router.py
+#
+# Sözcüksel yönlendiricinin eşik taraması (embedder gerektirmez):
+# paraphrase'ler her Soru No içinde eğitim / held-out olarak bölünür,
+# yönlendirici kanonik sorular + eğitim paraphrase'leri ile kurulur ve
+# held-out sorularda her (min_score, min_margin) için
+#   - embedder'a gitmeden yönlendirilen pay,
+#   - bu yönlendirmelerin doğruluğu (yanlış yönlendirme sayısı),
+#   - qa_map'te karşılığı olmayan Soru No'ların (negatifler) kaçının
+#     yanlışlıkla doğrudan yönlendirildiği
+# raporlanır.
+#
+#   python bench_lexical_router.py --holdout 0.3 --seeds 5
+
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from intent_index import intent_texts, load_paraphrases
+from lexical_router import LexicalRouter
+from qa_questions import QA_QUESTIONS, SORU_NO
+
+def top2(router: LexicalRouter, texts) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(en yüksek skor, ikinciye fark, en iyi niyet) dizileri."""
+    scores = np.array([router.scores(t) for t in texts]).reshape(-1, router.n_intents)
+    order  = np.argsort(-scores, axis=1, kind="stable")
+    rows   = np.arange(len(scores))
+    best   = scores[rows, order[:, 0]]
+    return best, best - scores[rows, order[:, 1]], order[:, 0]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--holdout", type=float, default=0.3)
+    ap.add_argument("--seeds", type=int, default=5)
+    ap.add_argument("--scores", default="0.5,0.6,0.7,0.75,0.8")
+    ap.add_argument("--margins", default="0.05,0.1,0.15,0.2")
+    args = ap.parse_args()
+
+    questions, soru_no = [q for q, _ in QA_QUESTIONS], SORU_NO
+    para = load_paraphrases()
+    neg  = para.loc[~para["soru_no"].isin(soru_no), "text"].tolist()
+    para = para[para["soru_no"].isin(soru_no) & ~para["text"].isin(questions)].reset_index(drop=True)
+    labels = para["soru_no"].map(soru_no).to_numpy()
+    print(f"{len(questions)} niyet, {len(para)} etiketli paraphrase, {len(neg)} negatif")
+
+    rows = []
+    for seed in range(args.seeds):
+        rng  = np.random.default_rng(seed)
+        test = np.zeros(len(para), dtype=bool)
+        for _, idx in para.groupby("soru_no").indices.items():
+            test[rng.choice(idx, size=max(1, int(round(len(idx) * args.holdout))), replace=False)] = True
+        texts, intents = intent_texts(questions, para[~test], soru_no)
+        router = LexicalRouter(texts, intents, len(questions))
+        best, margin, top = top2(router, para["text"][test])
+        n_best, n_margin, _ = top2(router, neg)
+        for s, m in itertools.product(map(float, args.scores.split(",")), map(float, args.margins.split(","))):
+            hit = (best >= s) & (margin >= m)
+            rows.append({"min_score": s, "min_margin": m, "seed": seed,
+                         "pay %": 100 * hit.mean(),
+                         "yanlış": int((hit & (top != labels[test])).sum()),
+                         "held-out": int(test.sum()),
+                         "negatif yönl.": int(((n_best >= s) & (n_margin >= m)).sum())})
+
+    res = pd.DataFrame(rows).groupby(["min_score", "min_margin"])[
+        ["pay %", "yanlış", "held-out", "negatif yönl."]].mean()
+    print(res.round(1).to_string())
+
+if __name__ == "__main__":
+    main()
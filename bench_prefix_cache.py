@@ -0,0 +1,102 @@
+# bench_prefix_cache.py
+#
+# inference (2).py prompt'larında sabit başlığın (prompts.SYSTEM_PREFIX +
+# CONTEXT_HEADER) KV cache'ini yeniden kullanmanın
+# prefill kazancı:
+#   tam     → her istekte prompt'un tamamı prefill edilir (bugünkü yol)
+#   önbellek → generation.PrefixKVCache kopyasından başlanır, sadece bağlam +
+#              soru tokenları prefill edilir (kopyalama süresi dahil)
+# Prefill edilen token sayısı, prefill süresi (p50 / p95) ve ilk token süresi
+# (generate, max_new_tokens=1) raporlanır; greedy çıktıların iki yolda aynı
+# olduğu kontrol edilir. Bağlam satırları retrieval_corpus öğelerinden alınır.
+# 8-bit LLaMA + LoRA yerine küçük bir yerel causal LM kullanılır.
+#
+#   python bench_prefix_cache.py --prompts 50
+#   python bench_prefix_cache.py --model distilgpt2 --context-lines 5
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import DF_PATH, load_vibration_df
+from generation import PrefixKVCache
+from prompts import SYSTEM_PREFIX, CONTEXT_HEADER
+from retrieval_corpus import corpus_items
+
+def prompts(n: int, context_lines: int, seed: int = 0) -> tuple[str, list[str]]:
+    qs    = pd.read_csv("Chatbot_Sorular_Varyantlar_.csv")["Soru"].dropna().tolist()
+    texts = corpus_items(load_vibration_df(DF_PATH))["text"].tolist()
+    rng   = np.random.default_rng(seed)
+    head  = SYSTEM_PREFIX + "\n" + CONTEXT_HEADER
+    out   = []
+    for i in range(n):
+        context = "\n".join(texts[j] for j in rng.choice(len(texts), context_lines, replace=False))
+        out.append(head + f"{context}\n\nSoru: {qs[i % len(qs)]}\nBu verilere dayanarak cevap verin:")
+    return head, out
+
+def ms(ts: list[float]) -> str:
+    return f"{np.percentile(ts, 50) * 1e3:>9.2f}{np.percentile(ts, 95) * 1e3:>9.2f}"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="sshleifer/tiny-gpt2")
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--prompts", type=int, default=50)
+    ap.add_argument("--context-lines", type=int, default=5)
+    ap.add_argument("--check-tokens", type=int, default=16)
+    args = ap.parse_args()
+
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=True)
+    tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(args.model).to(args.device).eval()
+    head, texts = prompts(args.prompts, args.context_lines)
+
+    t0 = time.perf_counter()
+    cache = PrefixKVCache(model, tokenizer)
+    ids, past = cache.get(head)
+    build = time.perf_counter() - t0
+
+    full_tok, tail_tok, t_full, t_pref, ttft_full, ttft_pref, same = [], [], [], [], [], [], 0
+    gen = dict(do_sample=False, pad_token_id=tokenizer.pad_token_id)
+    with torch.no_grad():
+        for text in texts:
+            inputs = tokenizer(text, return_tensors="pt").to(args.device)
+            if inputs["input_ids"][0, :len(ids)].tolist() != ids:
+                continue                                  # tokenizer sınırı birleştirdi
+            full_tok.append(inputs["input_ids"].shape[1])
+            tail_tok.append(full_tok[-1] - len(ids))
+
+            t0 = time.perf_counter()
+            model(**inputs)
+            t_full.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            model(input_ids=inputs["input_ids"][:, len(ids):], attention_mask=inputs["attention_mask"],
+                  past_key_values=cache.copy(past), use_cache=True)
+            t_pref.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            model.generate(**inputs, max_new_tokens=1, **gen)
+            ttft_full.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            model.generate(**inputs, past_key_values=cache.copy(past), max_new_tokens=1, **gen)
+            ttft_pref.append(time.perf_counter() - t0)
+
+            a = model.generate(**inputs, max_new_tokens=args.check_tokens, **gen)
+            b = model.generate(**inputs, past_key_values=cache.copy(past), max_new_tokens=args.check_tokens, **gen)
+            same += torch.equal(a, b)
+
+    n = len(full_tok)
+    print(f"Model: {args.model}, {n}/{len(texts)} prompt, başlık {len(ids)} token "
+          f"(bir kez prefill: {build * 1e3:.1f} ms)")
+    print(f"{'yol':<10}{'prefill tok':>12}{'prefill p50':>12}{'p95':>9}{'ilk tok p50':>12}{'p95':>9}  (ms)")
+    print(f"{'tam':<10}{np.mean(full_tok):>12.1f}   {ms(t_full)}   {ms(ttft_full)}")
+    print(f"{'önbellek':<10}{np.mean(tail_tok):>12.1f}   {ms(t_pref)}   {ms(ttft_pref)}")
+    print(f"prefill edilen token: %{100 * (1 - sum(tail_tok) / sum(full_tok)):.1f} daha az; "
+          f"greedy {args.check_tokens} token aynı: {same}/{n}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_query_planner.py
+#
+# Sorgu planlayıcının Chatbot_Sorular_Varyantlar*.csv üzerindeki kapsamı:
+#   fallback   → kurallar, sözcüksel yönlendirici ve niyet indeksi (eşik)
+#                tarafından cevaplanmayan, bugün LLM'e düşen sorular
+#   planlanan  → bunlardan query_planner'ın plan çıkarıp cevapladığı pay
+# qa_map'te karşılığı olmayan Soru No'lar (33–35) ayrıca raporlanır.
+# Plan + çalıştırma gecikmesi (p50 / p95) ve örnek cevaplar yazdırılır.
+#
+#   python bench_query_planner.py --threshold 0.65 --examples 10
+
+import argparse
+import time
+
+import numpy as np
+
+from intent_index import load_paraphrases
+from rag_utils import SORU_NO, df, intents, lexical, planner, query_embeddings, rules
+
+def reaches_fallback(text: str, threshold: float) -> bool:
+    if rules.dispatch(text, df) is not None or lexical.route(text) is not None:
+        return False
+    score, _ = intents.best(query_embeddings.encode(text))
+    return score < threshold
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threshold", type=float, default=0.65)
+    ap.add_argument("--examples", type=int, default=10)
+    args = ap.parse_args()
+
+    para = load_paraphrases()
+    texts, nos = para["text"].tolist(), para["soru_no"].to_numpy()
+    fallback = np.array([reaches_fallback(t, args.threshold) for t in texts])
+
+    answers, times = [], []
+    for t in texts:
+        t0 = time.perf_counter()
+        answers.append(planner.answer(t, df))
+        times.append((time.perf_counter() - t0) * 1e3)
+    planned  = np.array([a is not None for a in answers])
+    unmapped = ~np.isin(nos, list(SORU_NO))
+
+    print(f"{len(texts)} tekil paraphrase, eşik {args.threshold}")
+    print(f"{'küme':<28}{'soru':>6}{'fallback':>10}{'planlanan':>11}{'kalan':>7}")
+    for name, mask in (("tümü", np.ones(len(texts), bool)),
+                       ("qa_map'te karşılığı var", ~unmapped),
+                       ("qa_map'te karşılığı yok", unmapped)):
+        fb = mask & fallback
+        print(f"{name:<28}{mask.sum():>6}{fb.sum():>10}{(fb & planned).sum():>11}{(fb & ~planned).sum():>7}")
+    gained = fallback & planned
+    print(f"LLM fallback'ten milisaniyelik sorguya geçen: {gained.sum()}/{fallback.sum()} "
+          f"(%{100 * gained.sum() / max(fallback.sum(), 1):.1f})")
+    print(f"plan + çalıştırma: p50 {np.percentile(times, 50):.2f} ms, p95 {np.percentile(times, 95):.2f} ms")
+    for i in np.flatnonzero(gained)[:args.examples]:
+        print(f"  {texts[i]}\n    → {answers[i]}")
+
+if __name__ == "__main__":
+    main()
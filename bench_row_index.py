@@ -0,0 +1,98 @@
+# bench_row_index.py
+#
+# Satır indeksi türlerinin karşılaştırması (index_store.make_index):
+#   flat (kesin, referans) / ivf-flat / ivf-pq / hnsw
+# Her tür için kurulum süresi, Flat'e göre recall@k, tekil sorgu gecikmesi
+# (p50 / p95) ve serileştirilmiş indeks boyutu raporlanır.
+# Sentetik corpus: kümelenmiş, L2-normalize vektörler (gerçek satır
+# embedding'leri gibi çok sayıda yakın kopya içerir).
+#
+#   python bench_row_index.py --rows 1000000 --dim 384 --queries 500
+#   python bench_row_index.py --kinds ivf-flat,hnsw --nprobe 8,32
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from index_store import INDEX_KINDS, factory_string, make_index
+
+def make_corpus(rows: int, dim: int, clusters: int, seed: int = 42) -> np.ndarray:
+    rng     = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    x = np.empty((rows, dim), dtype=np.float32)
+    for s in range(0, rows, 100_000):                # bellek tepe noktasını sınırla
+        e = min(rows, s + 100_000)
+        x[s:e] = centers[rng.integers(clusters, size=e - s)]
+        x[s:e] += 0.6 * rng.standard_normal((e - s, dim), dtype=np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+def make_queries(x: np.ndarray, n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    q = x[rng.choice(len(x), size=n, replace=False)] + 0.1 * rng.standard_normal((n, x.shape[1]), dtype=np.float32)
+    faiss.normalize_L2(q)
+    return q
+
+def latency_ms(index, q: np.ndarray, k: int) -> tuple[float, float]:
+    times = []
+    for i in range(len(q)):
+        t0 = time.perf_counter()
+        index.search(q[i:i + 1], k)
+        times.append((time.perf_counter() - t0) * 1e3)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 95))
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 boyutu: 384")
+    ap.add_argument("--clusters", type=int, default=2_000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("-k", type=int, default=5)
+    ap.add_argument("--kinds", default=",".join(INDEX_KINDS))
+    ap.add_argument("--nprobe", default="16", help="IVF için virgülle ayrılmış değerler")
+    ap.add_argument("--ef", default="64", help="HNSW efSearch için virgülle ayrılmış değerler")
+    ap.add_argument("--threads", type=int, default=1, help="sorgu sırasında faiss thread sayısı")
+    args = ap.parse_args()
+
+    all_threads = faiss.omp_get_max_threads()
+    x = make_corpus(args.rows, args.dim, args.clusters)
+    q = make_queries(x, args.queries)
+    print(f"Corpus: {args.rows:,} x {args.dim}  ({x.nbytes / 2**20:,.0f} MB float32), "
+          f"{args.queries} sorgu, k={args.k}")
+
+    flat = make_index(x, "flat")
+    _, truth = flat.search(q, args.k)
+
+    print(f"{'tür':<10}{'tanım':<18}{'param':<14}{'kurulum s':>10}{'recall@k':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'boyut MB':>10}")
+    for kind in args.kinds.split(","):
+        t0 = time.perf_counter()
+        index = flat if kind == "flat" else make_index(x, kind)
+        build = time.perf_counter() - t0
+        size  = faiss.serialize_index(index).nbytes / 2**20
+        if kind.startswith("ivf"):
+            params = [("nprobe", int(v)) for v in args.nprobe.split(",")]
+        elif kind == "hnsw":
+            params = [("efSearch", int(v)) for v in args.ef.split(",")]
+        else:
+            params = [("-", None)]
+        faiss.omp_set_num_threads(args.threads)
+        for name, value in params:
+            if name == "nprobe":
+                faiss.extract_index_ivf(index).nprobe = value
+            elif name == "efSearch":
+                index.hnsw.efSearch = value
+            _, found = index.search(q, args.k)
+            p50, p95 = latency_ms(index, q, args.k)
+            label = "-" if value is None else f"{name}={value}"
+            print(f"{kind:<10}{factory_string(kind, args.rows, args.dim):<18}{label:<14}{build:>10.1f}"
+                  f"{recall(found, truth):>10.3f}{p50:>9.3f}{p95:>9.3f}{size:>10.1f}")
+        faiss.omp_set_num_threads(all_threads)       # kurulum tüm çekirdeklerle
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_timestamps.py
+#
+# Zaman damgası parse karşılaştırması:
+#   eski yol  → df['Timestamp'].apply(date_parser.isoparse) + tz_convert(None)
+#   yeni yol  → data_store.normalize_timestamps (vektörel + dateutil fallback)
+# Sentetik, dakika çözünürlüklü çok yıllık bir seri üzerinde çalışır.
+#
+#   python bench_timestamps.py --years 3 --odd 500
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from dateutil import parser as date_parser
+
+from data_store import normalize_timestamps
+
+def make_series(years: int, odd: int, seed: int = 42) -> pd.Series:
+    """Dakikalık ISO-8601 (+03:00) seri; `odd` adet satır farklı formatta yazılır."""
+    idx = pd.date_range("2021-01-01", periods=years * 365 * 24 * 60, freq="min", tz="Europe/Istanbul")
+    s = pd.Series(idx.strftime("%Y-%m-%dT%H:%M:%S%z"))
+    s = s.str.slice(0, -2) + ":" + s.str.slice(-2)
+    rng = np.random.default_rng(seed)
+    pos = rng.choice(len(s), size=min(odd, len(s)), replace=False)
+    s.iloc[pos] = idx[pos].strftime("%d %b %Y %H:%M")
+    return s
+
+def old_path(col: pd.Series) -> pd.Series:
+    ts = col.apply(date_parser.isoparse)
+    if isinstance(ts.dtype, pd.DatetimeTZDtype):
+        ts = ts.dt.tz_convert(None)
+    return ts
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--odd", type=int, default=500, help="ISO dışı formatta yazılan satır sayısı")
+    args = ap.parse_args()
+
+    col = make_series(args.years, args.odd)
+    print(f"Satır sayısı: {len(col):,}  (ISO dışı: {args.odd})")
+
+    t0 = time.perf_counter()
+    new, n_slow = normalize_timestamps(col)
+    t_new = time.perf_counter() - t0
+    print(f"normalize_timestamps : {t_new:8.2f} s  (yavaş yol: {n_slow} satır)")
+
+    # isoparse ISO dışı satırlarda hata verir; adil kıyas için sadece ISO satırlar
+    iso = col[~col.str.contains(" ")]
+    t0 = time.perf_counter()
+    old = old_path(iso)
+    t_old = time.perf_counter() - t0
+    print(f"apply(isoparse)      : {t_old:8.2f} s  ({len(iso):,} ISO satır)")
+    print(f"Hızlanma             : {t_old / t_new:8.1f}x")
+
+    same = (pd.to_datetime(old).to_numpy() == new[iso.index].to_numpy()).all()
+    print(f"Sonuçlar aynı        : {'✅' if same else '❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# data_store.py
+#
+# Titreşim verisini yükleyen ortak katman.
+# Kaynak CSV (Hugging Face URL'i veya yerel dosya) bir kez indirilip parse
+# edilir, sonuç yerel bir sütunsal snapshot'a (.npy sütunları) yazılır.
+# Sonraki açılışlarda sadece snapshot memory-map ile okunur; snapshot varsa
+# ağ bağlantısı olmadan da çalışır.
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from dateutil import parser as date_parser
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Ayarlar
+DF_PATH   = "https://huggingface.co/datasets/iamsahinemir/vibration/resolve/main/vibration_df.csv"
+# Varsayılan önbellek modülün yanındadır: app / inference / bench'ler hangi
+# dizinden çalıştırılırsa çalıştırılsın aynı snapshot ve indeksleri kullanır.
+CACHE_DIR = os.environ.get("VIBRATION_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "vibration"))
+
+# Snapshot düzeni değişirse bu sayı artırılır; eski snapshot'lar yok sayılır.
+SNAPSHOT_FORMAT = 5
+_SOURCES_FILE   = "sources.json"
+_META_FILE      = "meta.json"
+
+# Alarm seviyeleri: GREEN < YELLOW < ORANGE < RED sıralı int8 kodlar.
+# Tanınmayan / boş Situation değerleri -1 olur.
+SITUATION_LEVELS = ("GREEN", "YELLOW", "ORANGE", "RED")
+LEVEL_NAMES      = ("Green", "Yellow", "Orange", "Red")
+GREEN, YELLOW, ORANGE, RED = range(4)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Kaynak parmak izi ve içerik okuma
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+def _source_fingerprint(source: str) -> str | None:
+    """
+    Kaynağı indirmeden değişip değişmediğini anlamak için ucuz bir parmak izi.
+    URL'lerde HEAD isteğinin ETag'i (HF'de içerik hash'i), yerel dosyada
+    boyut + mtime kullanılır. Ağ yoksa (ya da yerel dosya silinmiş /
+    taşınmışsa) None döner; kayıtlı snapshot varsa o kullanılır.
+    """
+    if not _is_url(source):
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        return f"{st.st_size}-{st.st_mtime_ns}"
+    try:
+        req = urllib.request.Request(source, method="HEAD")
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            etag = resp.headers.get("X-Linked-Etag") or resp.headers.get("ETag")
+    except OSError:
+        return None
+    return etag.strip('"') if etag else None
+
+def _read_source(source: str) -> bytes:
+    if _is_url(source):
+        with urllib.request.urlopen(source, timeout=60) as resp:
+            return resp.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Parse
+def _to_utc_naive(ts: pd.Series) -> np.ndarray:
+    if isinstance(ts.dtype, pd.DatetimeTZDtype):
+        ts = ts.dt.tz_convert(None)
+    return ts.to_numpy(dtype="datetime64[ns]")
+
+def normalize_timestamps(col: pd.Series) -> tuple[pd.Series, int]:
+    """
+    Zaman damgası sütununu vektörel olarak naive (UTC) datetime64[ns]'e çevirir.
+     - Hızlı yol: sabit uzunluklu "YYYY-MM-DDTHH:MM:SS" (+ "Z" / "±HH:MM")
+       satırlarında gövde toplu parse edilir, offset karakter kodlarından
+       hesaplanıp topluca çıkarılır.
+     - Diğer satırlar pandas'ın ISO-8601 parser'ına gider; orada da NaT kalan
+       satırlar tek tek dateutil'e gönderilir (yavaş yol).
+    (parse edilmiş sütun, yavaş yoldan geçen satır sayısı) döner.
+    """
+    raw  = col.astype(str).to_numpy(dtype=str)
+    out  = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[ns]")
+    lens = np.char.str_len(raw)
+    todo = col.notna().to_numpy().copy()
+
+    # (1) hızlı yol: offset'i karakter kodlarından hesapla
+    width = raw.dtype.itemsize // 4
+    if width >= 19:
+        codes  = raw.view(np.uint32).reshape(len(raw), width)
+        offset = np.zeros(len(raw), dtype="int64")
+        fast   = todo & (lens == 19)
+        if width >= 20:
+            fast |= todo & (lens == 20) & (codes[:, 19] == ord("Z"))
+        if width >= 25:
+            c = codes[:, 19:25].astype("int64") - ord("0")
+            sign = np.where(codes[:, 19] == ord("-"), -1, 1)
+            tz = (todo & (lens == 25) & (codes[:, 22] == ord(":"))
+                  & np.isin(codes[:, 19], [ord("+"), ord("-")]))
+            offset = np.where(tz, sign * ((c[:, 1] * 10 + c[:, 2]) * 60 + c[:, 4] * 10 + c[:, 5]), 0)
+            fast |= tz
+        body = pd.to_datetime(pd.Series(raw[fast].astype("U19")), format="ISO8601", errors="coerce")
+        out[fast] = body.to_numpy(dtype="datetime64[ns]") - offset[fast].astype("timedelta64[m]")
+        todo &= np.isnat(out)
+
+    # (2) pandas ISO-8601 (kesirli saniye, farklı offset yazımları vb.)
+    if todo.any():
+        out[todo] = _to_utc_naive(pd.to_datetime(col[todo], utc=True, errors="coerce", format="ISO8601"))
+        todo &= np.isnat(out)
+
+    # (3) yavaş yol: dateutil
+    n_slow = int(todo.sum())
+    if n_slow:
+        def _slow(v):
+            try:
+                return pd.Timestamp(date_parser.parse(str(v)))
+            except (ValueError, OverflowError):
+                return pd.NaT
+        out[todo] = _to_utc_naive(pd.to_datetime(col[todo].map(_slow), utc=True, errors="coerce"))
+    return pd.Series(out, index=col.index, name=col.name), n_slow
+
+def situation_codes(col: pd.Series) -> np.ndarray:
+    """
+    Situation sütununu int8 seviye koduna çevirir (GREEN=0 … RED=3, bilinmeyen=-1).
+    upper()/strip() sadece farklı değerler üzerinde bir kez yapılır.
+    """
+    codes, uniques = pd.factorize(col)
+    lut = np.array(
+        [SITUATION_LEVELS.index(u) if u in SITUATION_LEVELS else -1
+         for u in (str(v).strip().upper() for v in uniques)] + [-1],
+        dtype="int8"
+    )
+    return lut[codes]  # factorize NaN için -1 verir → lut'un son elemanı
+
+# Gün anahtarı: 1970-01-01'den beri gün sayısı (int32). Günlük gruplama ve
+# eşitlik filtreleri bu sayısal sütun üzerinde çalışır; ISO metne sadece
+# cevap yazılırken çevrilir.
+def day_ordinals(ts) -> np.ndarray:
+    return np.asarray(ts, dtype="datetime64[ns]").astype("datetime64[D]").astype("int32")
+
+def day_ordinal(date) -> int:
+    """'2023-03-15', date veya Timestamp → gün sayısı."""
+    return int(pd.Timestamp(date).to_datetime64().astype("datetime64[D]").astype("int64"))
+
+def day_str(day) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+def days_str(days) -> list[str]:
+    return np.asarray(days, dtype="int64").astype("datetime64[D]").astype(str).tolist()
+
+def month_ordinals(ts) -> np.ndarray:
+    """Zaman damgası → 1970-01'den itibaren ay sayısı (NaT içermemeli)."""
+    return np.asarray(ts, dtype="datetime64[ns]").astype("datetime64[M]").astype("int32")
+
+def months_str(months) -> list[str]:
+    return np.asarray(months, dtype="int64").astype("datetime64[M]").astype(str).tolist()
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ham (Timestamp, Value, Situation) satırlarına türetilmiş sütunları
+    (level, day) ekler ve zamana göre sıralı döner.
+    """
+    if not pd.api.types.is_datetime64_dtype(df['Timestamp']):
+        df['Timestamp'], n_slow = normalize_timestamps(df['Timestamp'])
+        if n_slow:
+            print(f"⚠️ {n_slow} zaman damgası yavaş yoldan (dateutil) parse edildi.")
+    df['level'] = situation_codes(df['Situation'])
+    df['day']   = day_ordinals(df['Timestamp'])
+    # zaman serisi bir kez sıralanır; aralık sorguları searchsorted kullanır
+    if not df['Timestamp'].is_monotonic_increasing:
+        df = df.sort_values("Timestamp", kind="stable", ignore_index=True)
+    return df
+
+def _parse_frame(raw: bytes) -> pd.DataFrame:
+    return prepare_frame(pd.read_csv(io.BytesIO(raw)))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4️⃣ Snapshot yazma / okuma
+def _snapshot_dir(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, f"v{SNAPSHOT_FORMAT}-{digest[:16]}")
+
+def _write_snapshot(df: pd.DataFrame, path: str, digest: str) -> None:
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            # int64 epoch (ns) olarak saklanır, okurken view ile geri döner
+            arr, kind = s.to_numpy(dtype="datetime64[ns]").view("int64"), "datetime"
+        elif pd.api.types.is_numeric_dtype(s):
+            arr, kind = s.to_numpy(), "numeric"
+        else:
+            # sabit genişlikli unicode: pickle gerektirmez, mmap ile açılabilir
+            arr, kind = s.astype(str).to_numpy(dtype=str), "string"
+        fname = f"{i:03d}.npy"
+        np.save(os.path.join(tmp, fname), arr)
+        columns.append({"name": col, "file": fname, "kind": kind})
+    with open(os.path.join(tmp, _META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format": SNAPSHOT_FORMAT, "digest": digest, "rows": len(df),
+                   "columns": columns}, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+def _read_snapshot(path: str) -> pd.DataFrame:
+    with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    data = {}
+    for c in meta["columns"]:
+        arr = np.load(os.path.join(path, c["file"]), mmap_mode="r")
+        if c["kind"] == "datetime":
+            data[c["name"]] = pd.Series(arr.view("datetime64[ns]"), copy=False)
+        elif c["kind"] == "string":
+            data[c["name"]] = pd.Series(arr, dtype=object)
+        else:
+            data[c["name"]] = pd.Series(arr, copy=False)
+    return pd.DataFrame(data)
+
+def _load_sources(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, _SOURCES_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_sources(cache_dir: str, sources: dict) -> None:
+    path = os.path.join(cache_dir, _SOURCES_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(sources, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5️⃣ Dışa açık yükleyici
+def load_vibration_df(
+    source: str = DF_PATH,
+    cache_dir: str = CACHE_DIR,
+    refresh: bool = False
+) -> pd.DataFrame:
+    """
+    Titreşim verisini parse edilmiş DataFrame olarak döner.
+     - Kaynağın parmak izi kayıtlı snapshot ile aynıysa (veya ağ yoksa)
+       snapshot doğrudan okunur; indirme ve parse yapılmaz.
+     - Aksi halde kaynak indirilir, içeriğin sha256'sı alınır; aynı içerikli
+       snapshot zaten varsa o kullanılır, yoksa parse edilip yazılır.
+    refresh=True her durumda kaynağı yeniden okur.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    sources     = _load_sources(cache_dir)
+    entry       = sources.get(source)
+    fingerprint = _source_fingerprint(source)
+
+    if entry and not refresh and fingerprint in (None, entry["fingerprint"]):
+        path = _snapshot_dir(cache_dir, entry["digest"])
+        if os.path.exists(os.path.join(path, _META_FILE)):
+            return _read_snapshot(path)
+
+    raw    = _read_source(source)
+    digest = hashlib.sha256(raw).hexdigest()
+    path   = _snapshot_dir(cache_dir, digest)
+    if refresh or not os.path.exists(os.path.join(path, _META_FILE)):
+        _write_snapshot(_parse_frame(raw), path, digest)
+
+    sources[source] = {"fingerprint": fingerprint, "digest": digest}
+    _save_sources(cache_dir, sources)
+    return _read_snapshot(path)
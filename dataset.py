@@ -0,0 +1,128 @@
+# dataset.py
+#
+# VibrationDataset: zamana göre sıralı ham DataFrame + yükleme anında kurulan
+# özet tablolar. QA fonksiyonları imzalarını (df) / (df, date) korur; özetlere
+# dataset_for(df) ile ulaşır. Aynı DataFrame nesnesi için özetler bir kez
+# kurulur, DataFrame'e satır eklenirse sadece etkilenen kısım güncellenir.
+
+import numpy as np
+import pandas as pd
+
+from data_store import prepare_frame, day_ordinal
+from aggregates import build_daily, extend_daily, build_segments, extend_segments, RangeStats, PeriodCube
+
+class VibrationDataset:
+    def __init__(self, df: pd.DataFrame):
+        # Sıralama bir kez yapılır (loader zaten sıralı verir, genelde no-op).
+        # Yerinde sıralanır ki dataset_for(df) aynı nesneyi tanımaya devam etsin.
+        if not df['Timestamp'].is_monotonic_increasing:
+            df.sort_values("Timestamp", kind="stable", inplace=True, ignore_index=True)
+        self.df       = df
+        self.version  = 0
+        self._build()
+
+    def _build(self) -> None:
+        self.n_rows   = len(self.df)
+        self._index_time()
+        self.daily    = build_daily(self.df)
+        self.segments = build_segments(self.df)
+        self.stats    = RangeStats(self.df['Value'].to_numpy(), self.df['level'].to_numpy())
+        self.cube     = PeriodCube(self.df)
+
+    def _index_time(self) -> None:
+        self._ts      = self.df['Timestamp'].to_numpy(dtype="datetime64[ns]")
+        self._day     = self.df['day'].to_numpy()
+        self._n_valid = len(self._ts) - int(np.isnat(self._ts).sum())  # NaT'ler sonda
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Zaman aralığı sorguları: searchsorted ile O(log n) konum + iloc görünümü
+    @property
+    def end(self) -> pd.Timestamp:
+        """Verideki son zaman damgası."""
+        return pd.Timestamp(self._ts[self._n_valid - 1]) if self._n_valid else pd.NaT
+
+    def bounds(self, start=None, end=None) -> tuple[int, int]:
+        """[start, end] (iki uç dahil) aralığındaki satırların konum aralığı."""
+        i = 0 if start is None else int(np.searchsorted(self._ts[:self._n_valid], np.datetime64(pd.Timestamp(start)), "left"))
+        j = self._n_valid if end is None else int(np.searchsorted(self._ts[:self._n_valid], np.datetime64(pd.Timestamp(end)), "right"))
+        return i, max(i, j)
+
+    def slice(self, start=None, end=None) -> pd.DataFrame:
+        """[start, end] aralığındaki satırlar (kopyasız iloc görünümü)."""
+        i, j = self.bounds(start, end)
+        return self.df.iloc[i:j]
+
+    def last(self, period) -> pd.DataFrame:
+        """Son `period` (Timedelta veya DateOffset) içindeki satırlar."""
+        return self.slice(self.end - period)
+
+    def day_bounds(self, first, last) -> tuple[int, int]:
+        """first..last günleri (iki uç dahil, tarih veya gün sayısı) için konum aralığı."""
+        d0 = first if isinstance(first, (int, np.integer)) else day_ordinal(first)
+        d1 = last if isinstance(last, (int, np.integer)) else day_ordinal(last)
+        i = int(np.searchsorted(self._day[:self._n_valid], d0, "left"))
+        j = int(np.searchsorted(self._day[:self._n_valid], d1, "right"))
+        return i, max(i, j)
+
+    def range_stats(self, start=None, end=None) -> dict:
+        """[start, end] zaman aralığı için sayı/ortalama/std/min/max/renk sayıları."""
+        return self.stats.query(*self.bounds(start, end))
+
+    def day_stats(self, first, last=None) -> dict:
+        """first..last günleri (iki uç dahil) için range_stats."""
+        return self.stats.query(*self.day_bounds(first, first if last is None else last))
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Veri güncelleme
+    def append(self, rows: pd.DataFrame) -> None:
+        """Yeni satırları ekler ve özetleri sadece yeni veri için genişletir."""
+        if rows.empty:
+            return
+        if 'level' not in rows or 'day' not in rows:
+            rows = prepare_frame(rows.copy())
+        in_order = self._n_valid == 0 or rows['Timestamp'].min() >= self.end
+        self.df = pd.concat([self.df, rows], ignore_index=True)
+        _datasets[id(self.df)] = self
+        if in_order and rows['Timestamp'].is_monotonic_increasing:
+            self._extend(rows)
+        else:
+            self.df.sort_values("Timestamp", kind="stable", inplace=True, ignore_index=True)
+            self._build()
+            self.version += 1
+
+    def _extend(self, rows: pd.DataFrame) -> None:
+        self.daily    = extend_daily(self.daily, self.df, rows)
+        self.segments = extend_segments(self.segments, self.df, self.n_rows)
+        self.stats.extend(rows['Value'].to_numpy(), rows['level'].to_numpy())
+        self.cube.extend(self.df, rows)
+        self.n_rows   = len(self.df)
+        self._index_time()
+        self.version += 1
+
+    def refresh(self) -> None:
+        """df yerinde değiştirildiyse özetleri uyumlu hale getirir."""
+        if len(self.df) > self.n_rows and self.df['Timestamp'].is_monotonic_increasing:
+            self._extend(self.df.iloc[self.n_rows:])
+        else:
+            version = self.version
+            self.__init__(self.df)
+            self.version = version + 1
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DataFrame → VibrationDataset eşlemesi
+_MAX_DATASETS = 8
+_datasets: dict[int, VibrationDataset] = {}
+
+def dataset_for(df: pd.DataFrame) -> VibrationDataset:
+    """
+    Verilen DataFrame nesnesine ait dataset'i döner, yoksa kurar.
+    Kayıt df'e güçlü referans tuttuğu için id() başka nesneye geçemez.
+    """
+    ds = _datasets.get(id(df))
+    if ds is None or ds.df is not df:
+        if len(_datasets) >= _MAX_DATASETS:
+            _datasets.pop(next(iter(_datasets)))
+        ds = _datasets[id(df)] = VibrationDataset(df)
+    elif len(df) != ds.n_rows:
+        ds.refresh()
+    return ds
@@ -0,0 +1,224 @@
+# date_extract.py
+#
+# Sorulardaki tarih / dönem ifadelerini tek bir derlenmiş desenle tarayan
+# çıkarıcı. Soru metninin tamamı asla tarih olarak parse edilmez; her eşleşme
+# yapılandırılmış bir Span (tür, ilk gün, son gün, metindeki konum) olur:
+#
+#   "2023-04-27", "15/02/2023", "15.02.2023"       → date
+#   "15 Ocak 2023", "March 15, 2023"                → date
+#   "1-15 Mart 2023", "15/02/2023–15/03/2023",
+#   "Mart ile Mayıs arası", "15 Ocak'tan itibaren"  → range
+#   "Nisan 2023", "Mayıs'ta"                        → month
+#   "2023 yılında", "2023'ün"                       → year
+#   "dün", "geçen hafta", "bu ay", "son 45 gün"     → relative
+#
+# Yılı yazılmamış gün / ay için önce `year`, yoksa `today`'den geriye en
+# yakın yıl kullanılır; göreli ifadeler sadece `today` verilirse çözülür.
+
+import datetime as dt
+import re
+from typing import NamedTuple
+
+from lexical_router import casefold_tr
+
+MONTHS    = ("ocak", "şubat", "mart", "nisan", "mayıs", "haziran",
+             "temmuz", "ağustos", "eylül", "ekim", "kasım", "aralık")
+EN_MONTHS = ("january", "february", "march", "april", "may", "june",
+             "july", "august", "september", "october", "november", "december")
+# Sayı kelimeleri: onlar basamağı + isteğe bağlı birler ("on iki", "yirmi", "otuz beş")
+UNIT_WORDS = {"bir": 1, "iki": 2, "üç": 3, "dört": 4, "beş": 5, "altı": 6,
+              "yedi": 7, "sekiz": 8, "dokuz": 9}
+TEN_WORDS  = {"on": 10, "yirmi": 20, "otuz": 30, "kırk": 40, "elli": 50,
+              "altmış": 60, "yetmiş": 70, "seksen": 80, "doksan": 90}
+NUMBER_WORDS = {**UNIT_WORDS, **TEN_WORDS}
+
+_MONTH_NO = {m: i + 1 for names in (MONTHS, EN_MONTHS) for i, m in enumerate(names)}
+
+class Span(NamedTuple):
+    kind:  str                 # date, range, month, year, relative
+    first: str                 # ISO ilk gün
+    last:  str                 # ISO son gün (dahil)
+    start: int                 # metindeki konum [start, end)
+    end:   int
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Desen
+_MON  = "|".join(sorted(_MONTH_NO, key=len, reverse=True))
+_SFX  = r"(?:\w*[’']?\w*)"                         # Türkçe ek: "Mart'ta", "Ocak 2023’ten"
+_YEAR = r"(?:19|20)\d\d"
+# Rakam veya sayı kelimesi; VERBOSE desende boşluk yok sayılır: "on iki" → on\s+iki
+NUMBER_PATTERN = (rf"\d+|(?:{'|'.join(TEN_WORDS)})(?:\s+(?:{'|'.join(UNIT_WORDS)})\b)?"
+                  rf"|(?:{'|'.join(UNIT_WORDS)})\b")
+
+_TOKEN_RE = re.compile(rf"""
+    (?P<iso>\b(?P<iso_y>{_YEAR})[-/.](?P<iso_m>\d{{1,2}})[-/.](?P<iso_d>\d{{1,2}})\b)
+  | (?P<dmy>\b(?P<dmy_d>\d{{1,2}})[-/.](?P<dmy_m>\d{{1,2}})[-/.](?P<dmy_y>{_YEAR})\b)
+  | (?P<dd>\b(?P<dd_d1>\d{{1,2}})\s*[-–—]\s*(?P<dd_d2>\d{{1,2}})\s+(?P<dd_m>{_MON}){_SFX}(?:\s+(?P<dd_y>{_YEAR}))?{_SFX})
+  | (?P<dm>\b(?P<dm_d>\d{{1,2}})\.?\s+(?P<dm_m>{_MON}){_SFX}(?:,?\s+(?P<dm_y>{_YEAR}){_SFX})?)
+  | (?P<md>\b(?P<md_m>{"|".join(EN_MONTHS)})\s+(?P<md_d>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<md_y>{_YEAR})\b)
+  | (?P<mr>\b(?P<mr_m1>{_MON}){_SFX}\s*(?:ile|ila|ve|-|–|—)\s*(?P<mr_m2>{_MON}){_SFX}(?:\s+(?P<mr_y>{_YEAR}))?\s+aras[ıi]\w*)
+  | (?P<mon>\b(?P<mon_m>{_MON})(?!lar){_SFX}(?:\s+(?P<mon_y>{_YEAR}){_SFX})?)
+  | (?P<yr>\b(?P<yr_y>{_YEAR})\b{_SFX})
+  | (?P<last>\bson\s+(?P<last_n>{NUMBER_PATTERN})\s+(?P<last_u>gün|hafta|ay|yıl))
+  | (?P<rel>\b(?P<rel_w>(?:dün|bugün)(?=(?:kü|den|de)?\b)|(?:geçen|geçtiğimiz|bu)\s+(?:hafta|ay|yıl|sene)(?!lar))(?!\w*\s+\d))
+  | (?P<since>\bitibaren\b|\bberi\b)
+""", re.VERBOSE)
+
+# iki tarih arasındaki bağlaç: "15 Mart ile 20 Mart", "15.03.2023 - 20.03.2023",
+# "15 Mart'tan 2 Nisan'a" (ek tarih eşleşmesinin içinde kalır)
+_JOIN_RE = re.compile(r"\s*(?:ile|ila|ve|to|and|until|-|–|—)?\s*")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Yardımcılar
+def _date(y: int, m: int, d: int) -> dt.date | None:
+    try:
+        return dt.date(y, m, d)
+    except ValueError:
+        return None
+
+def _month_end(y: int, m: int) -> dt.date:
+    return dt.date(y + m // 12, m % 12 + 1, 1) - dt.timedelta(days=1)
+
+def _infer_year(m: int, d: int, year: int | None, today: dt.date | None) -> int | None:
+    """Yılsız gün/ay: verilen yıl, yoksa today'den geriye en yakın."""
+    if year is not None:
+        return year
+    if today is None:
+        return None
+    return today.year if (m, d) <= (today.month, today.day) else today.year - 1
+
+def _relative(word: str, today: dt.date) -> tuple[dt.date, dt.date]:
+    if word == "dün":
+        return (today - dt.timedelta(days=1),) * 2
+    if word == "bugün":
+        return today, today
+    which, unit = word.split()
+    back = which != "bu"
+    if unit == "hafta":
+        monday = today - dt.timedelta(days=today.weekday() + (7 if back else 0))
+        return monday, monday + dt.timedelta(days=6) if back else today
+    if unit == "ay":
+        y, m = (today.year, today.month - 1) if back else (today.year, today.month)
+        y, m = (y - 1, 12) if m == 0 else (y, m)
+        return dt.date(y, m, 1), _month_end(y, m) if back else today
+    y = today.year - back
+    return dt.date(y, 1, 1), dt.date(y, 12, 31) if back else today
+
+def number_value(text: str) -> int:
+    """NUMBER_PATTERN eşleşmesi → sayı: "12", "on iki", "yirmi" (küçük harf)."""
+    return int(text) if text.isdigit() else sum(NUMBER_WORDS[w] for w in text.split())
+
+def _last_n(n: int, unit: str, today: dt.date) -> tuple[dt.date, dt.date]:
+    if unit in ("gün", "hafta"):
+        return today - dt.timedelta(days=n * (7 if unit == "hafta" else 1) - 1), today
+    months = n * (12 if unit == "yıl" else 1)
+    y, m = divmod(today.year * 12 + today.month - 1 - months, 12)
+    start = dt.date(y, m + 1, min(today.day, _month_end(y, m + 1).day)) + dt.timedelta(days=1)
+    return start, today
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Çıkarma
+def extract_spans(text: str, year: int | None = None, today=None) -> list[Span]:
+    """
+    Metindeki tarih / dönem ifadeleri, metindeki sırayla. Ardışık iki tarih
+    bağlaçla ("ile", "-", "–") ayrılmışsa tek bir range olur.
+    """
+    q = casefold_tr(text)
+    today = None if today is None else (today if type(today) is dt.date else today.date())
+    raw = []                              # [kind, first, last, start, end, yılsızsa (ay, gün)]
+    for m in _TOKEN_RE.finditer(q):
+        k, g = m.lastgroup, m.groupdict()
+        s, e = m.span()
+        if k == "iso":
+            d = _date(int(g["iso_y"]), int(g["iso_m"]), int(g["iso_d"]))
+            d and raw.append(["date", d, d, s, e, None])
+        elif k == "dmy":
+            d = _date(int(g["dmy_y"]), int(g["dmy_m"]), int(g["dmy_d"]))
+            d and raw.append(["date", d, d, s, e, None])
+        elif k in ("dm", "md"):
+            mo, day, y = _MONTH_NO[g[f"{k}_m"]], int(g[f"{k}_d"]), g[f"{k}_y"]
+            y = int(y) if y else _infer_year(mo, day, year, today)
+            d = _date(y, mo, day) if y else None
+            if d or not g[f"{k}_y"]:
+                raw.append(["date", d, d, s, e, None if g[f"{k}_y"] else (mo, day)])
+        elif k == "dd":
+            mo, y = _MONTH_NO[g["dd_m"]], g["dd_y"]
+            d1, d2 = sorted((int(g["dd_d1"]), int(g["dd_d2"])))
+            y = int(y) if y else _infer_year(mo, d1, year, today)
+            a, b = (_date(y, mo, d1), _date(y, mo, d2)) if y else (None, None)
+            a and b and raw.append(["range", a, b, s, e, None])
+        elif k == "mr":
+            m1, m2 = _MONTH_NO[g["mr_m1"]], _MONTH_NO[g["mr_m2"]]
+            y = int(g["mr_y"]) if g["mr_y"] else _infer_year(m2, 1, year, today)
+            if y:
+                y1 = y if m1 <= m2 else y - 1
+                raw.append(["range", dt.date(y1, m1, 1), _month_end(y, m2), s, e, None])
+        elif k == "mon":
+            mo, y = _MONTH_NO[g["mon_m"]], g["mon_y"]
+            # "aralık" tek başına çoğunlukla "değer aralığı"dır; yıl / "ayı" / kesme işareti yoksa ay sayılmaz
+            if g["mon_m"] == "aralık" and not y and not re.match(r"aralık(?:[’']|\s+ay)", q[s:e + 4]):
+                continue
+            y = int(y) if y else _infer_year(mo, 1, year, today)
+            y and raw.append(["month", dt.date(y, mo, 1), _month_end(y, mo), s, e, None])
+        elif k == "yr":
+            y = int(g["yr_y"])
+            raw.append(["year", dt.date(y, 1, 1), dt.date(y, 12, 31), s, e, None])
+        elif k == "last" and today:
+            raw.append(["relative", *_last_n(number_value(g["last_n"]), g["last_u"], today), s, e, None])
+        elif k == "rel" and today:
+            w = re.sub(r"\s+", " ", g["rel_w"]).replace("geçtiğimiz", "geçen").replace("sene", "yıl")
+            raw.append(["relative", *_relative(w, today), s, e, None])
+        elif k == "since" and today and raw and raw[-1][0] in ("date", "month") and raw[-1][1]:
+            raw[-1][0], raw[-1][2], raw[-1][4] = "range", today, e
+
+    spans, i = [], 0
+    while i < len(raw):
+        a = raw[i]
+        b = raw[i + 1] if i + 1 < len(raw) else None
+        if b and a[0] == b[0] and a[0] in ("date", "year") and _JOIN_RE.fullmatch(q[a[4]:b[3]]):
+            if a[5] and b[1] and not b[5]:    # "15 Mart ile 2 Nisan 2023": yıl sağdaki tarihten
+                y = b[1].year if a[5] <= (b[1].month, b[1].day) else b[1].year - 1
+                a[1] = a[2] = _date(y, *a[5])
+            if a[1] and b[1]:
+                first, last = sorted((a[1], b[2]))
+                spans.append(Span("range", first.isoformat(), last.isoformat(), a[3], b[4]))
+                i += 2
+                continue
+        if a[1]:
+            spans.append(Span(a[0], a[1].isoformat(), a[2].isoformat(), a[3], a[4]))
+        i += 1
+    return spans
+
+def extract_date(user_q: str, year: int | None = None) -> str | None:
+    """Sorudaki ilk tekil tarih (ISO), yoksa None."""
+    return next((s.first for s in extract_spans(user_q, year) if s.kind == "date"), None)
+
+def extract_date_range(user_q: str, year: int | None = None) -> tuple[str, str] | None:
+    """
+    Sorudan (başlangıç, bitiş) ISO tarih çifti çıkarır:
+      "2023-03-15 ile 2023-03-20", "15.03.2023 - 20.03.2023",
+      "15–20 Mart 2023", "15 Mart ile 2 Nisan arası".
+    Yıl yazılmamışsa `year` kullanılır.
+    """
+    spans = extract_spans(user_q, year)
+    rng = next((s for s in spans if s.kind == "range"), None)
+    if rng:
+        return rng.first, rng.last
+    dates = sorted(s.first for s in spans if s.kind == "date")
+    return (dates[0], dates[1]) if len(dates) >= 2 else None
+
+_PERIOD_ORDER = ("range", "date", "month", "year", "relative")
+
+def extract_period(user_q: str, year: int | None = None, today=None) -> tuple[str, str] | None:
+    """
+    Sorudaki zaman kısıtını (ilk gün, son gün) olarak döner:
+    tarih aralığı → aralık, tek tarih → o gün, "Nisan [2023]" → o ay,
+    "2023 yılında" → o yıl, "geçen ay" / "son 45 gün" → today'e göre.
+    Bulunamazsa None.
+    """
+    spans = extract_spans(user_q, year, today)
+    for kind in _PERIOD_ORDER:
+        s = next((s for s in spans if s.kind == kind), None)
+        if s:
+            return s.first, s.last
+    return None
@@ -0,0 +1,164 @@
+# embedding.py
+#
+# Soru embedding'leri için:
+#  - load_embedder: MiniLM'i fp32 torch, int8 dinamik kuantize torch veya
+#    ONNX Runtime (fp32 / int8) ile yükler,
+#  - BatchingEncoder: eşzamanlı isteklerin encode çağrılarını birkaç ms
+#    toplayıp tek bir batch'li encode ile çalıştıran servis,
+#  - QueryEmbeddingCache: sınırlı, thread-safe LRU önbellek. Aynı soru
+#    (yönlendirme araması + fallback bağlam araması, farklı kullanıcılardan
+#    gelen aynı ifadeler) bir kez encode edilir.
+
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import faiss
+import numpy as np
+
+EMBED_MAX_WAIT_MS = float(os.environ.get("EMBED_MAX_WAIT_MS", 5))
+EMBED_MAX_BATCH   = int(os.environ.get("EMBED_MAX_BATCH", 32))
+
+# "torch" (fp32, varsayılan), "int8" (torch dinamik kuantizasyon),
+# "onnx" (ONNX Runtime fp32), "onnx-int8" (ONNX Runtime, kuantize model dosyası).
+# Seçmeden önce bench_embedder_backends.py ile uyum / hız kontrol edilir.
+EMBEDDER_BACKEND  = os.environ.get("EMBEDDER_BACKEND", "torch")
+EMBEDDER_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_INT8_FILE    = os.environ.get("ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 0️⃣ Embedder yükleme
+def load_embedder(name: str, backend: str = EMBEDDER_BACKEND):
+    """
+    SentenceTransformer arayüzlü (encode) embedder. ONNX türleri
+    sentence-transformers>=3.2 ve onnxruntime (optimum) ister; model
+    deposunda ONNX dosyası yoksa ilk yüklemede dışa aktarılır.
+    """
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(name)
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(name, device="cpu", backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(name, device="cpu", backend="onnx",
+                                   model_kwargs={"file_name": ONNX_INT8_FILE})
+    raise ValueError(f"Bilinmeyen embedder backend'i: {backend!r} (seçenekler: {', '.join(EMBEDDER_BACKENDS)})")
+
+def embedder_key(name: str, backend: str = EMBEDDER_BACKEND) -> str:
+    """İndeks önbelleği anahtarı: farklı backend'lerin embedding'leri karışmasın."""
+    return name if backend == "torch" else f"{name}@{backend}"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Mikro-batch encode servisi
+class BatchingEncoder:
+    """
+    embedder.encode ile aynı arayüz. Gelen metinler kuyruğa alınır; arka
+    plandaki worker ilk isteği aldıktan sonra en fazla max_wait_ms kadar
+    (veya max_batch metin dolana kadar) bekleyip hepsini tek çağrıda encode
+    eder ve her isteğin Future'ını kendi satırıyla tamamlar. Bir önceki
+    batch tek metinse (eşzamanlılık yok) beklemeden kuyruktakiler alınır,
+    böylece tek istemcide ek gecikme olmaz.
+    """
+    def __init__(self, embedder, max_wait_ms: float = EMBED_MAX_WAIT_MS, max_batch: int = EMBED_MAX_BATCH):
+        self.embedder  = embedder
+        self.max_wait  = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.batches   = 0                    # yapılan encode çağrısı sayısı
+        self._last     = 1                    # son batch'in boyutu
+        self._queue: queue.Queue[tuple[str, Future]] = queue.Queue()
+        self._worker   = threading.Thread(target=self._loop, daemon=True, name="embedding-batcher")
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        fut = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def encode(self, texts, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        futures = [self.submit(t) for t in texts]
+        return np.stack([f.result() for f in futures])
+
+    def _collect(self) -> list[tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + (self.max_wait if self._last > 1 else 0)
+        while len(batch) < self.max_batch:
+            left = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=left) if left > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = list(dict.fromkeys(t for t, _ in batch))      # batch içi tekrarlar bir kez
+            try:
+                embs = self.embedder.encode(texts, convert_to_numpy=True)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            self._last    = len(batch)
+            row = {t: i for i, t in enumerate(texts)}
+            for t, fut in batch:
+                fut.set_result(embs[row[t]])
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Soru embedding önbelleği
+def normalize_query(text: str) -> str:
+    """Önbellek anahtarı: baş/son boşluksuz, tek boşluklu metin."""
+    return re.sub(r"\s+", " ", text).strip()
+
+class QueryEmbeddingCache:
+    def __init__(self, embedder, maxsize: int = 4096):
+        self.embedder = embedder
+        self.maxsize  = maxsize
+        self.hits     = 0
+        self.misses   = 0
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock    = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        L2-normalize (1, d) float32 embedding. Dönen dizi önbellekteki
+        nesnedir ve salt okunurdur; yerinde değiştirilmemeli.
+        """
+        key = normalize_query(text)
+        with self._lock:
+            emb = self._cache.get(key)
+            if emb is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return emb
+            self.misses += 1
+        # encode kilit dışında: farklı sorular birbirini beklemesin
+        emb = np.ascontiguousarray(self.embedder.encode([key], convert_to_numpy=True), dtype="float32")
+        faiss.normalize_L2(emb)
+        emb.flags.writeable = False
+        with self._lock:
+            self._cache[key] = emb
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return emb
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache),
+                    "hit_rate": self.hits / total if total else 0.0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,313 @@
+# generation.py
+#
+# LLM fallback için model.generate yardımcıları:
+#  - generate_text: tek seferde üretir, sadece yeni tokenları decode eder
+#    (prompt tekrar decode edilip cevaba eklenmez),
+#  - GenerationScheduler: eşzamanlı kullanıcıların prompt'larını kuyruğa alıp
+#    uyumlu olanları sola dolgulu tek bir generate batch'inde çalıştırır;
+#    stream() üretilen metni birikerek yield eder. Gradio generator
+#    handler'ları her yield'ı ekrana basar; kullanıcının beklediği süre ilk
+#    tokena kadardır,
+#  - PrefixKVCache: sabit prompt başlığının (SYSTEM_PREFIX + şablon) KV
+#    cache'i bir kez hesaplanır; istekler bu cache'in kopyasından başlar ve
+#    sadece soruya özgü tokenlar prefill edilir.
+
+import copy
+import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from typing import Iterator, NamedTuple
+
+LLM_MAX_WAIT_MS     = float(os.environ.get("LLM_MAX_WAIT_MS", 20))
+LLM_MAX_BATCH       = int(os.environ.get("LLM_MAX_BATCH", 8))
+LLM_QUEUE_TIMEOUT_S = float(os.environ.get("LLM_QUEUE_TIMEOUT_S", 120))   # batch'e alınmayı bekleme sınırı
+STREAM_TIMEOUT_S    = 120       # batch'e alındıktan sonra token gelmezse stream bu kadar bekler
+LLM_BUSY_MESSAGE    = "Şu anda çok sayıda soru yanıtlanıyor; lütfen biraz sonra tekrar deneyin."
+LLM_TIMEOUT_MESSAGE = "Cevap üretimi zaman aşımına uğradı; lütfen tekrar deneyin."
+
+def generate_text(model, tokenizer, prompt: str, max_new_tokens: int = 200, **gen_kwargs) -> str:
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    out    = model.generate(**inputs, max_new_tokens=max_new_tokens, **gen_kwargs)
+    return tokenizer.decode(out[0, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sabit prompt başlığı için KV cache
+class PrefixKVCache:
+    """
+    Başlık metni → (token id'leri, past_key_values). Anahtar metnin kendisidir:
+    SYSTEM_PREFIX ya da şablon değişirse yeni metin ilk kullanımda yeniden
+    prefill edilir, eskisi LRU ile düşer. Dönen cache'ler paylaşılan
+    nesnelerdir; generate'e her zaman copy() ile kopyası verilir.
+    """
+    def __init__(self, model, tokenizer, maxsize: int = 4):
+        self.model     = model
+        self.tokenizer = tokenizer
+        self.maxsize   = maxsize
+        self.hits      = 0
+        self.builds    = 0
+        self._cache: OrderedDict[str, tuple[list[int], object]] = OrderedDict()
+        self._lock     = threading.Lock()
+
+    def get(self, prefix: str) -> tuple[list[int], object]:
+        with self._lock:
+            entry = self._cache.get(prefix)
+            if entry is not None:
+                self._cache.move_to_end(prefix)
+                self.hits += 1
+                return entry
+            entry = self._cache[prefix] = self._build(prefix)
+            self.builds += 1
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return entry
+
+    def _build(self, prefix: str) -> tuple[list[int], object]:
+        import torch
+        from transformers import DynamicCache
+        inputs = self.tokenizer(prefix, return_tensors="pt").to(self.model.device)
+        with torch.no_grad():
+            out = self.model(**inputs, past_key_values=DynamicCache(), use_cache=True)
+        return inputs["input_ids"][0].tolist(), out.past_key_values
+
+    @staticmethod
+    def copy(cache, batch_size: int = 1):
+        """generate cache'i yerinde büyüttüğü için her istek kendi kopyasını alır."""
+        cache = copy.deepcopy(cache)
+        if batch_size > 1:
+            cache.batch_repeat_interleave(batch_size)
+        return cache
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dinamik batch'li generate servisi
+class _Request(NamedTuple):
+    prompt: str
+    max_new_tokens: int
+    key: tuple                  # aynı key'li istekler aynı batch'e girebilir
+    gen_kwargs: dict
+    prefix: str | None          # KV cache'i yeniden kullanılacak prompt başlığı
+    future: Future
+    chunks: queue.Queue | None  # stream isteklerinde birikmiş metin (None = bitti)
+    admitted: threading.Event   # worker isteği bir batch'e aldığında set edilir
+
+class _RowFinisher:
+    """
+    StoppingCriteria olarak her adımda çağrılır. EOS üreten ya da kendi
+    max_new_tokens'ına ulaşan satırın cevabı o adımda decode edilip
+    Future'ı tamamlanır; çağıran en uzun satırı beklemez. Kazanç sadece
+    gecikmededir: bitmiş satır batch'ten çıkarılmaz, generate onu en uzun
+    satır bitene kadar dolgu tokenıyla hesaplamaya devam eder (GPU işi
+    azalmaz). Stream isteklerine birikmiş metin de buradan akar (tokenizer
+    sadece worker thread'inde kullanılır).
+    """
+    def __init__(self, tokenizer, batch: list[_Request], prompt_len: int, eos_ids: set[int]):
+        self.tokenizer  = tokenizer
+        self.batch      = batch
+        self.prompt_len = prompt_len
+        self.eos_ids    = eos_ids
+        self.done       = [False] * len(batch)
+        self.text       = [""] * len(batch)
+        self.early      = 0         # batch generate'i bitmeden cevabı dönen satır sayısı
+
+    def finish(self, i: int, ids) -> None:
+        req = self.batch[i]
+        self.done[i] = True
+        req.future.set_result(self.tokenizer.decode(ids, skip_special_tokens=True))
+        if req.chunks is not None:
+            req.chunks.put(None)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+        n    = input_ids.shape[1] - self.prompt_len
+        last = input_ids[:, -1].tolist()
+        for i, (req, tok) in enumerate(zip(self.batch, last)):
+            if self.done[i]:
+                continue
+            eos = tok in self.eos_ids
+            if req.chunks is not None and not eos:
+                text = self.tokenizer.decode(input_ids[i, self.prompt_len:], skip_special_tokens=True)
+                if text != self.text[i] and not text.endswith("\ufffd"):   # yarım UTF-8 karakteri bekler
+                    self.text[i] = text
+                    req.chunks.put(text)
+            if eos or n >= req.max_new_tokens:
+                self.finish(i, input_ids[i, self.prompt_len:self.prompt_len + n - eos])
+                self.early += not all(self.done)
+        return torch.tensor(self.done, device=input_ids.device)
+
+class GenerationScheduler:
+    """
+    model.generate için mikro-batch servisi (embedding.BatchingEncoder ile
+    aynı düzen). Worker ilk isteği aldıktan sonra en fazla max_wait_ms kadar
+    (veya max_batch istek dolana kadar) bekler; aynı üretim ayarlarına
+    (gen_kwargs) sahip istekler sola dolgulu tek bir generate çağrısında
+    çalışır, farklı ayarlılar sıradaki batch'e kalır. max_new_tokens farklı
+    olabilir: batch en büyüğüyle çalışır, her satırın cevabı kendi
+    sınırında ya da EOS'ta hemen döner (satır yine de batch bitene kadar
+    hesaplanır, bkz. _RowFinisher).
+    prefix_cache verilirse aynı başlıkla (prefix=) gelen istekler başlığın
+    KV cache'inden başlar; dolgu başlıkla soru arasına konur.
+    """
+    def __init__(self, model, tokenizer, max_wait_ms: float = LLM_MAX_WAIT_MS, max_batch: int = LLM_MAX_BATCH,
+                 prefix_cache: PrefixKVCache | None = None):
+        self.model     = model
+        self.tokenizer = tokenizer
+        self.prefix_cache = prefix_cache
+        self.max_wait  = max_wait_ms / 1000
+        self.max_batch = max_batch
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"       # decoder-only: yeni tokenlar hizalı başlar
+        eos = model.generation_config.eos_token_id
+        self.eos_ids   = set(eos if isinstance(eos, (list, tuple)) else [eos if eos is not None else tokenizer.eos_token_id])
+        self.requests  = 0
+        self.batches   = 0
+        self.early     = 0
+        self.prefixed  = 0                    # başlık KV cache'inden başlayan batch sayısı
+        self.timeouts  = 0                    # kuyrukta ya da üretimde zaman aşımına uğrayan stream'ler
+        self.max_depth = 0
+        self.sizes: Counter[int] = Counter()
+        self._last     = 1
+        self._held: deque[_Request] = deque()    # uyumsuz olduğu için batch'e girmeyenler
+        self._lock     = threading.Lock()
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._worker   = threading.Thread(target=self._loop, daemon=True, name="llm-batcher")
+        self._worker.start()
+
+    def submit(self, prompt: str, max_new_tokens: int = 200, stream: bool = False,
+               prefix: str | None = None, **gen_kwargs) -> _Request:
+        if self.prefix_cache is None or not (prefix and prompt.startswith(prefix) and prompt != prefix):
+            prefix = None
+        req = _Request(prompt, max_new_tokens, (prefix, *sorted(gen_kwargs.items())), gen_kwargs,
+                       prefix, Future(), queue.Queue() if stream else None, threading.Event())
+        with self._lock:
+            self.requests += 1
+            self.max_depth = max(self.max_depth, self.queue_depth() + 1)
+        self._queue.put(req)
+        return req
+
+    def generate(self, prompt: str, max_new_tokens: int = 200, **gen_kwargs) -> str:
+        return self.submit(prompt, max_new_tokens, **gen_kwargs).future.result()
+
+    def stream(self, prompt: str, max_new_tokens: int = 200, **gen_kwargs) -> Iterator[str]:
+        """
+        Şimdiye kadar üretilen metni (kümülatif) yield eder. Kuyrukta
+        LLM_QUEUE_TIMEOUT_S'den uzun bekleyen istek iptal edilir; batch'e
+        alındıktan sonra STREAM_TIMEOUT_S boyunca token gelmezse üretim
+        bırakılır. İki durumda da kullanıcıya mesaj döner, istisna değil.
+        """
+        req  = self.submit(prompt, max_new_tokens, stream=True, **gen_kwargs)
+        if not req.admitted.wait(LLM_QUEUE_TIMEOUT_S) and req.future.cancel():
+            self._timed_out()
+            yield LLM_BUSY_MESSAGE
+            return
+        text = ""
+        while True:
+            try:
+                chunk = req.chunks.get(timeout=STREAM_TIMEOUT_S)
+            except queue.Empty:
+                self._timed_out()
+                yield f"{text}\n\n{LLM_TIMEOUT_MESSAGE}" if text else LLM_TIMEOUT_MESSAGE
+                return
+            if chunk is None:
+                break
+            text = chunk
+            yield text
+        final = req.future.result()
+        if final != text:
+            yield final
+
+    def _timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() + len(self._held)
+
+    def stats(self) -> dict:
+        """Kuyruk derinliği ve batch boyutu metrikleri."""
+        with self._lock:
+            return {"requests": self.requests, "batches": self.batches,
+                    "mean_batch": sum(k * v for k, v in self.sizes.items()) / self.batches if self.batches else 0.0,
+                    "batch_sizes": dict(sorted(self.sizes.items())),
+                    "early_exits": self.early, "prefixed_batches": self.prefixed, "timeouts": self.timeouts,
+                    "queue_depth": self.queue_depth(), "max_queue_depth": self.max_depth}
+
+    def _collect(self) -> list[_Request]:
+        batch = [self._held.popleft() if self._held else self._queue.get()]
+        key   = batch[0].key
+        held, self._held = self._held, deque()
+        for req in held:
+            (batch if req.key == key and len(batch) < self.max_batch else self._held).append(req)
+        deadline = time.perf_counter() + (self.max_wait if self._last > 1 else 0)
+        while len(batch) < self.max_batch:
+            left = deadline - time.perf_counter()
+            try:
+                req = self._queue.get(timeout=left) if left > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            (batch if req.key == key else self._held).append(req)
+        return batch
+
+    def _prefixed(self, batch: list[_Request]):
+        """
+        [başlık][dolgu][soru] girdileri + batch boyutuna çoğaltılmış cache
+        kopyası. Başlık tam prompt'un tokenlarıyla sınırda birebir örtüşmezse
+        (tokenizer sınırı birleştirdiyse) None; batch normal yoldan çalışır.
+        """
+        import torch
+        ids, cache = self.prefix_cache.get(batch[0].prefix)
+        rows = self.tokenizer([r.prompt for r in batch])["input_ids"]
+        if any(r[:len(ids)] != ids or len(r) == len(ids) for r in rows):
+            return None
+        tails = [r[len(ids):] for r in rows]
+        width = max(map(len, tails))
+        pad   = self.tokenizer.pad_token_id
+        input_ids = [ids + [pad] * (width - len(t)) + t for t in tails]
+        mask      = [[1] * len(ids) + [0] * (width - len(t)) + [1] * len(t) for t in tails]
+        inputs = {"input_ids": torch.tensor(input_ids, device=self.model.device),
+                  "attention_mask": torch.tensor(mask, device=self.model.device)}
+        return inputs, {"past_key_values": self.prefix_cache.copy(cache, len(batch))}
+
+    def _run(self, batch: list[_Request]) -> tuple[int, bool]:
+        from transformers import StoppingCriteriaList
+        prefixed = self._prefixed(batch) if batch[0].prefix else None
+        inputs, extra = prefixed or (self.tokenizer([r.prompt for r in batch], return_tensors="pt",
+                                                    padding=True).to(self.model.device), {})
+        rows   = _RowFinisher(self.tokenizer, batch, inputs["input_ids"].shape[1], self.eos_ids)
+        out    = self.model.generate(**inputs, **extra, max_new_tokens=max(r.max_new_tokens for r in batch),
+                                     pad_token_id=self.tokenizer.pad_token_id,
+                                     stopping_criteria=StoppingCriteriaList([rows]), **batch[0].gen_kwargs)
+        for i, done in enumerate(rows.done):            # EOS'u generate kendisi gördüyse
+            if not done:
+                rows.finish(i, out[i, rows.prompt_len:])
+        return rows.early, prefixed is not None
+
+    def _loop(self) -> None:
+        while True:
+            # kuyrukta beklerken iptal edilen (stream zaman aşımı) istekler atlanır
+            batch = [req for req in self._collect() if req.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            for req in batch:
+                req.admitted.set()
+            try:
+                early, prefixed = self._run(batch)
+            except Exception as e:
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+                        if req.chunks is not None:
+                            req.chunks.put(None)
+                continue
+            with self._lock:
+                self.batches  += 1
+                self.early    += early
+                self.prefixed += prefixed
+                self.sizes[len(batch)] += 1
+            self._last = len(batch)
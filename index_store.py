@@ -0,0 +1,120 @@
+# index_store.py
+#
+# FAISS indekslerinin ve embedding matrislerinin disk önbelleği.
+# Anahtar: embedder adı + metin tarifi (soru listesi veya satır metni şablonu)
+# + veri sürümü. Aynı anahtar için indeks bir kez kurulur; sonraki açılışlar
+# dosyaları memory-map ile açar, böylece birden fazla worker süreci aynı
+# sayfaları paylaşır.
+
+import hashlib
+import json
+import math
+import os
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from data_store import CACHE_DIR
+
+INDEX_DIR = os.path.join(CACHE_DIR, "index")
+
+# Satır indeksi türü: "flat" (kesin), "ivf-flat", "ivf-pq", "hnsw".
+# Seçim için bench_row_index.py'nin recall / gecikme / bellek çıktısına bakın.
+ROW_INDEX_KIND = os.environ.get("ROW_INDEX_KIND", "flat")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Anahtarlar
+def index_key(embedder_name: str, recipe, data_version: str = "") -> str:
+    """recipe: JSON'a çevrilebilir herhangi bir değer (soru listesi, şablon, …)."""
+    h = hashlib.sha256()
+    for part in (embedder_name, json.dumps(recipe, ensure_ascii=False), data_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:24]
+
+def frame_version(df: pd.DataFrame, cols) -> str:
+    """Verilen sütunların içerik hash'i (satır ekleme / değişiklikte değişir)."""
+    rows = pd.util.hash_pandas_object(df[list(cols)], index=False).to_numpy()
+    return hashlib.sha256(rows.tobytes()).hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ İndeks fabrikası (iç çarpım; vektörler L2-normalize beklenir)
+INDEX_KINDS = ("flat", "ivf-flat", "ivf-pq", "hnsw")
+
+def factory_string(kind: str, n: int, dim: int, nlist: int | None = None,
+                   pq_m: int | None = None, hnsw_m: int = 32) -> str:
+    """
+    kind → faiss.index_factory tanımı. nlist verilmezse ~4·√n;
+    pq_m verilmezse dim/8'e en yakın dim böleni (vektör başına pq_m bayt).
+    """
+    if kind == "flat":
+        return "Flat"
+    if kind == "hnsw":
+        return f"HNSW{hnsw_m}"
+    nlist = nlist or max(1, min(65536, int(4 * math.sqrt(n))))
+    if kind == "ivf-flat":
+        return f"IVF{nlist},Flat"
+    if kind == "ivf-pq":
+        pq_m = pq_m or max(m for m in range(1, dim // 8 + 1) if dim % m == 0)
+        return f"IVF{nlist},PQ{pq_m}"
+    raise ValueError(f"Bilinmeyen indeks türü: {kind!r} (seçenekler: {', '.join(INDEX_KINDS)})")
+
+def make_index(embs: np.ndarray, kind: str = "flat", train_size: int | None = None,
+               nprobe: int = 16, ef_search: int = 64, seed: int = 0, **factory_kw):
+    """
+    embs üzerinde `kind` türünde indeks kurar. IVF türleri rastgele bir
+    örneklem üzerinde eğitilir (varsayılan: 64·nlist, en az 10 000 satır).
+    """
+    n, dim = embs.shape
+    index = faiss.index_factory(dim, factory_string(kind, n, dim, **factory_kw),
+                                faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        ivf  = faiss.extract_index_ivf(index)
+        size = min(n, train_size or max(64 * ivf.nlist, 10_000))
+        rows = np.random.default_rng(seed).choice(n, size=size, replace=False) if size < n else slice(None)
+        index.train(np.ascontiguousarray(embs[rows]))
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if kind == "hnsw":
+        index.hnsw.efSearch = ef_search
+    index.add(embs)
+    return index
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Yükle veya kur
+def _paths(cache_dir: str, key: str) -> tuple[str, str]:
+    return os.path.join(cache_dir, f"{key}.faiss"), os.path.join(cache_dir, f"{key}.npy")
+
+def load_index(key: str, cache_dir: str = INDEX_DIR):
+    """Kayıtlı (index, embs) çiftini mmap ile açar; yoksa None."""
+    idx_path, emb_path = _paths(cache_dir, key)
+    if not (os.path.exists(idx_path) and os.path.exists(emb_path)):
+        return None
+    return faiss.read_index(idx_path, faiss.IO_FLAG_MMAP), np.load(emb_path, mmap_mode="r")
+
+def save_index(key: str, index, embs: np.ndarray, cache_dir: str = INDEX_DIR) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    idx_path, emb_path = _paths(cache_dir, key)
+    sfx = f".{os.getpid()}.tmp"                   # eşzamanlı worker'lar birbirini ezmesin
+    with open(emb_path + sfx, "wb") as f:
+        np.save(f, embs)
+    faiss.write_index(index, idx_path + sfx)
+    os.replace(emb_path + sfx, emb_path)
+    os.replace(idx_path + sfx, idx_path)
+
+def load_or_build(key: str, encode, cache_dir: str = INDEX_DIR, kind: str = "flat", **index_kw):
+    """
+    (index, embs) döner. Kayıt yoksa encode() ile embedding'ler üretilir,
+    L2-normalize edilip `kind` türünde indekse eklenir ve diske yazılır.
+    Farklı türler aynı embedding'leri paylaşmaz; her biri ayrı anahtardır.
+    """
+    if kind != "flat" or index_kw:
+        key = index_key(kind, index_kw, key)
+    cached = load_index(key, cache_dir)
+    if cached is not None:
+        return cached
+    embs = np.ascontiguousarray(encode(), dtype="float32")
+    faiss.normalize_L2(embs)
+    index = make_index(embs, kind, **index_kw)
+    save_index(key, index, embs, cache_dir)
+    return index, embs
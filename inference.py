@@ -1,42 +1,14 @@
-import re
-import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
 from peft import PeftModel
-from rag_utils import df, idx_q, qa_map, embedder_q, rag_answer as _rag_answer
+from rag_utils import (df, rag_answer as _rag_answer,
+                       NO_ANSWER, FALLBACK_MAX_NEW_TOKENS, fallback_prompt)
+from date_extract import extract_date
+from generation import GenerationScheduler
 
 # ——————————————————————————————————————
-# 1️⃣ Türkçe ay adlarını normalize etmek için yardımcı fonksiyon
-turkish_months = {
-    "ocak":   "January",   "şubat":  "February", "mart":    "March",
-    "nisan":  "April",     "mayıs":  "May",      "haziran": "June",
-    "temmuz": "July",      "ağustos":"August",   "eylül":   "September",
-    "ekim":   "October",   "kasım":  "November", "aralık":  "December"
-}
-
-def normalize_date_str(s: str) -> str | None:
-    """
-    Gelen ham metni temizler, Türkçe ay adlarını İngilizce'ye çevirir,
-    dayfirst=True ile ISO veya gg-aa-yyyy formatlarını parse eder,
-    None dönerse parse edilememiş demektir.
-    """
-    s_clean = re.sub(r"[\,\.]", "", s.strip().lower())
-    for tr, en in turkish_months.items():
-        if tr in s_clean:
-            s_clean = s_clean.replace(tr, en.lower())
-            break
-    dt = pd.to_datetime(s_clean, dayfirst=True, errors="coerce")
-    return dt.date().isoformat() if not pd.isna(dt) else None
-
-def extract_date(user_q: str) -> str | None:
-    """
-    Soru içinden önce YYYY-MM-DD veya DD-MM-YYYY'yi yakalar,
-    bulamazsa tüm metni normalize_date_str ile dener.
-    """
-    m = re.search(r"(\d{4}-\d{2}-\d{2})|(\d{2}-\d{2}-\d{4})", user_q)
-    if m:
-        return normalize_date_str(m.group(0))
-    return normalize_date_str(user_q)
+# 1️⃣ Tarih çıkarma: date_extract.extract_date (tek derlenmiş desen;
+#    sorunun tamamı pd.to_datetime ile parse edilmez)
 
 # ——————————————————————————————————————
 # 2️⃣ Tokenizer’ı yükle
@@ -68,6 +40,10 @@ model = PeftModel.from_pretrained(
 )
 model.eval()
 
+# Eşzamanlı kullanıcıların LLM fallback'leri tek generate batch'inde çalışır
+# (LLM_MAX_BATCH / LLM_MAX_WAIT_MS); metrikler: scheduler.stats()
+scheduler = GenerationScheduler(model, tokenizer)
+
 # ——————————————————————————————————————
 # 5️⃣ generate_answer: app.py’in çağıracağı fonksiyon
 def generate_answer(user_question: str) -> str:
@@ -77,11 +53,26 @@ def generate_answer(user_question: str) -> str:
     3) Eşleşme yetersizse LLM fallback ile cevap üret
     """
     date = extract_date(user_question)
-    return _rag_answer(
+    out  = _rag_answer(
         user_question,
         df,
-        model=model,
-        tokenizer=tokenizer,
         threshold=0.65,
         date=date
     )
+    if out != NO_ANSWER:
+        return out
+    return scheduler.generate(fallback_prompt(user_question), FALLBACK_MAX_NEW_TOKENS)
+
+# ——————————————————————————————————————
+# 6️⃣ stream_answer: aynı yol, LLM fallback'e düşerse tokenlar geldikçe yield eder
+def stream_answer(user_question: str):
+    """
+    Kurallar / FAISS / planlayıcı cevabı tek parça yield edilir; hiçbiri
+    cevaplayamazsa LLM çıktısı birikerek (kümülatif metin) yield edilir.
+    """
+    date = extract_date(user_question)
+    out  = _rag_answer(user_question, df, threshold=0.65, date=date)
+    if out != NO_ANSWER:
+        yield out
+        return
+    yield from scheduler.stream(fallback_prompt(user_question), FALLBACK_MAX_NEW_TOKENS)
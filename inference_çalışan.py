@@ -1,26 +1,17 @@
 # inference.py
 
 import re
-import pandas as pd
 import torch
-import faiss
 from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
 from peft import PeftModel
 
 # Static QA + retrieval için
-from rag_utils import df, idx_q, qa_map, embedder_q, rag_answer as _rag_answer, extract_date
-
-# ─────────────────────────────────────────────────────────────────────────────
-# 0️⃣ Asistan meta‐bilgileri
-ASSISTANT_NAME    = "MakineTitreşimAsistanı"
-ASSISTANT_PURPOSE = (
-    "Bu asistanın amacı, endüstriyel makinelerin titreşim verilerini "
-    "analiz ederek sorularınıza doğrudan ve anlaşılır cevaplar vermektir."
-)
-SYSTEM_PREFIX = (
-    f"Asistan: {ASSISTANT_NAME}\n"
-    f"Amacı: {ASSISTANT_PURPOSE}\n"
-)
+from rag_utils import df, embedder_q, query_embeddings, EMBEDDER_KEY, rag_answer as _rag_answer, extract_date, extract_period
+from dataset import dataset_for
+from retrieval_corpus import build_corpus_index
+from generation import GenerationScheduler, PrefixKVCache
+# Asistan meta-bilgileri ve sabit prompt başlığı
+from prompts import SYSTEM_PREFIX, CONTEXT_HEADER, prompt_prefix
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1️⃣ Tokenizer’ı yükle
@@ -29,6 +20,7 @@ tokenizer = AutoTokenizer.from_pretrained(
     use_fast=True
 )
 tokenizer.pad_token = tokenizer.eos_token
+MAX_NEW_TOKENS = 1000
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 2️⃣ Base model 8-bit olarak yükle
@@ -49,29 +41,26 @@ model = PeftModel.from_pretrained(
 )
 model.eval()
 
+# Eşzamanlı kullanıcıların prompt'ları tek generate batch'inde çalışır
+# (LLM_MAX_BATCH / LLM_MAX_WAIT_MS); metrikler: scheduler.stats()
+# Ortak başlığın KV cache'i bir kez hesaplanır, sadece soruya özgü kısım prefill edilir
+scheduler = GenerationScheduler(model, tokenizer, prefix_cache=PrefixKVCache(model, tokenizer))
+
 # ─────────────────────────────────────────────────────────────────────────────
-# 4️⃣ Satır-temelli FAISS index — dynamic context için
-row_texts = df.apply(
-    lambda r: f"Tarih: {r['date']}, Durum: {r['Situation']}, Değer: {r['Value']:.2f}",
-    axis=1
-).tolist()
-row_embs = embedder_q.encode(row_texts, convert_to_numpy=True)
-faiss.normalize_L2(row_embs)
-row_idx = faiss.IndexFlatIP(row_embs.shape[1])
-row_idx.add(row_embs)
+# 4️⃣ Segment / gün özeti FAISS index — dynamic context için
+# Embedding'ler diske yazılır; veri değişmedikçe sonraki açılışlar mmap ile okur
+row_corpus = build_corpus_index(df, embedder_q, EMBEDDER_KEY)
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 5️⃣ generate_answer: app.py’in çağıracağı fonksiyon
-def generate_answer(user_question: str) -> str:
+# 5️⃣ build_prompt: LLM'e gidecek prompt'u ya da static QA cevabını döner
+def build_prompt(user_question: str) -> tuple[str | None, str | None]:
+    """(prompt, None) → LLM üretecek; (None, cevap) → static QA cevabı hazır."""
     # (1) normalize “makine” → “RTF makinesi”
     q_norm = re.sub(r"\bmakine\b", "RTF makinesi", user_question, flags=re.IGNORECASE)
 
     # (2) veri‐ilgili değilse → direkt LLM
     if not re.search(r"\b(makine|titreşim|alarm|rtf)\b", q_norm, flags=re.IGNORECASE):
-        prompt = SYSTEM_PREFIX + "\n" + f"Soru: {q_norm}\nCevap:"
-        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-        out    = model.generate(**inputs, max_new_tokens=1000)
-        return tokenizer.decode(out[0], skip_special_tokens=True)
+        return SYSTEM_PREFIX + "\n" + f"Soru: {q_norm}\nCevap:", None
 
     # (3a) veri‐ilgili ise önce static QA
     date = extract_date(q_norm)
@@ -86,21 +75,36 @@ def generate_answer(user_question: str) -> str:
 
     # (3b) fallback
     if any(tok in ans for tok in ["Cevap bulunamadı", "Lütfen sorunuzda", "Tam olarak anlayamadım"]):
-        ue = embedder_q.encode([q_norm], convert_to_numpy=True)
-        faiss.normalize_L2(ue)
-        D_rows, I_rows = row_idx.search(ue, 5)
-        context = "\n".join(row_texts[i] for i in I_rows[0])
+        ue = query_embeddings.encode(q_norm)      # rag_answer'da encode edildiyse önbellekten
+        # soruda tarih / dönem varsa sadece o günlerin segment ve özetleri aranır
+        period  = extract_period(q_norm, year=dataset_for(df).end.year, today=dataset_for(df).end) or (None, None)
+        context = row_corpus.context(ue, 5, *period)
 
         prompt = (
             SYSTEM_PREFIX
-            + "\nAşağıda RTF makinesi titreşim verileri var:\n"
-            f"{context}\n\n"
+            + "\n" + CONTEXT_HEADER
+            + f"{context}\n\n"
             f"Soru: {q_norm}\n"
             "Bu verilere dayanarak cevap verin:"
         )
-        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-        out    = model.generate(**inputs, max_new_tokens=1000)
-        return tokenizer.decode(out[0], skip_special_tokens=True)
+        return prompt, None
 
     # (3c) static QA cevabı
-    return ans
+    return None, ans
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 6️⃣ generate_answer: app.py’in çağıracağı fonksiyon (sadece yeni tokenlar decode edilir)
+def generate_answer(user_question: str) -> str:
+    prompt, ans = build_prompt(user_question)
+    if prompt is None:
+        return ans
+    return scheduler.generate(prompt, MAX_NEW_TOKENS, prefix=prompt_prefix(prompt))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 7️⃣ stream_answer: Gradio generator handler'ları için; LLM çıktısı birikerek yield edilir
+def stream_answer(user_question: str):
+    prompt, ans = build_prompt(user_question)
+    if prompt is None:
+        yield ans
+        return
+    yield from scheduler.stream(prompt, MAX_NEW_TOKENS, prefix=prompt_prefix(prompt))
@@ -0,0 +1,80 @@
+# intent_index.py
+#
+# Çok vektörlü niyet (intent) indeksi: her qa_map girdisi için kanonik soru
+# + Chatbot_Sorular_Varyantlar*.csv'deki etiketli paraphrase'ler ayrı
+# vektörler olarak tutulur. Bir sorunun niyet skoru, o niyetin vektörleri
+# arasındaki en yüksek benzerliktir (max aggregation).
+
+import glob
+import os
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from index_store import INDEX_DIR, index_key, load_or_build
+
+PARAPHRASE_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Chatbot_Sorular_Varyantlar*.csv")
+
+def load_paraphrases(pattern: str = PARAPHRASE_FILES) -> pd.DataFrame:
+    """(soru_no, text) tablosu; tüm CSV'lerden, tekrarsız."""
+    files = sorted(glob.glob(pattern))
+    if not files:
+        return pd.DataFrame({"soru_no": pd.Series(dtype="int64"), "text": pd.Series(dtype=str)})
+    d = pd.concat([pd.read_csv(f, usecols=["Soru No", "Soru"]) for f in files]).dropna()
+    d = d.rename(columns={"Soru No": "soru_no", "Soru": "text"})
+    d["text"] = d["text"].astype(str).str.strip()
+    return d.drop_duplicates("text", ignore_index=True).astype({"soru_no": "int64"})
+
+class IntentIndex:
+    def __init__(self, index, intent_of: np.ndarray, n_intents: int):
+        self.index     = index
+        self.intent_of = np.asarray(intent_of)
+        self.n_intents = n_intents
+
+    @classmethod
+    def from_embeddings(cls, embs: np.ndarray, intent_of, n_intents: int) -> "IntentIndex":
+        embs = np.ascontiguousarray(embs, dtype="float32")
+        faiss.normalize_L2(embs)
+        index = faiss.IndexFlatIP(embs.shape[1])
+        index.add(embs)
+        return cls(index, intent_of, n_intents)
+
+    def scores(self, q: np.ndarray) -> np.ndarray:
+        """Niyet başına en yüksek benzerlik (vektörü olmayan niyet -inf)."""
+        D, I = self.index.search(q, self.index.ntotal)
+        out = np.full(self.n_intents, -np.inf, dtype="float32")
+        np.maximum.at(out, self.intent_of[I[0]], D[0])
+        return out
+
+    def top(self, q: np.ndarray, n: int = 1) -> list[tuple[float, int]]:
+        """En yüksek skorlu n niyet: [(skor, qa_map konumu), …]."""
+        s = self.scores(q)
+        best = np.argsort(-s, kind="stable")[:n]
+        return [(float(s[i]), int(i)) for i in best]
+
+    def best(self, q: np.ndarray) -> tuple[float, int]:
+        return self.top(q, 1)[0]
+
+def intent_texts(questions: list[str], paraphrases: pd.DataFrame, soru_no: dict) -> tuple[list[str], list[int]]:
+    """
+    Kanonik sorular + qa_map'te karşılığı olan paraphrase'ler (soru_no →
+    qa_map konumu). Karşılığı olmayan Soru No'lar atlanır.
+    """
+    texts, intents = list(questions), list(range(len(questions)))
+    seen = set(texts)
+    for no, text in zip(paraphrases["soru_no"], paraphrases["text"]):
+        if no in soru_no and text not in seen:
+            seen.add(text)
+            texts.append(text)
+            intents.append(soru_no[no])
+    return texts, intents
+
+def build_intent_index(questions: list[str], embedder, embedder_key: str, soru_no: dict,
+                       paraphrases: pd.DataFrame | None = None, cache_dir: str = INDEX_DIR) -> IntentIndex:
+    """Embedding'ler index_store ile diske yazılır; metinler değişmedikçe mmap ile açılır."""
+    paraphrases = load_paraphrases() if paraphrases is None else paraphrases
+    texts, intents = intent_texts(questions, paraphrases, soru_no)
+    index, _ = load_or_build(index_key(embedder_key, texts),
+                             lambda: embedder.encode(texts, convert_to_numpy=True), cache_dir)
+    return IntentIndex(index, intents, len(questions))
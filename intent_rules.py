@@ -0,0 +1,63 @@
+# intent_rules.py
+#
+# Kural tabanlı ön yönlendirmeler için tek geçişli dispatcher. Her kural bir
+# regex + handler'dır; tüm kurallar import anında tek bir derlenmiş desende
+# birleştirilir:
+#
+#   ^(?=(?s:.*?)(?P<r0>…))?(?=(?s:.*?)(?P<r1>…))?…
+#
+# Her kural isteğe bağlı bir lookahead olduğundan tek bir match çağrısı hangi
+# kuralların soruda geçtiğini (re.search ile aynı, en soldaki eşleşme) verir.
+# Handler'lar kayıt sırasıyla denenir; None dönen handler sıradakine bırakır.
+
+import re
+from typing import Callable
+
+_GROUP = re.compile(r"\(\?P<(\w+)>")
+
+class RuleDispatcher:
+    def __init__(self, flags: int = re.IGNORECASE):
+        self.flags  = flags
+        self._rules: list[tuple[str, str, list[str], Callable]] = []
+        self._regex = None
+
+    def register(self, name: str, pattern: str):
+        """
+        Dekoratör: handler(groups, user_q, df) -> str | None. groups kuralın
+        adlandırılmış gruplarıdır (adlar kurallar arasında çakışabilir).
+        """
+        def deco(fn: Callable) -> Callable:
+            prefix = f"r{len(self._rules)}_"
+            names  = _GROUP.findall(pattern)
+            self._rules.append((name, _GROUP.sub(rf"(?P<{prefix}\1>", pattern), names, fn))
+            self._regex = None                    # sonraki dispatch'te yeniden derlenir
+            return fn
+        return deco
+
+    @property
+    def regex(self) -> re.Pattern:
+        if self._regex is None:
+            self._regex = re.compile(
+                "^" + "".join(f"(?=(?s:.*?)(?P<r{i}>{p}))?" for i, (_, p, _, _) in enumerate(self._rules)),
+                self.flags)
+        return self._regex
+
+    @property
+    def names(self) -> list[str]:
+        return [name for name, *_ in self._rules]
+
+    def match(self, user_q: str) -> list[tuple[str, dict]]:
+        """Soruda geçen kurallar, kayıt sırasıyla: [(ad, grupları), …]."""
+        m = self.regex.match(user_q)
+        return [(name, {g: m.group(f"r{i}_{g}") for g in groups})
+                for i, (name, _, groups, _) in enumerate(self._rules) if m.group(f"r{i}") is not None]
+
+    def dispatch(self, user_q: str, df) -> str | None:
+        m = self.regex.match(user_q)
+        for i, (_, _, groups, fn) in enumerate(self._rules):
+            if m.group(f"r{i}") is None:
+                continue
+            out = fn({g: m.group(f"r{i}_{g}") for g in groups}, user_q, df)
+            if out is not None:
+                return out
+        return None
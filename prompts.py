@@ -0,0 +1,27 @@
+# prompts.py
+#
+# LLM prompt'larının tüm isteklerde aynı olan başlığı. inference varyantları
+# ve bench_prefix_cache.py aynı metni kullanır; PrefixKVCache anahtarı bu
+# metin olduğu için başlık tek yerde tanımlanır.
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 0️⃣ Asistan meta‐bilgileri
+ASSISTANT_NAME    = "MakineTitreşimAsistanı"
+ASSISTANT_PURPOSE = (
+    "Bu asistanın amacı, endüstriyel makinelerin titreşim verilerini "
+    "analiz ederek sorularınıza doğrudan ve anlaşılır cevaplar vermektir."
+)
+SYSTEM_PREFIX = (
+    f"Asistan: {ASSISTANT_NAME}\n"
+    f"Amacı: {ASSISTANT_PURPOSE}\n"
+)
+CONTEXT_HEADER = "Aşağıda RTF makinesi titreşim verileri var:\n"
+
+def prompt_prefix(prompt: str) -> str:
+    """
+    Prompt'un tüm isteklerde aynı olan başlığı (KV cache'i yeniden kullanılır).
+    Her çağrıda güncel metinden kurulur; SYSTEM_PREFIX değişirse cache de
+    yeni metinle yeniden hesaplanır.
+    """
+    head = SYSTEM_PREFIX + "\n"
+    return head + CONTEXT_HEADER if prompt.startswith(head + CONTEXT_HEADER) else head
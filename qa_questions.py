@@ -0,0 +1,54 @@
+# qa_questions.py
+#
+# Sabit soru listesi: (kanonik soru, rag_utils'teki cevap fonksiyonunun adı).
+# Sıra qa_map sırasıdır (niyet = listedeki konum). Veri / model yüklemez;
+# bench'ler ve rag_utils aynı listeyi buradan import eder.
+
+import re
+
+QA_QUESTIONS = [
+    ("Makinenin en fazla arıza yaptığı tarih aralığını verebilir misin?",          "answer_q1"),
+    ("Geçmişte sarı alarm seviyesinde en çok hangi tarihlerde görüldü?",           "answer_q2"),
+    ("Geçmişte kırmızı alarm seviyesinde en çok hangi tarihlerde görüldü?",        "answer_q3"),
+    ("Makine performansındaki dalgalanmalar hakkında bilgi verebilir misin?",      "answer_q4"),
+    ("2023 aralığında makinede kaç kez alarm durumu oluştu?",                      "answer_q5"),
+    ("Makine hangi değerlerde sarı alarma geçiyor?",                               "answer_q6"),
+    ("Makine hangi değerlerde kırmızı alarma geçiyor?",                            "answer_q7"),
+    ("… tarihinde RTF makinesinin değer aralığı neydi?",                           "answer_q8"),
+    ("… tarihinde RTF makinesinin renk seviyesi neydi?",                           "answer_q9"),
+    ("… tarihinde makine performansı hakkında bilgi alabilir miyim?",              "answer_q10"),
+    ("RTF makinesi 2023 aralığında turuncu alarm seviyesinde çalıştığı tarihler?", "answer_q11"),
+    ("2023 yılında makine performansı nasıldı?",                                   "answer_q12"),
+    ("Son bir yıl içinde makine hangi günlerde tamamen durdu?",                    "answer_q13"),
+    ("Kırmızı seviyede çalıştığı tarihlerde makine tamamen durdu mu?",             "answer_q14"),
+    ("15 Ocak 2023’ten itibaren yeşil alarmda çalışılan toplam süre nedir?",       "answer_q15"),
+    ("Son üç ayda sarı alarm seviyesinde kaç gün çalıştı?",                        "answer_q16"),
+    ("Son üç ayda turuncu alarm seviyesinde kaç gün çalıştı?",                     "answer_q17"),
+    ("Son üç ayda yeşil alarm seviyesinde kaç gün çalıştı?",                       "answer_q18"),
+    ("Son üç ayda kırmızı alarm seviyesinde kaç gün çalıştı?",                     "answer_q19"),
+    ("Yeşilden direkt kırmızıya geçiş yapan günler hangileri?",                    "answer_q20"),
+    ("Hangisi renk değişimlerinin en düzenli olduğu tarihler?",                    "answer_q21"),
+    ("Makine, son bir yılda hangi aylarda daha çok yeşildi?",                      "answer_q22"),
+    ("Makine performansının zaman içindeki değişimi nasıl oldu?",                  "answer_q23"),
+    ("Renk değişimlerinin yoğun olduğu dönemler hangi tarihler?",                  "answer_q24"),
+    ("En düşük arıza oranı hangi tarihlerde?",                                     "answer_q25"),
+    ("En fazla performans değişikliği hangi ayda oldu?",                           "answer_q26"),
+    ("Her yılın ortalama performansı nedir?",                                      "answer_q27"),
+    ("Yeşilden kırmızıya kaç kez geçiş yapıldı?",                                  "answer_q28"),
+    ("Son bir ayda hangi renk aralıklarında çalıştı?",                             "answer_q29"),
+    ("En yüksek değerlerde alarm verdiği günler hangileri?",                       "answer_q30"),
+    ("Makine iyileştirme önerileri nelerdir?",                                     "answer_q31"),
+    ("Makinenin performansını ne etkileyebilir?",                                  "answer_q32"),
+    ("Tüm kırmızı günleri listele",                                                "answer_all_red_dates"),
+    ("Makine turuncu alarm seviyesinde çalıştığı aralıkları verebilir misin?",     "answer_q_orange_intervals"),
+    ("Makine sarı alarm seviyesinde çalıştığı aralıkları verebilir misin?",        "answer_q_yellow_intervals"),
+    ("Makine yeşil alarm seviyesinde çalıştığı aralıkları verebilir misin?",       "answer_q_green_intervals"),
+    ("Makine kırmızı alarm seviyesinde çalıştığı aralıkları verebilir misin?",     "answer_q_red_intervals"),
+    ("… ile … tarihleri arasında ortalama titreşim neydi?",                        "answer_range_mean"),
+    ("… ile … tarihleri arasında maksimum titreşim neydi?",                        "answer_range_max"),
+    ("… ile … tarihleri arasında makine performansı nasıldı?",                     "answer_range_stats"),
+]
+
+# CSV'lerdeki "Soru No" N ↔ answer_qN → qa_map konumu
+SORU_NO = {int(fn[len("answer_q"):]): i for i, (_, fn) in enumerate(QA_QUESTIONS)
+           if re.fullmatch(r"answer_q\d+", fn)}
@@ -0,0 +1,293 @@
+# query_planner.py
+#
+# Sabit qa_map sorularına uymayan sorular için küçük bir sorgu planlayıcı.
+# Soru renk filtresi, zaman penceresi, metrik ve gruplamadan oluşan bir
+# Plan'a çevrilir ve dataset'in hazır özetleri (günlük tablo, ay küpü,
+# aralık istatistikleri, segmentler) üzerinde çalıştırılır. Zaman penceresi
+# date_extract ile verinin son gününe göre çözülür:
+#
+#   "geçen ay kaç saat sarıydı"           → YELLOW, geçen ay, hours
+#   "Mayıs'ta en yüksek değer hangi gün"  → -, Mayıs, max, gün, en yüksek
+#
+# Planlanamayan (desteklenmeyen ifade, birden fazla renk, metrik yok,
+# çözülemeyen göreli dönem) soru için None döner ve soru LLM fallback'e devam
+# eder; "son birkaç günde" gibi bir soru tüm veri için cevaplanmaz.
+
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from data_store import LEVEL_NAMES, GREEN, YELLOW, ORANGE, RED, day_ordinal, day_str, days_str, months_str
+from dataset import dataset_for
+from date_extract import NUMBER_PATTERN, extract_period, number_value
+from lexical_router import casefold_tr
+
+COLORS   = {"yeşil": GREEN, "sarı": YELLOW, "turuncu": ORANGE, "kırmızı": RED}
+
+class Plan(NamedTuple):
+    level:     int | None                 # renk filtresi (seviye kodu)
+    window:    tuple[int, int] | None     # (ilk gün, son gün) gün sayısı, None → tüm veri
+    metric:    str                        # minutes, hours, days, months, episodes, share,
+                                          # mean, max, min, std, spread, levels
+    group:     str | None = None          # day, month, year
+    order:     str | None = None          # max, min, last, first, present, absent
+    top:       int = 1
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Ayrıştırma
+_COLOR_RE   = re.compile(rf"\b({'|'.join(COLORS)})")
+_FIRST_N_RE = re.compile(rf"\bilk\s+({NUMBER_PATTERN})\s+(gün|hafta|ay)")
+# "son … gün / hafta / ay / yıl": date_extract çözemezse pencere bilinmiyor demektir
+_RELATIVE_RE = re.compile(r"\bson\s+(?!(?:olarak|hangi|kez|kere|defa)\b)\w+(?:\s+\w+)?\s+(?:gün|hafta|ay|yıl)")
+_UNSUPPORTED_RE = re.compile(r"geçiş|mm/s|üzeri|altında|\bfark|neden|niçin|öner|bakım|tahmin|sebep|\bayın\s+\d")
+
+_METRIC_RES = [
+    ("levels",   re.compile(r"hangi\s+(?:alarm\s+)?(?:seviye|renk)")),
+    ("hours",    re.compile(r"kaç\s+saat|\bsüre")),
+    ("minutes",  re.compile(r"kaç\s+dakika")),
+    ("months",   re.compile(r"kaç\s+ay\b")),
+    ("days",     re.compile(r"kaç\s+gün|gün\s+sayısı")),
+    ("episodes", re.compile(r"kaç\s+(?:kez|kere|defa|sefer)")),
+    ("share",    re.compile(r"yüzde|\boran")),
+    ("spread",   re.compile(r"dalgalanma|\bmax\s*[–-]\s*min")),
+    ("std",      re.compile(r"standart\s+sapma|\bstd\b")),
+    ("mean",     re.compile(r"ortalama")),
+    ("max",      re.compile(r"\ben\s+yüksek|maksimum|\bmax\b|\ben\s+büyük|\bzirve")),
+    ("min",      re.compile(r"\ben\s+düşük|minimum|\bmin\b|\ben\s+küçük")),
+]
+_VALUE_RE   = re.compile(r"değer|titreşim|ortalama|sapma")
+_GROUP_RES  = [
+    ("day",   re.compile(r"hangi\s+(?:gün|tarih)|(?:gün|tarih)\w*\s+hangi|günlük\s+bazda")),
+    ("month", re.compile(r"hangi\s+ay|aylar\w*\s+hangi")),
+    ("year",  re.compile(r"hangi\s+yıl")),
+]
+_PLURAL_RE  = re.compile(r"hangi\s+(?:gün|tarih|ay|yıl)\w*l[ae]r|l[ae]r\w*\s+hangi")
+_MAX_RE     = re.compile(rf"\ben\s+(?:çok|fazla|yüksek|uzun|büyük|{'|'.join(COLORS)})|\bdaha\s+(?:çok|fazla)|maksimum")
+_MIN_RE     = re.compile(r"\ben\s+(?:az|düşük|kısa|küçük)|\bdaha\s+az|minimum")
+_LAST_RE    = re.compile(r"\ben\s+son|\bson\s+olarak")
+_FIRST_RE   = re.compile(r"\bilk\s+(?:kez|kere|defa|olarak)|\ben\s+erken")
+_ABSENT_RE  = re.compile(r"\bhiç\b")
+
+class QueryPlanner:
+    def plan(self, user_q: str, df: pd.DataFrame) -> Plan | None:
+        q = casefold_tr(user_q)
+        if _UNSUPPORTED_RE.search(q):
+            return None
+        colors = set(_COLOR_RE.findall(q))
+        if len(colors) > 1:
+            return None
+        level  = COLORS[colors.pop()] if colors else None
+        metric = next((name for name, rx in _METRIC_RES if rx.search(q)), None)
+        group  = next((name for name, rx in _GROUP_RES if rx.search(q)), None)
+        order  = ("last" if _LAST_RE.search(q) else "first" if _FIRST_RE.search(q)
+                  else "max" if _MAX_RE.search(q) else "min" if _MIN_RE.search(q) else None)
+
+        if metric in ("max", "min") and not (_VALUE_RE.search(q) or level is None):
+            metric = None                     # "en çok sarı" → süre; aşağıda minutes olur
+        if metric is None and level is not None and (group or order):
+            metric = "minutes"
+        if metric is None:
+            return None
+        if metric in ("max", "min", "mean", "std") and group and order is None:
+            order = metric if metric in ("max", "min") else "max"
+        if group and order is None:
+            if level is None:
+                return None
+            order = "absent" if _ABSENT_RE.search(q) else "present"
+        if group is None and order in ("last", "first") and level is not None:
+            group = "day"
+        if level is None and metric in ("minutes", "hours", "days", "months", "episodes", "share"):
+            return None
+        if metric in ("levels", "spread") and (group or metric == "spread" and level is not None):
+            return None
+
+        window = self.window(q, user_q, dataset_for(df))
+        if window is False:
+            return None
+        top = 3 if group and order in ("max", "min") and _PLURAL_RE.search(q) else 1
+        return Plan(level, window, metric, group, order, top)
+
+    def window(self, q: str, user_q: str, ds) -> tuple[int, int] | None | bool:
+        """
+        (ilk gün, son gün); pencere yoksa None. Veri boşsa veya soru
+        çözülemeyen bir göreli dönem içeriyorsa False.
+        """
+        if pd.isna(ds.end):
+            return False
+        p = extract_period(user_q, today=ds.end)
+        if p is None:
+            return False if _RELATIVE_RE.search(q) else None
+        first, last = day_ordinal(p[0]), day_ordinal(p[1])
+        m = _FIRST_N_RE.search(q)
+        if m:
+            # "2023'ün ilk 6 ayı" → pencerenin başından itibaren
+            n = number_value(m.group(1))
+            start = pd.Timestamp(p[0])
+            stop  = start + (pd.DateOffset(months=n) if m.group(2) == "ay" else pd.Timedelta(days=n * (7 if m.group(2) == "hafta" else 1)))
+            last  = min(last, day_ordinal(stop) - 1)
+        return first, last
+
+    # ─────────────────────────────────────────────────────────────────────
+    # 2️⃣ Çalıştırma
+    def answer(self, user_q: str, df: pd.DataFrame) -> str | None:
+        p = self.plan(user_q, df)
+        return None if p is None else self.execute(p, df)
+
+    def execute(self, p: Plan, df: pd.DataFrame) -> str | None:
+        ds    = dataset_for(df)
+        label = _label(p.window)
+        daily = ds.daily if p.window is None else ds.daily.loc[p.window[0]:p.window[1]]
+        if daily.empty:
+            return f"{label} veri bulunamadı."
+        col  = None if p.level is None else LEVEL_NAMES[p.level].lower()
+        word = None if p.level is None else next(w for w, l in COLORS.items() if l == p.level)
+
+        if p.metric == "levels":
+            minutes = daily[["green", "yellow", "orange", "red"]].sum()
+            if p.order in ("max", "min"):
+                name = minutes.idxmax() if p.order == "max" else minutes.idxmin()
+                return (f"{label} makine en {'uzun' if p.order == 'max' else 'kısa'} süre "
+                        f"{name.capitalize()} seviyesinde kalmıştır ({int(minutes[name])} dakika).")
+            seen = [n.capitalize() for n, v in minutes.items() if v > 0]
+            return f"{label} görülen alarm seviyeleri: {', '.join(seen)}."
+
+        if p.group is None:
+            v = self._scalar(p, ds, daily, col)
+            if v is None or (isinstance(v, float) and np.isnan(v)):
+                return f"{label} veri bulunamadı."
+            if p.metric in VALUE_DESC:
+                where = f"{word} seviyedeki " if word else ""
+                return f"{label} {where}{VALUE_DESC[p.metric]} {v:.2f} mm/s."
+            if p.metric == "days":
+                return f"{label} makine toplam {v} farklı günde {word} alarm seviyesinde çalışmıştır."
+            if p.metric == "months":
+                return f"{label} makine {v} ay boyunca {word} durum göstermiştir."
+            if p.metric == "episodes":
+                return f"{label} makine {v} kez {word} alarm seviyesine geçmiştir."
+            if p.metric == "share":
+                return f"{label} sürenin %{v:.1f}'i {word} alarm seviyesinde geçmiştir."
+            return f"{label} makine {_fmt(p.metric, v)} {word} alarm seviyesinde çalışmıştır."
+
+        s = self._grouped(p, ds, daily, col)
+        if s is None:
+            return None
+        unit, units = GROUP_UNITS[p.group]
+        if p.order in ("present", "absent"):
+            keys = s.index[s > 0] if p.order == "present" else s.index[s == 0]
+            if not len(keys):
+                return f"{label} {word} durumun {'görüldüğü' if p.order == 'present' else 'hiç görülmediği'} {unit} yok."
+            verb = "görüldüğü" if p.order == "present" else "hiç görülmediği"
+            return f"{label} {word} durumun {verb} {units}: {', '.join(_keys(p.group, keys))}."
+        if p.order in ("last", "first"):
+            keys = s.index[s > 0]
+            if not len(keys):
+                return f"{label} {word} durum görülmemiş."
+            key = keys[-1] if p.order == "last" else keys[0]
+            which = "en son" if p.order == "last" else "ilk"
+            return f"{label} {word} durumun {which} görüldüğü {unit}: {_keys(p.group, [key])[0]}."
+        s = s.dropna()
+        if word:
+            s = s[s > 0] if p.order == "max" else s
+        if s.empty:
+            return f"{label} veri bulunamadı."
+        best = s.nlargest(p.top) if p.order == "max" else s.nsmallest(p.top)
+        what = VALUE_GEN[p.metric] if p.metric in VALUE_GEN else f"{word} alarm süresinin"
+        where = f"{word} seviyedeki " if word and p.metric in VALUE_GEN else ""
+        keys = ", ".join(f"{k} ({_fmt(p.metric, v)})" for k, v in zip(_keys(p.group, best.index), best))
+        return (f"{label} {where}{what} en {'yüksek' if p.order == 'max' else 'düşük'} "
+                f"olduğu {units if p.top > 1 else unit}: {keys}.")
+
+    @staticmethod
+    def _rows(ds, window) -> tuple[int, int]:
+        return (0, ds.n_rows) if window is None else ds.day_bounds(*window)
+
+    def _scalar(self, p: Plan, ds, daily: pd.DataFrame, col: str | None):
+        if p.metric == "spread":
+            s = ds.stats.query(*self._rows(ds, p.window))
+            return s["max"] - s["min"]
+        if p.metric in ("mean", "max", "min", "std"):
+            i, j = self._rows(ds, p.window)
+            if col is None:
+                return ds.stats.query(i, j)[p.metric]
+            v = ds.stats.values[i:j][ds.stats.levels[i:j] == p.level]
+            v = v[~np.isnan(v)]
+            if not len(v) or (p.metric == "std" and len(v) < 2):
+                return None
+            return float(v.std(ddof=1) if p.metric == "std" else getattr(v, p.metric)())
+        if p.metric in ("minutes", "hours"):
+            return int(daily[col].sum())
+        if p.metric == "days":
+            return int((daily[col] > 0).sum())
+        if p.metric == "months":
+            return len(np.unique(_month_keys(daily.index[daily[col] > 0])))
+        if p.metric == "share":
+            rows = int(daily["rows"].sum())
+            return 100 * int(daily[col].sum()) / rows if rows else None
+        if p.metric == "episodes":
+            seg = ds.segments
+            seg = seg[(seg["level"] == p.level) & (seg["prev_level"] != p.level)]
+            if p.window is not None:
+                seg = seg[(seg["day"] >= p.window[0]) & (seg["day"] <= p.window[1])]
+            return len(seg)
+        return None
+
+    def _grouped(self, p: Plan, ds, daily: pd.DataFrame, col: str | None) -> pd.Series | None:
+        if col is not None and p.metric in VALUE_DESC:
+            return None                       # renk filtreli değer istatistiği gruplanmaz
+        if p.group == "day":
+            return daily[col] if col else daily[DAILY_VALUE[p.metric]]
+        key = _month_keys(daily.index)
+        if p.group == "year":
+            key = key // 12 + 1970
+        if col is not None:
+            if p.metric == "days":
+                return (daily[col] > 0).groupby(key).sum()
+            return daily[col].groupby(key).sum()
+        if p.metric == "max":
+            return daily["vmax"].groupby(key).max()
+        if p.metric == "min":
+            return daily["vmin"].groupby(key).min()
+        # ortalama / std ay küpünden; pencere ayın ortasında başlıyor/bitiyorsa planlanmaz
+        t = ds.cube.table(p.group)
+        if p.window is not None:
+            if _month_keys([p.window[0]])[0] == _month_keys([p.window[0] - 1])[0] or \
+               _month_keys([p.window[1]])[0] == _month_keys([p.window[1] + 1])[0]:
+                return None
+            t = t[t.index.isin(np.unique(key))]
+        return t[p.metric]
+
+VALUE_DESC  = {"mean": "ortalama titreşim", "max": "maksimum titreşim",
+               "min": "minimum titreşim", "std": "titreşimin standart sapması",
+               "spread": "titreşim dalgalanması (max–min)"}
+VALUE_GEN   = {"mean": "ortalama titreşimin", "max": "maksimum titreşimin",
+               "min": "minimum titreşimin", "std": "titreşim standart sapmasının"}
+DAILY_VALUE = {"mean": "vmean", "max": "vmax", "min": "vmin", "std": "vstd"}
+GROUP_UNITS = {"day": ("gün", "günler"), "month": ("ay", "aylar"), "year": ("yıl", "yıllar")}
+
+def _month_keys(days) -> np.ndarray:
+    return np.asarray(days, dtype="int64").astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+
+def _keys(group: str, keys) -> list[str]:
+    if group == "day":
+        return days_str(keys)
+    if group == "month":
+        return months_str(keys)
+    return [str(int(k)) for k in keys]
+
+def _label(window: tuple[int, int] | None) -> str:
+    if window is None:
+        return "Tüm veride"
+    if window[0] == window[1]:
+        return f"{day_str(window[0])} tarihinde"
+    return f"{day_str(window[0])} – {day_str(window[1])} arasında"
+
+def _fmt(metric: str, v) -> str:
+    if metric == "hours":
+        return f"{v / 60:.2f} saat ({int(v)} dakika)"
+    if metric == "minutes":
+        return f"{int(v)} dakika"
+    if metric == "days":
+        return f"{int(v)} gün"
+    return f"{v:.2f} mm/s"
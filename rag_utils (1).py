@@ -4,15 +4,15 @@ import faiss
 import numpy as np
 import inspect
 from sentence_transformers import SentenceTransformer
-from dateutil import parser as date_parser
+from embedding import QueryEmbeddingCache
+from data_store import DF_PATH, load_vibration_df
+from index_store import index_key, load_or_build
+from retrieval_corpus import build_corpus_index
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1️⃣ Veriyi yükle ve hazırlık
-DF_PATH = "https://huggingface.co/datasets/iamsahinemir/vibration/resolve/main/vibration_df.csv"
-df      = pd.read_csv(DF_PATH)
-df['Timestamp'] = df['Timestamp'].apply(date_parser.isoparse)
-if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-    df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
+# Parse edilmiş veri yerel snapshot'tan okunur (bkz. data_store.py)
+df = load_vibration_df(DF_PATH)
 df['date'] = df['Timestamp'].dt.date
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -361,23 +361,19 @@ qa_map = [
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 5️⃣ Embedder + FAISS index (soru tabanlı)
-embedder_q = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-questions  = [q for q,_ in qa_map]
-Q_emb      = embedder_q.encode(questions, convert_to_numpy=True)
-faiss.normalize_L2(Q_emb)
-idx_q      = faiss.IndexFlatIP(Q_emb.shape[1])
-idx_q.add(Q_emb)
+# İndeks ve embedding'ler diske yazılır; soru listesi değişmedikçe mmap ile açılır
+EMBEDDER_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+embedder_q    = SentenceTransformer(EMBEDDER_NAME)
+questions     = [q for q,_ in qa_map]
+idx_q, Q_emb  = load_or_build(index_key(EMBEDDER_NAME, questions),
+                              lambda: embedder_q.encode(questions, convert_to_numpy=True))
+
+# Soru embedding'leri: aynı metin (yönlendirme + fallback, tekrar eden sorular) bir kez encode edilir
+query_embeddings = QueryEmbeddingCache(embedder_q)
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 5️⃣➕ FAISS index (satır tabanlı) — dinamik konteks için
-row_texts = df.apply(
-    lambda r: f"Tarih: {r['date']}, Durum: {r['Situation']}, Değer: {r['Value']:.2f}",
-    axis=1
-).tolist()
-row_embs = embedder_q.encode(row_texts, convert_to_numpy=True)
-faiss.normalize_L2(row_embs)
-row_idx  = faiss.IndexFlatIP(row_embs.shape[1])
-row_idx.add(row_embs)
+# 5️⃣➕ FAISS index (segment / gün özeti) — dinamik konteks için
+row_corpus = build_corpus_index(df, embedder_q, EMBEDDER_NAME)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 6️⃣ rag_answer: dinamik "son x ay" + öneri + LLM fallback + dynamic context
@@ -450,8 +446,7 @@ def rag_answer(
 
     # ———————————————————————————————
     # (2) FAISS retrieval — soru tabanlı
-    ue = embedder_q.encode([user_q],convert_to_numpy=True)
-    faiss.normalize_L2(ue)
+    ue = query_embeddings.encode(user_q)
     Dq,Iq = idx_q.search(ue,3)
 
     # (2a) Direkt eşleşme
@@ -481,9 +476,8 @@ def rag_answer(
     # ———————————————————————————————
     # (3) LLM fallback + dynamic context
     if model and tokenizer:
-        # a) satır tabanlı indeksten top5 al
-        D_rows, I_rows = row_idx.search(ue, 5)
-        context_rows  = "\n".join(row_texts[i] for i in I_rows[0])
+        # a) corpus'tan top5 al (tarih verildiyse sadece o günün öğeleri)
+        context_rows  = row_corpus.context(ue, 5, date)
         prompt = (
             "Aşağıda RTF makinesi titreşim verileri var:\n"
             f"{context_rows}\n\n"
@@ -5,73 +5,60 @@ import re
 import faiss
 import numpy as np
 import inspect
-from sentence_transformers import SentenceTransformer
-from dateutil import parser as date_parser
+from embedding import BatchingEncoder, QueryEmbeddingCache, EMBEDDER_BACKEND, load_embedder, embedder_key
+from data_store import (DF_PATH, load_vibration_df, LEVEL_NAMES, GREEN, YELLOW, ORANGE, RED,
+                        day_ordinal, day_str, days_str, months_str)
+from dataset import dataset_for
+from answer_cache import AnswerCache
+from index_store import index_key, load_or_build
+from intent_index import build_intent_index, intent_texts, load_paraphrases
+from lexical_router import LexicalRouter, casefold_tr
+from intent_rules import RuleDispatcher
+from query_planner import QueryPlanner
+from date_extract import MONTHS, NUMBER_PATTERN, extract_date, extract_date_range, extract_period, number_value
+from generation import generate_text
+from qa_questions import QA_QUESTIONS, SORU_NO
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1️⃣ Veriyi yükle ve hazırlık
-DF_PATH = "https://huggingface.co/datasets/iamsahinemir/vibration/resolve/main/vibration_df.csv"
-df      = pd.read_csv(DF_PATH)
-
-# dateutil.isoparse tüm ISO-8601 formatlarını (timezone dahil) yakalar
-df['Timestamp'] = df['Timestamp'].apply(date_parser.isoparse)
-# Eğer hâlâ tz-aware ise naive’a çevir
-if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-    df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
-df['date']      = df['Timestamp'].dt.date
+# Parse edilmiş veri yerel snapshot'tan okunur (bkz. data_store.py)
+df = load_vibration_df(DF_PATH)
+# Günlük özet vb. tablolar yükleme anında bir kez kurulur
+dataset = dataset_for(df)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 2️⃣ Tarih normalizasyonu / çıkarma
-turkish_months = {
-    "ocak":"January","şubat":"February","mart":"March","nisan":"April",
-    "mayıs":"May","haziran":"June","temmuz":"July","ağustos":"August",
-    "eylül":"September","ekim":"October","kasım":"November","aralık":"December"
-}
-
-def normalize_date_str(s: str) -> str | None:
-    s_clean = re.sub(r"[\,\.]", "", s.strip().lower())
-    for tr, en in turkish_months.items():
-        if tr in s_clean:
-            s_clean = s_clean.replace(tr, en.lower())
-            break
-    dt = pd.to_datetime(s_clean, dayfirst=True, errors="coerce")
-    return dt.date().isoformat() if not pd.isna(dt) else None
-
-def extract_date(user_q: str) -> str | None:
-    m = re.search(r"(\d{4}-\d{2}-\d{2})|(\d{2}-\d{2}-\d{4})", user_q)
-    if m:
-        return normalize_date_str(m.group(0))
-    return normalize_date_str(user_q)
+# Tek derlenmiş desenle tarama; soru metninin tamamı parse edilmez (bkz. date_extract.py)
+_MONTHS_RE = "|".join(MONTHS)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 3️⃣ 32 QA fonksiyonları
 
 def answer_q1(df):
-    red = df[df["Situation"].str.upper()=="RED"].sort_values("Timestamp")
-    segs, start, prev = [], red.iloc[0]["Timestamp"], red.iloc[0]["Timestamp"]
-    for t in red["Timestamp"].iloc[1:]:
-        if (t - prev) > pd.Timedelta(minutes=1):
-            segs.append((start, prev)); start = t
-        prev = t
-    segs.append((start, prev))
-    s,e = max(segs, key=lambda x: x[1]-x[0])
+    seg = dataset_for(df).segments
+    red = seg[seg["level"]==RED]
+    if red.empty:
+        return "Kırmızı seviyede kayıt bulunamadı."
+    s,e = red.loc[red["duration"].idxmax(), ["start","end"]]
     return f"{s.strftime('%Y-%m-%d %H:%M')} ile {e.strftime('%Y-%m-%d %H:%M')} arasında"
 
 def answer_q2(df):
-    cnt = df[df["Situation"].str.upper()=="YELLOW"].groupby("date").size()
-    return ", ".join(str(d) for d in cnt[cnt==cnt.max()].index)
+    cnt = dataset_for(df).daily["yellow"]
+    cnt = cnt[cnt>0]
+    return ", ".join(days_str(cnt[cnt==cnt.max()].index))
 
 def answer_q3(df):
-    cnt = df[df["Situation"].str.upper()=="RED"].groupby("date").size()
-    return ", ".join(str(d) for d in cnt[cnt==cnt.max()].index)
+    cnt = dataset_for(df).daily["red"]
+    cnt = cnt[cnt>0]
+    return ", ".join(days_str(cnt[cnt==cnt.max()].index))
 
 def answer_q4(df):
     v = df["Value"]
     return f"Değerler {v.min():.2f}–{v.max():.2f} mm/s arasında dalgalanmıştır."
 
 def answer_q5(df):
-    mask = (df["Timestamp"] >= "2023-01-01") & (df["Timestamp"] <= "2023-12-31")
-    return str(df[mask & (df["Situation"].str.upper()=="RED")].shape[0])
+    sub = dataset_for(df).slice("2023-01-01", "2023-12-31")
+    return str(int((sub["level"]==RED).sum()))
 
 def answer_q6(df):
     return "Green: 0–2.8 mm/s; Yellow: 2.8–11.2 mm/s; Orange: 11.2–14 mm/s; Red: 14+ mm/s"
@@ -80,114 +67,114 @@ def answer_q7(df):
     return "14+ mm/s"
 
 def answer_q8(df, date):
-    sub = df[df['date']==pd.to_datetime(date).date()]
-    return f"{sub['Value'].min():.2f}–{sub['Value'].max():.2f} mm/s"
+    s = dataset_for(df).day_stats(date)
+    return f"{s['min']:.2f}–{s['max']:.2f} mm/s"
+
+def _day_row(df, date):
+    daily = dataset_for(df).daily
+    return daily.reindex([day_ordinal(date)]).iloc[0]
 
 def answer_q9(df, date):
-    sub = df[df['date']==pd.to_datetime(date).date()]
-    return sub['Situation'].mode()[0]
+    d = _day_row(df, date)
+    if pd.isna(d['dominant']):
+        return f"{date} tarihine ait veri bulunamadı."
+    return LEVEL_NAMES[int(d['dominant'])]
 
 def answer_q10(df, date):
-    sub = df[df['date']==pd.to_datetime(date).date()]
-    mn,mx,m = sub['Value'].min(), sub['Value'].max(), sub['Value'].mean()
+    s = dataset_for(df).day_stats(date)
+    mn,mx,m = s['min'], s['max'], s['mean']
     return f"{date} tarihinde min={mn:.2f}, max={mx:.2f}, ort={m:.2f} mm/s"
 
 def answer_q11(df):
-    mask = (df['date']>=pd.to_datetime("2023-01-01").date()) & (df['date']<=pd.to_datetime("2023-12-31").date())
-    dates = df[mask & (df["Situation"].str.upper()=="ORANGE")].groupby("date").size()
-    return ", ".join(str(d) for d in dates[dates>0].index)
+    daily = dataset_for(df).daily
+    days  = daily.index
+    mask  = (days>=day_ordinal("2023-01-01")) & (days<=day_ordinal("2023-12-31")) & (daily["orange"]>0)
+    return ", ".join(days_str(days[mask]))
 
 def answer_q12(df):
-    vals = df[df['Timestamp'].dt.year==2023]['Value']
-    return f"2023 performansı: min={vals.min():.2f}, max={vals.max():.2f}, ort={vals.mean():.2f} mm/s"
+    s = dataset_for(df).day_stats("2023-01-01", "2023-12-31")
+    return f"2023 performansı: min={s['min']:.2f}, max={s['max']:.2f}, ort={s['mean']:.2f} mm/s"
 
 def answer_q13(df):
-    all_dates = pd.date_range(df['date'].min(), df['date'].max()).date
-    missing = sorted(set(all_dates) - set(df['date'].unique()))
-    return ", ".join(str(d) for d in missing)
+    days    = dataset_for(df).daily.index.to_numpy()
+    missing = np.setdiff1d(np.arange(days.min(), days.max()+1), days)
+    return ", ".join(days_str(missing))
 
 def answer_q14(df):
-    total = df.groupby('date').size()
-    red   = df[df['Situation'].str.upper()=='RED'].groupby('date').size().reindex(total.index, fill_value=0)
-    full  = red[ red == total ].index
-    return ", ".join(str(d) for d in full)
+    daily = dataset_for(df).daily
+    full  = daily.index[daily['red'] == daily['rows']]
+    return ", ".join(days_str(full))
 
 def answer_q15(df):
-    mins = df[df['Situation'].str.upper()=="GREEN"].shape[0]
+    mins = int((df['level']==GREEN).sum())
     return f"{mins/60:.2f} saat ({mins} dakika)"
 
 def answer_q16(df):
-    recent = df[df['Timestamp'] >= df['Timestamp'].max() - pd.Timedelta(days=90)]
-    return str(recent[recent["Situation"].str.upper()=="YELLOW"]['date'].nunique())
+    recent = dataset_for(df).last(pd.Timedelta(days=90))
+    return str(recent[recent["level"]==YELLOW]['day'].nunique())
 
 def answer_q17(df):
-    recent = df[df['Timestamp'] >= df['Timestamp'].max() - pd.Timedelta(days=90)]
-    return str(recent[recent["Situation"].str.upper()=="ORANGE"]['date'].nunique())
+    recent = dataset_for(df).last(pd.Timedelta(days=90))
+    return str(recent[recent["level"]==ORANGE]['day'].nunique())
 
 def answer_q18(df):
-    recent = df[df['Timestamp'] >= df['Timestamp'].max() - pd.Timedelta(days=90)]
-    return str(recent[recent["Situation"].str.upper()=="GREEN"]['date'].nunique())
+    recent = dataset_for(df).last(pd.Timedelta(days=90))
+    return str(recent[recent["level"]==GREEN]['day'].nunique())
 
 def answer_q19(df):
-    recent = df[df['Timestamp'] >= df['Timestamp'].max() - pd.Timedelta(days=90)]
-    return str(recent[recent["Situation"].str.upper()=="RED"]['date'].nunique())
+    recent = dataset_for(df).last(pd.Timedelta(days=90))
+    return str(recent[recent["level"]==RED]['day'].nunique())
 
 def answer_q20(df):
-    s = df.sort_values("Timestamp")
-    prev = s.iloc[0]['Situation'].upper()
-    dates=set()
-    for _,r in s.iterrows():
-        curr = r['Situation'].upper()
-        if prev=="GREEN" and curr=="RED": dates.add(r['date'])
-        prev = curr
-    return ", ".join(str(d) for d in sorted(dates))
+    seg   = dataset_for(df).segments
+    jumps = seg[(seg["level"]==RED) & (seg["prev_level"]==GREEN)]
+    return ", ".join(days_str(np.unique(jumps["day"])))
 
 def answer_q21(df):
-    tmp = df[df["Situation"].str.upper().isin(["GREEN","YELLOW"])]
-    cnt = tmp.groupby(tmp['Timestamp'].dt.date).size()
-    return ", ".join(d.strftime("%Y-%m-%d") for d in cnt.nlargest(3).index)
+    daily = dataset_for(df).daily
+    cnt   = daily["green"] + daily["yellow"]
+    return ", ".join(days_str(cnt[cnt>0].nlargest(3).index))
 
 def answer_q22(df):
-    m   = df['Timestamp'].dt.to_period('M')
-    cnt = df[df["Situation"].str.upper()=="GREEN"].groupby(m).size()
-    return ", ".join(cnt.nlargest(3).index.astype(str))
+    cnt = dataset_for(df).cube.table(level=GREEN)["rows"]
+    return ", ".join(months_str(cnt.nlargest(3).index))
 
 def answer_q23(df):
     v = df['Value']
     return f"Genel dalgalanma: {v.min():.2f}–{v.max():.2f} mm/s; ortalama {v.mean():.2f}"
 
 def answer_q24(df):
-    ch  = df["Situation"].str.upper().ne(df["Situation"].str.upper().shift())
-    top = df[ch].groupby(df['date']).size().nlargest(3).index
-    return ", ".join(str(d) for d in top)
+    seg = dataset_for(df).segments
+    ch  = seg[seg["level"] != seg["prev_level"]]
+    top = ch.groupby("day").size().nlargest(3).index
+    return ", ".join(days_str(top))
 
 def answer_q25(df):
-    err = df.groupby('date')['Situation'].apply(lambda s: (s.str.upper()!="GREEN").mean())
-    return str(err.idxmin())
+    daily = dataset_for(df).daily
+    err   = 1 - daily['green'] / daily['rows']
+    return day_str(err.idxmin())
 
 def answer_q26(df):
-    mon = df.groupby(df['Timestamp'].dt.to_period('M'))['Value'].std()
-    return str(mon.idxmax())
+    mon = dataset_for(df).cube.table()["std"]
+    return months_str([mon.idxmax()])[0]
 
 def answer_q27(df):
-    ann = df.groupby(df['Timestamp'].dt.year)['Value'].mean()
+    ann = dataset_for(df).cube.table("year")["mean"]
     return ", ".join(f"{y}:{v:.2f}" for y,v in ann.items())
 
 def answer_q28(df):
-    trans, prev = 0, df.sort_values("Timestamp").iloc[0]['Situation'].upper()
-    for s in df['Situation'].str.upper()[1:]:
-        if prev=="GREEN" and s=="RED": trans+=1
-        prev=s
-    return str(trans)
+    seg = dataset_for(df).segments
+    return str(int(((seg["level"]==RED) & (seg["prev_level"]==GREEN)).sum()))
 
 def answer_q29(df):
-    rec = df[df['Timestamp'] >= df['Timestamp'].max()-pd.Timedelta(days=30)]
-    return ", ".join(sorted(rec['Situation'].unique()))
+    rec = dataset_for(df).last(pd.Timedelta(days=30))
+    return ", ".join(sorted(LEVEL_NAMES[c] for c in rec['level'].unique() if c >= 0))
 
 def answer_q30(df):
-    rc  = df[df["Situation"].str.upper()=="RED"].groupby('date').size()
+    rc  = dataset_for(df).daily["red"]
+    rc  = rc[rc>0]
     top = rc[rc==rc.max()].index
-    return ", ".join(str(d) for d in top)
+    return ", ".join(days_str(top))
 
 def answer_q31(df):
     return "Düzenli bakım ve sensör kalibrasyonu önerilir."
@@ -196,58 +183,172 @@ def answer_q32(df):
     return "Titreşim, fan yatak aşınması ve balans dengesizliği performansı etkileyebilir."
 
 def answer_all_red_dates(df):
-    red_dates = sorted(df[df["Situation"].str.upper()=="RED"]["date"].unique())
-    return ", ".join(str(d) for d in red_dates)
+    red = dataset_for(df).daily["red"]
+    return ", ".join(days_str(red.index[red>0]))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🆕 Tarih aralığı soruları (aralık istatistik motoru üzerinden, O(1))
+def answer_range_mean(df, start, end):
+    s = dataset_for(df).day_stats(start, end)
+    if not s['count']:
+        return f"{start} – {end} arasında veri bulunamadı."
+    return f"{start} – {end} arasında ortalama titreşim {s['mean']:.2f} mm/s"
+
+def answer_range_max(df, start, end):
+    s = dataset_for(df).day_stats(start, end)
+    if not s['count']:
+        return f"{start} – {end} arasında veri bulunamadı."
+    return f"{start} – {end} arasında maksimum titreşim {s['max']:.2f} mm/s"
+
+def answer_range_stats(df, start, end):
+    s = dataset_for(df).day_stats(start, end)
+    if not s['count']:
+        return f"{start} – {end} arasında veri bulunamadı."
+    colors = ", ".join(f"{name}: {s[name.lower()]} dk" for name in LEVEL_NAMES)
+    return (f"{start} – {end} arasında min={s['min']:.2f}, max={s['max']:.2f}, "
+            f"ort={s['mean']:.2f}, std={s['std']:.2f} mm/s; {colors}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🆕 Alarm rengine göre süre aralıklarını çıkaran generic fonksiyon
+COLOR_WORDS = {"yeşil": GREEN, "sarı": YELLOW, "turuncu": ORANGE, "kırmızı": RED}
+
+def answer_color_intervals(df: pd.DataFrame, level: int) -> str:
+    seg = dataset_for(df).segments
+    seg = seg[seg["level"] == level]
+    if seg.empty:
+        return f"Makine hiç {LEVEL_NAMES[level].lower()} alarm seviyesinde çalışmamış."
+    fmt = "%Y-%m-%d %H:%M"
+    return "; ".join(seg["start"].dt.strftime(fmt) + "–" + seg["end"].dt.strftime(fmt))
+
+def answer_q_orange_intervals(df):
+    return answer_color_intervals(df, ORANGE)
+def answer_q_yellow_intervals(df):
+    return answer_color_intervals(df, YELLOW)
+def answer_q_green_intervals(df):
+    return answer_color_intervals(df, GREEN)
+def answer_q_red_intervals(df):
+    return answer_color_intervals(df, RED)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 4️⃣ Soru–Fonksiyon eşlemesi
-qa_map = [
-    ("Makinenin en fazla arıza yaptığı tarih aralığını verebilir misin?",       answer_q1),
-    ("Geçmişte sarı alarm seviyesinde en çok hangi tarihlerde görüldü?",        answer_q2),
-    ("Geçmişte kırmızı alarm seviyesinde en çok hangi tarihlerde görüldü?",     answer_q3),
-    ("Makine performansındaki dalgalanmalar hakkında bilgi verebilir misin?",   answer_q4),
-    ("2023 aralığında makinede kaç kez alarm durumu oluştu?",                   answer_q5),
-    ("Makine hangi değerlerde sarı alarma geçiyor?",                            answer_q6),
-    ("Makine hangi değerlerde kırmızı alarma geçiyor?",                         answer_q7),
-    ("… tarihinde RTF makinesinin değer aralığı neydi?",                        answer_q8),
-    ("… tarihinde RTF makinesinin renk seviyesi neydi?",                       answer_q9),
-    ("… tarihinde makine performansı hakkında bilgi alabilir miyim?",           answer_q10),
-    ("RTF makinesi 2023 aralığında turuncu alarm seviyesinde çalıştığı tarihler?", answer_q11),
-    ("2023 yılında makine performansı nasıldı?",                                answer_q12),
-    ("Son bir yıl içinde makine hangi günlerde tamamen durdu?",                 answer_q13),
-    ("Kırmızı seviyede çalıştığı tarihlerde makine tamamen durdu mu?",          answer_q14),
-    ("15 Ocak 2023’ten itibaren yeşil alarmda çalışılan toplam süre nedir?",    answer_q15),
-    ("Son üç ayda sarı alarm seviyesinde kaç gün çalıştı?",                     answer_q16),
-    ("Son üç ayda turuncu alarm seviyesinde kaç gün çalıştı?",                  answer_q17),
-    ("Son üç ayda yeşil alarm seviyesinde kaç gün çalıştı?",                    answer_q18),
-    ("Son üç ayda kırmızı alarm seviyesinde kaç gün çalıştı?",                   answer_q19),
-    ("Yeşilden direkt kırmızıya geçiş yapan günler hangileri?",                answer_q20),
-    ("Hangisi renk değişimlerinin en düzenli olduğu tarihler?",                 answer_q21),
-    ("Makine, son bir yılda hangi aylarda daha çok yeşildi?",                  answer_q22),
-    ("Makine performansının zaman içindeki değişimi nasıl oldu?",              answer_q23),
-    ("Renk değişimlerinin yoğun olduğu dönemler hangi tarihler?",              answer_q24),
-    ("En düşük arıza oranı hangi tarihlerde?",                                answer_q25),
-    ("En fazla performans değişikliği hangi ayda oldu?",                       answer_q26),
-    ("Her yılın ortalama performansı nedir?",                                  answer_q27),
-    ("Yeşilden kırmızıya kaç kez geçiş yapıldı?",                              answer_q28),
-    ("Son bir ayda hangi renk aralıklarında çalıştı?",                          answer_q29),
-    ("En yüksek değerlerde alarm verdiği günler hangileri?",                   answer_q30),
-    ("Makine iyileştirme önerileri nelerdir?",                                 answer_q31),
-    ("Makinenin performansını ne etkileyebilir?",                              answer_q32),
-    ("Tüm kırmızı günleri listele",                                            answer_all_red_dates)
-]
+# Sorular qa_questions.py'de (yan etkisiz, bench'ler de oradan okur); cevap
+# fonksiyonu adıyla bu modülden bağlanır.
+qa_map = [(q, globals()[fn]) for q, fn in QA_QUESTIONS]
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 5️⃣ Embedder + FAISS index
-embedder_q = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-questions  = [q for q,_ in qa_map]
-Q_emb      = embedder_q.encode(questions, convert_to_numpy=True)
-faiss.normalize_L2(Q_emb)
-idx_q      = faiss.IndexFlatIP(Q_emb.shape[1])
-idx_q.add(Q_emb)
+# İndeks ve embedding'ler diske yazılır; soru listesi değişmedikçe mmap ile açılır
+# Backend EMBEDDER_BACKEND ile seçilir (torch / int8 / onnx / onnx-int8, bkz. embedding.py)
+EMBEDDER_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+EMBEDDER_KEY  = embedder_key(EMBEDDER_NAME, EMBEDDER_BACKEND)
+embedder_q    = load_embedder(EMBEDDER_NAME, EMBEDDER_BACKEND)
+questions     = [q for q,_ in qa_map]
+idx_q, Q_emb  = load_or_build(index_key(EMBEDDER_KEY, questions),
+                              lambda: embedder_q.encode(questions, convert_to_numpy=True))
+
+# Yönlendirme için çok vektörlü niyet indeksi: kanonik sorular + CSV'lerdeki
+# etiketli paraphrase'ler; CSV'deki "Soru No" N ↔ answer_qN (SORU_NO).
+paraphrases = load_paraphrases()
+intents = build_intent_index(questions, embedder_q, EMBEDDER_KEY, SORU_NO, paraphrases)
+
+# İlk aşama: aynı metinler üzerinde karakter n-gram TF-IDF; emin olduğu
+# sorularda embedder hiç çalışmaz (payı için lexical.stats()).
+lexical = LexicalRouter(*intent_texts(questions, paraphrases, SORU_NO), len(questions))
+
+# Soru embedding'leri: aynı metin (yönlendirme + fallback, tekrar eden sorular) bir kez encode edilir;
+# eşzamanlı isteklerin encode'ları birkaç ms içinde tek batch'te toplanır
+query_embeddings = QueryEmbeddingCache(BatchingEncoder(embedder_q))
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 6️⃣ rag_answer: hem date-parametrik hem LLM fallback
+# 5️⃣b Statik cevaplar: sadece df'e bağlı fonksiyonlar veri sürümü başına bir
+# kez (arka planda) hesaplanır, eşleşen soru sözlükten cevaplanır.
+answers = AnswerCache(fn for _, fn in qa_map)
+answers.materialize(dataset)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 6️⃣ Kural tabanlı ön yönlendirmeler: tek derlenmiş desen, kayıt sırasıyla
+# denenir (bkz. intent_rules.py). Yeni kural için @rules.register yeterli.
+# Desenler IGNORECASE eşleşir ("İKİ", "KIRMIZI"); yakalanan kelimeler sözlüklere
+# bakmadan önce casefold_tr ile küçültülür (str.lower Türkçe I / İ'yi bozar).
+rules = RuleDispatcher()
+_COLORS_RE     = "|".join(COLOR_WORDS)
+_COLOR_PATTERNS = [(word, level, re.compile(word, flags=re.IGNORECASE)) for word, level in COLOR_WORDS.items()]
+
+# (0a) Dinamik "Son x ay"
+@rules.register("son_x_ay", rf"son\s+(?P<n>{NUMBER_PATTERN})\s+ay")
+def _rule_son_x_ay(g: dict, user_q: str, df: pd.DataFrame) -> str | None:
+    x      = number_value(casefold_tr(g["n"]))
+    recent = dataset_for(df).last(pd.DateOffset(months=x))
+    lower  = casefold_tr(user_q)
+    # renk belirtilmemişse (örn. "son bir ayda hangi renkler") embedding yoluna düşer
+    for word, level in COLOR_WORDS.items():
+        if word in lower:
+            days = recent[recent['level']==level]['day'].nunique()
+            return f"Son {x} ayda makine toplam {days} farklı günde {word} alarm seviyesinde çalışmıştır."
+    return None
+
+# (0b) "ayında arıza"
+@rules.register("ayinda_ariza", rf"(?P<mon>{_MONTHS_RE})\s+ayında.*arıza")
+def _rule_ayinda_ariza(g: dict, user_q: str, df: pd.DataFrame) -> str:
+    mon      = MONTHS.index(casefold_tr(g["mon"])) + 1
+    daily    = dataset_for(df).daily
+    red_days = daily.index[daily["red"] > 0]
+    red_days = red_days[pd.DatetimeIndex(red_days.to_numpy().astype("datetime64[D]")).month == mon]
+    if len(red_days):
+        return "Evet, tarihler: " + ", ".join(days_str(red_days))
+    return "Hayır, o ayda kırmızı durum görülmemiş."
+
+# (0c) "çalıştığı aralıklar"
+@rules.register("calistigi_araliklar", r"çalıştığı\s+aralıklar")
+def _rule_calistigi_araliklar(g: dict, user_q: str, df: pd.DataFrame) -> str | None:
+    for _, level, pat in _COLOR_PATTERNS:
+        if pat.search(user_q):
+            return answer_color_intervals(df, level)
+    return None
+
+# (0d) "kaç ay boyunca …"
+@rules.register("kac_ay_boyunca", rf"kaç\s+ay\s+boyunca.*\b(?P<col>{_COLORS_RE})\b")
+def _rule_kac_ay_boyunca(g: dict, user_q: str, df: pd.DataFrame) -> str:
+    col = casefold_tr(g["col"])
+    months = len(dataset_for(df).cube.table(level=COLOR_WORDS[col]))
+    return f"Makine {months} ay boyunca {col} durum göstermiştir."
+
+# (0e) "hangi aylarda …"
+@rules.register("hangi_aylarda", rf"hangi aylarda.*\b(?P<col>{_COLORS_RE})\b")
+def _rule_hangi_aylarda(g: dict, user_q: str, df: pd.DataFrame) -> str:
+    col = casefold_tr(g["col"])
+    months = months_str(dataset_for(df).cube.table(level=COLOR_WORDS[col]).index)
+    return f"{col.capitalize()} durumun görüldüğü aylar: {', '.join(months)}."
+
+# (0f) "Nisan'da kaç dakika turuncu?" → ay × seviye küpü
+@rules.register("ay_kac_dakika", rf"\b(?P<mon>{_MONTHS_RE})(?:\s+(?P<year>\d{{4}}))?.*kaç\s+dakika.*\b(?P<col>{_COLORS_RE})\b")
+def _rule_ay_kac_dakika(g: dict, user_q: str, df: pd.DataFrame) -> str:
+    mon_name, year, col = casefold_tr(g["mon"]), g["year"], casefold_tr(g["col"])
+    cells = dataset_for(df).cube.table(level=COLOR_WORDS[col])["rows"]
+    mon   = MONTHS.index(mon_name)
+    # yıl yazılmamışsa o ayın verideki en son yılı
+    years = [m // 12 + 1970 for m in dataset_for(df).cube.totals.index if m % 12 == mon]
+    if year is None and not years:
+        return f"{mon_name.capitalize()} ayına ait veri bulunamadı."
+    y = int(year) if year else max(years)
+    minutes = int(cells.get((y - 1970) * 12 + mon, 0))
+    return f"{y} {mon_name.capitalize()} ayında makine {minutes} dakika {col} alarm seviyesinde çalışmıştır."
+
+# Kalıplara ve niyetlere uymayan sorular: renk / zaman penceresi / metrik /
+# gruplama planı, dataset özetleri üzerinde (bkz. query_planner.py)
+planner = QueryPlanner()
+
+# qa_map fonksiyonlarının parametre sayısı (1: df, 2: df+tarih, 3: df+aralık)
+QA_ARITY = [len(inspect.signature(fn).parameters) for _, fn in qa_map]
+
+NO_ANSWER = "Cevap bulunamadı."
+FALLBACK_MAX_NEW_TOKENS = 300
+
+def fallback_prompt(user_q: str) -> str:
+    return f"Soru: {user_q}\nCevap:"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 7️⃣ rag_answer: kural tabanlı ön yönlendirmeler + date-parametrik + sorgu planlayıcı + LLM fallback
 def rag_answer(
     user_q: str,
     df: pd.DataFrame,
@@ -256,29 +357,45 @@ def rag_answer(
     threshold: float = 0.65,
     date: str | None = None
 ) -> str:
-    # 1) FAISS Retrieval
-    ue = embedder_q.encode([user_q], convert_to_numpy=True)
-    faiss.normalize_L2(ue)
-    Dq, Iq = idx_q.search(ue, 1)
-
-    if Dq[0][0] >= threshold:
-        fn  = qa_map[Iq[0][0]][1]
-        sig = inspect.signature(fn).parameters
+    # 0) Kural tabanlı ön yönlendirmeler (tek tarama)
+    out = rules.dispatch(user_q, df)
+    if out is not None:
+        return out
+
+    # 1) Sözcüksel ön yönlendirme; emin değilse FAISS (niyet başına en yüksek
+    #    paraphrase benzerliği)
+    intent = lexical.route(user_q)
+    if intent is None:
+        score, intent = intents.best(query_embeddings.encode(user_q))
+        if score < threshold:
+            intent = None
+
+    if intent is not None:
+        fn    = qa_map[intent][1]
+        arity = QA_ARITY[intent]
+        # Tarih aralığı parametreli mi?
+        if arity == 3:
+            rng = extract_date_range(user_q, year=dataset_for(df).end.year)
+            if rng is None:
+                return "Lütfen sorunuzda bir tarih aralığı belirtin (örn. “15–20 Mart 2023”)."
+            return fn(df, *rng)
         # Tarih parametreli mi?
-        if len(sig) == 2:
-            date = date or extract_date(user_q)
+        if arity == 2:
+            date = date or extract_date(user_q, year=dataset_for(df).end.year)
             if date is None:
                 return "Lütfen sorunuzda bir tarih belirtin (örn. “15 Haziran 2023”)."
             return fn(df, date)
-        return fn(df)
+        return answers.get(fn, df)
+
+    # 2) Sorgu planlayıcı
+    out = planner.answer(user_q, df)
+    if out is not None:
+        return out
 
-    # 2) LLM fallback
+    # 3) LLM fallback (sadece yeni tokenlar; stream için inference.stream_answer)
     if model and tokenizer:
-        prompt = f"Soru: {user_q}\nCevap:"
-        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-        out    = model.generate(**inputs, max_new_tokens=300)
-        return tokenizer.decode(out[0], skip_special_tokens=True)
+        return generate_text(model, tokenizer, fallback_prompt(user_q), FALLBACK_MAX_NEW_TOKENS)
 
-    # 3) Hiçbirinden cevap gelmediyse
-    return "Cevap bulunamadı."
+    # 4) Hiçbirinden cevap gelmediyse
+    return NO_ANSWER
 
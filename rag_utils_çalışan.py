@@ -4,15 +4,13 @@ import faiss
 import numpy as np
 import inspect
 from sentence_transformers import SentenceTransformer
-from dateutil import parser as date_parser
+from embedding import QueryEmbeddingCache
+from data_store import DF_PATH, load_vibration_df
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1️⃣ Veriyi yükle ve hazırlık
-DF_PATH = "https://huggingface.co/datasets/iamsahinemir/vibration/resolve/main/vibration_df.csv"
-df = pd.read_csv(DF_PATH)
-df['Timestamp'] = df['Timestamp'].apply(date_parser.isoparse)
-if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-    df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
+# Parse edilmiş veri yerel snapshot'tan okunur (bkz. data_store.py)
+df = load_vibration_df(DF_PATH)
 df['date'] = df['Timestamp'].dt.date
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -299,6 +297,9 @@ faiss.normalize_L2(Q_emb)
 idx_q      = faiss.IndexFlatIP(Q_emb.shape[1])
 idx_q.add(Q_emb)
 
+# Soru embedding'leri: aynı metin (yönlendirme + fallback, tekrar eden sorular) bir kez encode edilir
+query_embeddings = QueryEmbeddingCache(embedder_q)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 6️⃣ rag_answer: dinamik “kaç ay boyunca…” + öneri + fallback
 def rag_answer(
@@ -352,8 +353,7 @@ def rag_answer(
     q = re.sub(r"\bmakine\b","RTF makinesi",q,flags=re.IGNORECASE)
 
     # (2) FAISS retrieval — top-3
-    ue = embedder_q.encode([q],convert_to_numpy=True)
-    faiss.normalize_L2(ue)
+    ue = query_embeddings.encode(q)
     Dq, Iq = idx_q.search(ue, 3)
 
     # (2a) threshold üstü eşleşme
@@ -0,0 +1,119 @@
+# retrieval_corpus.py
+#
+# LLM'e dinamik bağlam için retrieval corpus'u.
+# Dakika başına bir metin yerine (ardışık dakikalar neredeyse aynı metni
+# üretir) iki tür özet metin kullanılır:
+#   - alarm segmentleri: "2023-04-27 05:10–07:42 RED, 153 dk, max 18.30"
+#   - gün özetleri:      "2023-04-27: 1440 dk, min …, max …, ort …; GREEN 900 dk, …"
+# Aynı metinler encode edilmeden önce tekilleştirilir. Her öğe kapsadığı gün
+# aralığını taşır; sorudan tarih/dönem çıkarılırsa arama o günlerle sınırlanır.
+
+import numpy as np
+import pandas as pd
+
+from data_store import SITUATION_LEVELS, day_ordinal, day_ordinals, days_str
+from dataset import dataset_for
+from index_store import INDEX_DIR, ROW_INDEX_KIND, index_key, load_or_build
+
+def _level_name(code: int) -> str:
+    return SITUATION_LEVELS[code] if code >= 0 else "UNKNOWN"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Metinler (her biri kapsadığı gün aralığıyla)
+def segment_items(df: pd.DataFrame) -> pd.DataFrame:
+    ds  = dataset_for(df)
+    seg = ds.segments
+    if seg.empty:
+        return pd.DataFrame({"text": [], "first": [], "last": []})
+    # segmentler satırları sırayla ve boşluksuz kapsar → reduceat ile segment max'ı
+    vmax  = np.fmax.reduceat(ds.stats.values, seg["row_start"].to_numpy())
+    keep  = seg["start"].notna().to_numpy()             # NaT zaman damgalı satırlar
+    seg, vmax = seg[keep], vmax[keep]
+    start = pd.DatetimeIndex(seg["start"])
+    end   = pd.DatetimeIndex(seg["end"])
+    same  = start.normalize() == end.normalize()
+    s_txt = start.strftime("%Y-%m-%d %H:%M")
+    e_txt = np.where(same, end.strftime("%H:%M"), end.strftime("%Y-%m-%d %H:%M"))
+    texts = [f"{s}{'–' + e if n > 1 else ''} {_level_name(lv)}, {n} dk, max {m:.2f}"
+             for s, e, lv, n, m in zip(s_txt, e_txt, seg["level"], seg["rows"], vmax)]
+    return pd.DataFrame({"text": texts, "first": seg["day"].to_numpy(),
+                         "last": day_ordinals(end)})
+
+def day_items(df: pd.DataFrame) -> pd.DataFrame:
+    daily = dataset_for(df).daily
+    cols  = [l.lower() for l in SITUATION_LEVELS]
+    texts = []
+    for day, r in zip(days_str(daily.index), daily.itertuples(index=False)):
+        colors = ", ".join(f"{name} {getattr(r, c)} dk" for name, c in zip(SITUATION_LEVELS, cols) if getattr(r, c))
+        texts.append(f"{day}: {r.rows} dk, min {r.vmin:.2f}, max {r.vmax:.2f}, ort {r.vmean:.2f}; "
+                     f"{colors}; baskın {_level_name(r.dominant)}")
+    return pd.DataFrame({"text": texts, "first": daily.index.to_numpy(), "last": daily.index.to_numpy()})
+
+def corpus_items(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gün özetleri + segment metinleri (text, first, last gün sayıları),
+    tekrarsız ve başlangıç gününe göre sıralı: bir gün aralığının adayları
+    ardışık id'lerde durur.
+    """
+    items = pd.concat([day_items(df), segment_items(df)], ignore_index=True)
+    items = items.drop_duplicates("text").astype({"first": "int32", "last": "int32"})
+    return items.sort_values("first", kind="stable", ignore_index=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ İndeks + zaman filtreli arama
+# Sorulan gün / dönem verinin dışındaysa başka günlerin metni verilmez; LLM
+# istemine bu satır yazılır.
+NO_PERIOD_DATA = "Sorulan tarih / dönem için kayıtlı titreşim verisi yok."
+
+class RetrievalCorpus:
+    def __init__(self, index, embs: np.ndarray, items: pd.DataFrame):
+        self.index = index
+        self.embs  = embs
+        self.texts = items["text"].tolist()
+        self.first = items["first"].to_numpy()
+        self.last  = items["last"].to_numpy()
+        # first'e göre sıralı id'lerde last'ın önek maksimumu: [d0, …] ile
+        # kesişebilecek ilk id'yi searchsorted ile bulmak için
+        self._reach = np.maximum.accumulate(self.last) if len(self.last) else self.last
+
+    def candidates(self, first, last) -> np.ndarray:
+        """first..last günleriyle (iki uç dahil) kesişen öğelerin id'leri."""
+        d0 = first if isinstance(first, (int, np.integer)) else day_ordinal(first)
+        d1 = last if isinstance(last, (int, np.integer)) else day_ordinal(last)
+        lo = int(np.searchsorted(self._reach, d0, "left"))
+        hi = int(np.searchsorted(self.first, d1, "right"))
+        ids = np.arange(lo, max(lo, hi))
+        return ids[self.last[lo:max(lo, hi)] >= d0]
+
+    def search(self, q: np.ndarray, k: int = 5, first=None, last=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (scores, ids), tek sorgu vektörü için (normalize edilmiş, 1×d).
+        first/last verilirse sadece o günlerle kesişen öğeler arasında kesin
+        arama yapılır (aday kümesi küçük, embedding'ler mmap'ten okunur);
+        aday yoksa sonuç boştur, genel aramaya düşülmez.
+        """
+        if first is not None:
+            ids = self.candidates(first, first if last is None else last)
+            if not len(ids):
+                return np.empty(0, dtype="float32"), ids
+            scores = np.asarray(self.embs[ids[0]:ids[-1] + 1], dtype="float32")[ids - ids[0]] @ q[0]
+            top = np.argsort(-scores, kind="stable")[:k]
+            return scores[top], ids[top]
+        D, I = self.index.search(q, k)
+        keep = I[0] >= 0
+        return D[0][keep], I[0][keep]
+
+    def context(self, q: np.ndarray, k: int = 5, first=None, last=None) -> str:
+        """LLM istemi için en yakın k öğenin metni (satır satır)."""
+        _, ids = self.search(q, k, first, last)
+        return "\n".join(self.texts[i] for i in ids) if len(ids) else NO_PERIOD_DATA
+
+def build_corpus_index(df: pd.DataFrame, embedder, embedder_name: str, cache_dir: str = INDEX_DIR,
+                       kind: str = ROW_INDEX_KIND, **index_kw) -> RetrievalCorpus:
+    """Anahtar metinlerin kendisidir: veri değişip metinler aynı kalırsa kayıtlı indeks kullanılır."""
+    items = corpus_items(df)
+    texts = items["text"].tolist()
+    index, embs = load_or_build(index_key(embedder_name, texts),
+                                lambda: embedder.encode(texts, convert_to_numpy=True),
+                                cache_dir, kind=kind, **index_kw)
+    return RetrievalCorpus(index, embs, items)
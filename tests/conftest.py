@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Modüller depo kökünde düz dosyalar; testler kökten import eder.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import SITUATION_LEVELS, prepare_frame
+
+def random_frame(n: int = 3000, seed: int = 0, start: str = "2023-01-30 22:00") -> pd.DataFrame:
+    """
+    Dakikalık ham titreşim satırları: çoğu adım 1 dakika, arada uzun boşluklar
+    (gün / ay sınırlarını geçer), NaN değerler, seviye blokları ve bilinmeyen
+    Situation değerleri içerir. prepare_frame'den geçmiş olarak döner.
+    """
+    rng   = np.random.default_rng(seed)
+    steps = np.where(rng.random(n) < 0.97, 1, rng.choice([2, 45, 600, 3000], n))
+    steps[0] = 0
+    ts    = pd.Timestamp(start) + pd.to_timedelta(np.cumsum(steps), unit="m")
+    value = rng.normal(10.0, 3.0, n).round(3)
+    value[rng.random(n) < 0.02] = np.nan
+    names = np.array(SITUATION_LEVELS + ("UNKNOWN",))
+    level = np.repeat(rng.choice(len(names), n, p=[0.4, 0.25, 0.15, 0.15, 0.05]),
+                      rng.integers(1, 30, n))[:n]
+    return prepare_frame(pd.DataFrame({"Timestamp": ts, "Value": value, "Situation": names[level]}))
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return random_frame()
+
+@pytest.fixture(scope="session")
+def year_frame() -> pd.DataFrame:
+    """Yıl sınırını geçen daha uzun seri (ay / yıl özetleri için)."""
+    return random_frame(6000, seed=3, start="2022-11-20")
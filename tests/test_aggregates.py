@@ -0,0 +1,157 @@
+# Yükleme anında kurulan özet tablolar: her tablo ham satırlar üzerinden
+# kaba kuvvetle hesaplanan sonuçla aynı olmalı; artımlı güncelleme tam
+# yeniden kurulumla aynı tabloyu vermeli.
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import month_ordinals
+from aggregates import (LEVEL_COLS, MAX_GAP, build_daily, extend_daily,
+                        build_segments, extend_segments, RangeStats, PeriodCube)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Günlük özet tablosu
+def test_build_daily_matches_brute_force(frame):
+    daily = build_daily(frame)
+    assert daily.index.tolist() == sorted(frame['day'].unique())
+    for day, g in frame.groupby('day'):
+        row    = daily.loc[day]
+        counts = [int((g['level'] == code).sum()) for code in range(len(LEVEL_COLS))]
+        assert row['rows'] == len(g)
+        assert [row[c] for c in LEVEL_COLS] == counts
+        assert row['dominant'] == counts.index(max(counts))
+        assert row['vmin'] == g['Value'].min() and row['vmax'] == g['Value'].max()
+        assert row['vmean'] == pytest.approx(g['Value'].mean())
+        assert row['vstd'] == pytest.approx(g['Value'].std(), nan_ok=True)
+
+@pytest.mark.parametrize("cut", [0.3, 0.5, 0.999])
+def test_extend_daily_in_order(frame, cut):
+    n_old = int(len(frame) * cut)
+    daily = extend_daily(build_daily(frame.iloc[:n_old]), frame, frame.iloc[n_old:])
+    pd.testing.assert_frame_equal(daily, build_daily(frame))
+
+def test_extend_daily_out_of_order(frame):
+    # eski bir güne ve yeni günlere düşen satırlar birlikte eklenir
+    rng   = np.random.default_rng(1)
+    new   = np.sort(rng.choice(len(frame), 200, replace=False))
+    old   = frame.drop(index=new)
+    daily = extend_daily(build_daily(old), frame, frame.iloc[new])
+    pd.testing.assert_frame_equal(daily, build_daily(frame))
+
+def test_extend_daily_without_rows_keeps_table(frame):
+    daily = build_daily(frame)
+    assert extend_daily(daily, frame, frame.iloc[:0]) is daily
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Alarm segment indeksi
+def brute_segments(df: pd.DataFrame) -> list[tuple]:
+    ts, lv = df['Timestamp'].tolist(), df['level'].tolist()
+    out, first = [], 0
+    for r in range(1, len(ts) + 1):
+        if r == len(ts) or lv[r] != lv[first] or ts[r] - ts[r - 1] > MAX_GAP:
+            prev = lv[first - 1] if first else -1
+            nxt  = lv[r] if r < len(ts) else -1
+            out.append((lv[first], ts[first], ts[r - 1], r - first, prev, nxt, first, r - 1))
+            first = r
+    return out
+
+def as_tuples(seg: pd.DataFrame) -> list[tuple]:
+    cols = ["level", "start", "end", "rows", "prev_level", "next_level", "row_start", "row_end"]
+    return list(seg[cols].itertuples(index=False, name=None))
+
+def test_build_segments_matches_brute_force(frame):
+    seg = build_segments(frame)
+    assert as_tuples(seg) == brute_segments(frame)
+    assert (seg['duration'] == seg['end'] - seg['start']).all()
+    assert (seg['day'].to_numpy() == frame['day'].to_numpy()[seg['row_start']]).all()
+
+def test_max_gap_splits_segments():
+    ts = pd.to_datetime(["2023-03-01 10:00", "2023-03-01 10:01",   # tam 1 dk → aynı segment
+                         "2023-03-01 10:03", "2023-03-01 10:04"])  # 2 dk boşluk → yeni segment
+    df = pd.DataFrame({"Timestamp": ts, "level": np.int8([3, 3, 3, 3])})
+    seg = build_segments(df)
+    assert seg['rows'].tolist() == [2, 2]
+    assert seg['prev_level'].tolist() == [-1, 3] and seg['next_level'].tolist() == [3, -1]
+
+@pytest.mark.parametrize("cut", [0.3, 0.5, 0.999])
+def test_extend_segments_in_order(frame, cut):
+    n_old = int(len(frame) * cut)
+    seg   = extend_segments(build_segments(frame.iloc[:n_old]), frame, n_old)
+    assert as_tuples(seg) == as_tuples(build_segments(frame))
+
+def test_extend_segments_out_of_order(frame):
+    # eklenen satırlar eskilerden önceyse tablo baştan kurulur
+    n_old = len(frame) // 2
+    df    = pd.concat([frame.iloc[n_old:], frame.iloc[:n_old]], ignore_index=True)
+    seg   = extend_segments(build_segments(df.iloc[:n_old]), df, n_old)
+    assert as_tuples(seg) == as_tuples(build_segments(frame))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Aralık istatistikleri
+def brute_stats(values: np.ndarray, levels: np.ndarray, i: int, j: int) -> dict:
+    v = pd.Series(values[i:j])
+    out = {c: int((levels[i:j] == code).sum()) for code, c in enumerate(LEVEL_COLS)}
+    out.update(rows=max(j - i, 0), count=int(v.count()), min=v.min(), max=v.max(),
+               mean=v.mean(), std=v.std())
+    return out
+
+def assert_stats(got: dict, want: dict) -> None:
+    assert got.keys() == want.keys()
+    for k, w in want.items():
+        assert got[k] == pytest.approx(w, rel=1e-9, abs=1e-9, nan_ok=True), k
+
+def random_ranges(n: int, k: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    yield from [(0, n), (0, 0), (5, 5), (7, 3), (0, 1), (n - 1, n),
+                (RangeStats.BLOCK, 2 * RangeStats.BLOCK), (RangeStats.BLOCK - 1, RangeStats.BLOCK + 1)]
+    for i, j in np.sort(rng.integers(0, n + 1, (k, 2)), axis=1):
+        yield i, j                                     # numpy int64 uçlar
+
+def test_range_stats_match_brute_force(frame):
+    values, levels = frame['Value'].to_numpy(), frame['level'].to_numpy()
+    stats = RangeStats(values, levels)
+    for i, j in random_ranges(len(values)):
+        assert_stats(stats.query(i, j), brute_stats(values, levels, int(i), int(j)))
+
+def test_range_stats_all_nan_range():
+    stats = RangeStats(np.array([1.0, np.nan, np.nan, 2.0]), np.int8([0, 3, 3, 1]))
+    got = stats.query(1, 3)
+    assert got['count'] == 0 and got['rows'] == 2 and got['red'] == 2
+    assert np.isnan(got['mean']) and np.isnan(got['min'])
+
+def test_range_stats_extend_matches_rebuild(frame):
+    values, levels = frame['Value'].to_numpy(), frame['level'].to_numpy()
+    stats = RangeStats(values[:1234], levels[:1234])
+    stats.extend(values[1234:], levels[1234:])
+    for i, j in random_ranges(len(values), seed=1):
+        assert_stats(stats.query(i, j), brute_stats(values, levels, int(i), int(j)))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4️⃣ Ay × seviye küpü
+def brute_table(df: pd.DataFrame, period: str, level) -> pd.DataFrame:
+    if level is not None:
+        df = df[df['level'].isin(np.atleast_1d(level))]
+    month = month_ordinals(df['Timestamp'])
+    key   = pd.Series(1970 + month // 12 if period == "year" else month, index=df.index)
+    g = df.groupby(key)
+    return pd.DataFrame({"rows": g.size(), "days": g['day'].nunique(), "count": g['Value'].count(),
+                         "vmin": g['Value'].min(), "vmax": g['Value'].max(),
+                         "mean": g['Value'].mean(), "std": g['Value'].std()})
+
+@pytest.mark.parametrize("period", ["month", "year"])
+@pytest.mark.parametrize("level", [None, 3, [1, 2], [0, 1, 2, 3]])
+def test_period_cube_matches_brute_force(year_frame, period, level):
+    got  = PeriodCube(year_frame).table(period, level)
+    want = brute_table(year_frame, period, level)
+    assert got.index.tolist() == want.index.tolist()
+    cols = [c for c in want.columns if c in got.columns]
+    assert ("days" in cols) == (level is None or np.ndim(level) == 0)
+    pd.testing.assert_frame_equal(got[cols], want[cols], check_dtype=False, check_names=False)
+
+def test_period_cube_extend_matches_rebuild(frame):
+    n_old = 1700
+    cube  = PeriodCube(frame.iloc[:n_old])
+    cube.extend(frame, frame.iloc[n_old:])
+    full  = PeriodCube(frame)
+    pd.testing.assert_frame_equal(cube.cells, full.cells)
+    pd.testing.assert_frame_equal(cube.totals, full.totals)
@@ -0,0 +1,73 @@
+# Statik cevap önbelleği: veri sürümü değişince cevaplar arka planda yeniden
+# hesaplanmalı; hata veren fonksiyon turu bitirmemeli ve aynı sürüm için
+# tekrar tekrar denenmemeli.
+import threading
+from collections import Counter
+
+import pytest
+
+from answer_cache import AnswerCache
+from dataset import VibrationDataset, dataset_for
+
+calls = Counter()
+
+def n_rows(df):
+    calls["n_rows"] += 1
+    return str(len(df))
+
+def broken(df):
+    calls["broken"] += 1
+    raise ValueError("boş tablo")
+
+def last_value(df):
+    calls["last_value"] += 1
+    return f"{df['Value'].iloc[-1]:.3f}"
+
+def with_date(df, date):               # iki parametreli → önbelleğe alınmaz
+    return date
+
+@pytest.fixture
+def setup(frame):
+    calls.clear()
+    df = frame.iloc[:2000].copy()
+    return AnswerCache([n_rows, broken, last_value, n_rows, with_date]), dataset_for(df), frame
+
+def join_background():
+    for t in threading.enumerate():
+        if t.name.startswith("answer-cache-v"):
+            t.join(5)
+
+def test_only_single_argument_functions(setup):
+    cache, _, _ = setup
+    assert cache.fns == [n_rows, broken, last_value]
+
+def test_failure_does_not_stop_the_pass(setup):
+    cache, ds, _ = setup
+    cache.materialize(ds, background=False)
+    assert cache.get(n_rows, ds.df) == "2000"
+    assert cache.get(last_value, ds.df) == last_value(ds.df)
+    cache.materialize(ds, background=False)             # hatalı çift tekrar denenmez
+    assert calls["broken"] == 1 and calls["n_rows"] == 1
+
+def test_failed_answer_raises_without_restarting(setup):
+    cache, ds, _ = setup
+    cache.materialize(ds, background=False)
+    with pytest.raises(ValueError):
+        cache.get(broken, ds.df)
+    join_background()
+    assert not any(t.name.startswith("answer-cache-v") for t in threading.enumerate())
+    assert calls["n_rows"] == 1 and calls["last_value"] == 1
+
+def test_version_change_recomputes_in_background(setup):
+    cache, ds, frame = setup
+    cache.materialize(ds, background=False)
+    ds.append(frame.iloc[2000:])
+    assert ds.version == 1
+    # yeni sürüm için ilk soru anlık hesaplanır, kalanlar arka planda
+    assert cache.get(n_rows, ds.df) == str(len(frame))
+    join_background()
+    assert calls == {"n_rows": 2, "broken": 2, "last_value": 2}
+    assert cache.get(last_value, ds.df) == f"{frame['Value'].iloc[-1]:.3f}"
+    assert calls["last_value"] == 2                       # sözlükten okundu
+    assert {v for _, v in cache._answers[ds]} == {1}      # eski sürüm silindi
+    assert {v for _, v in cache._failed[ds]} == {1}
@@ -0,0 +1,73 @@
+# VibrationDataset: searchsorted ile bulunan aralıklar maske ile filtrelemeyle
+# aynı satırları vermeli; append (sıralı / sırasız) sonrası özetler tam
+# yeniden kurulumla aynı olmalı.
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset import VibrationDataset
+
+def random_windows(df: pd.DataFrame, n: int = 50, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t0, t1 = df['Timestamp'].min(), df['Timestamp'].max()
+    span = (t1 - t0).total_seconds()
+    for a, b in rng.uniform(-0.05, 1.05, (n, 2)) * span:
+        yield t0 + pd.Timedelta(seconds=min(a, b)), t0 + pd.Timedelta(seconds=max(a, b))
+
+def test_slice_matches_mask(frame):
+    ds = VibrationDataset(frame.copy())
+    for start, end in random_windows(frame):
+        want = frame[(frame['Timestamp'] >= start) & (frame['Timestamp'] <= end)]
+        pd.testing.assert_frame_equal(ds.slice(start, end), want)
+    # uçlar dahil; tek uçlu aralıklar
+    t = frame['Timestamp'].iloc[100]
+    assert ds.bounds(t, t) == (100, 101)
+    assert ds.bounds(None, t) == (0, 101)
+    assert ds.bounds(t) == (100, len(frame))
+    assert ds.bounds(frame['Timestamp'].iloc[-1] + pd.Timedelta("1D")) == (len(frame), len(frame))
+
+def test_bounds_skip_nat_rows(frame):
+    nat = frame.iloc[:1].assign(Timestamp=pd.NaT)
+    ds  = VibrationDataset(pd.concat([frame, nat], ignore_index=True))
+    assert ds.end == frame['Timestamp'].iloc[-1]
+    assert ds.bounds() == (0, len(frame))
+
+def test_day_bounds_match_mask(frame):
+    ds = VibrationDataset(frame.copy())
+    days = frame['day'].unique()
+    for d0, d1 in [(days[0], days[0]), (days[3], days[10]), (days[0] - 5, days[-1] + 5)]:
+        i, j = ds.day_bounds(int(d0), int(d1))
+        assert frame.index[(frame['day'] >= d0) & (frame['day'] <= d1)].tolist() == list(range(i, j))
+
+def assert_same_summaries(ds: VibrationDataset, full: VibrationDataset) -> None:
+    pd.testing.assert_frame_equal(ds.df, full.df)
+    pd.testing.assert_frame_equal(ds.daily, full.daily)
+    pd.testing.assert_frame_equal(ds.segments.reset_index(drop=True), full.segments, check_dtype=False)
+    np.testing.assert_array_equal(ds.stats.values, full.stats.values)
+    np.testing.assert_array_equal(ds.stats.levels, full.stats.levels)
+    pd.testing.assert_frame_equal(ds.cube.cells, full.cube.cells)
+    pd.testing.assert_frame_equal(ds.cube.totals, full.cube.totals)
+    assert ds.n_rows == len(ds.df) and ds.end == full.end
+
+@pytest.mark.parametrize("cut", [0.2, 0.5, 0.99])
+def test_append_in_order(frame, cut):
+    n_old = int(len(frame) * cut)
+    ds = VibrationDataset(frame.iloc[:n_old].copy())
+    ds.append(frame.iloc[n_old:])
+    assert ds.version == 1
+    assert_same_summaries(ds, VibrationDataset(frame.copy()))
+
+def test_append_raw_rows_in_chunks(frame):
+    raw = frame[['Timestamp', 'Value', 'Situation']]
+    ds  = VibrationDataset(frame.iloc[:1000].copy())
+    for i in range(1000, len(frame), 700):
+        ds.append(raw.iloc[i:i + 700].copy())
+    assert_same_summaries(ds, VibrationDataset(frame.copy()))
+
+def test_append_out_of_order(frame):
+    rng = np.random.default_rng(2)
+    new = np.sort(rng.choice(len(frame), 300, replace=False))
+    ds  = VibrationDataset(frame.drop(index=new).reset_index(drop=True))
+    ds.append(frame.iloc[new])
+    assert ds.version == 1
+    assert_same_summaries(ds, VibrationDataset(frame.copy()))
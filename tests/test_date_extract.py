@@ -0,0 +1,34 @@
+# Tarih / dönem çıkarıcı: çok kelimeli sayılar ("on iki", "yirmi beş") VERBOSE
+# desende boşluk kaybetmeden eşleşmeli.
+import datetime as dt
+
+import pytest
+
+from date_extract import extract_period, extract_spans, number_value
+
+TODAY = dt.date(2023, 12, 23)
+
+@pytest.mark.parametrize("text, expected", [
+    ("son on iki ay", ("2022-12-24", "2023-12-23")),
+    ("Son on  iki ayda kaç gün kırmızı?", ("2022-12-24", "2023-12-23")),
+    ("son on ay", ("2023-02-24", "2023-12-23")),
+    ("son on bir ayda sarı", ("2023-01-24", "2023-12-23")),
+    ("son on beş günde", ("2023-12-09", "2023-12-23")),
+    ("son yirmi günde kaç gün kırmızı", ("2023-12-04", "2023-12-23")),
+    ("son altmış gün", ("2023-10-25", "2023-12-23")),
+    ("son üç ayda sarı", ("2023-09-24", "2023-12-23")),
+    ("15 Mart 2023 tarihinde", ("2023-03-15", "2023-03-15")),
+])
+def test_extract_period(text, expected):
+    assert extract_period(text, today=TODAY) == expected
+
+def test_son_on_iki_ay_span():
+    spans = extract_spans("son on iki ay", today=TODAY)
+    assert [(s.kind, s.first, s.last) for s in spans] == [("relative", "2022-12-24", "2023-12-23")]
+
+@pytest.mark.parametrize("text, n", [
+    ("7", 7), ("altı", 6), ("on", 10), ("on bir", 11), ("on  iki", 12),
+    ("yirmi", 20), ("otuz beş", 35), ("altmış", 60), ("doksan dokuz", 99),
+])
+def test_number_value(text, n):
+    assert number_value(text) == n
@@ -0,0 +1,127 @@
+# GenerationScheduler: kısa satırın cevabı batch bitmeden dönmeli (satır
+# batch'te hesaplanmaya devam etse de); kuyrukta bekleme ile üretim sırasında
+# token bekleme ayrı zaman aşımlarıyla sınırlanmalı. torch / transformers
+# yerine numpy ile çalışan sahte model ve tokenizer kullanılır.
+import sys
+import threading
+import types
+from collections import deque
+
+import numpy as np
+import pytest
+
+import generation
+from generation import GenerationScheduler, LLM_BUSY_MESSAGE, LLM_TIMEOUT_MESSAGE
+
+PAD, EOS = 0, 1                  # sahte model EOS üretmez
+
+class Inputs(dict):
+    def to(self, device):
+        return self
+
+class FakeTokenizer:
+    eos_token, eos_token_id, pad_token, pad_token_id, padding_side = "<e>", EOS, None, PAD, "right"
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        ids = [[ord(c) for c in p] for p in prompts]
+        width = max(map(len, ids))
+        return Inputs(input_ids=np.array([[PAD] * (width - len(r)) + r for r in ids]),
+                      attention_mask=np.array([[0] * (width - len(r)) + [1] * len(r) for r in ids]))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(i) for i in np.asarray(ids).tolist() if i != PAD)
+
+class FakeModel:
+    """
+    Her adımda "A", "B", … üretir, EOS üretmez (satırlar kendi
+    max_new_tokens'ında biter). pauses: generate çağrısı başına
+    (adım, durdu, devam) — o adıma gelince durdu set edilir, devam beklenir.
+    """
+    device = "cpu"
+    generation_config = types.SimpleNamespace(eos_token_id=None)
+
+    def __init__(self):
+        self.calls  = []            # çağrı başına adım adım batch genişliği
+        self.pauses = deque()
+
+    def pause(self, step: int) -> tuple[threading.Event, threading.Event]:
+        reached, release = threading.Event(), threading.Event()
+        self.pauses.append((step, reached, release))
+        return reached, release
+
+    def generate(self, input_ids, attention_mask, max_new_tokens, pad_token_id, stopping_criteria, **kw):
+        pause = self.pauses.popleft() if self.pauses else None
+        widths = []
+        self.calls.append(widths)
+        ids, unfinished = input_ids, np.ones(len(input_ids), bool)
+        for step in range(max_new_tokens):
+            if pause and step == pause[0]:
+                pause[1].set()
+                pause[2].wait(5)
+            widths.append(len(ids))
+            nxt = np.where(unfinished, 65 + step % 26, pad_token_id)
+            ids = np.concatenate([ids, nxt[:, None]], axis=1)
+            for criteria in stopping_criteria:
+                unfinished &= ~criteria(ids, None)
+            if not unfinished.any():
+                break
+        return ids
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(tensor=lambda x, device=None: np.array(x, bool)))
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(StoppingCriteriaList=list))
+    model = FakeModel()
+    return GenerationScheduler(model, FakeTokenizer(), max_wait_ms=0, max_batch=4), model
+
+def hold_worker(s: GenerationScheduler, model: FakeModel):
+    """Worker'ı tek satırlık bir istekte bekletir; devam event'ini döner."""
+    reached, release = model.pause(0)
+    s.submit("w", 1)
+    assert reached.wait(5)
+    return release
+
+def test_short_row_resolves_before_batch_ends(scheduler):
+    s, model = scheduler
+    release = hold_worker(s, model)
+    reached, resume = model.pause(4)
+    short, long = s.submit("ab", 2), s.submit("cd", 6)     # aynı batch'e girer
+    release.set()
+    assert reached.wait(5)                                 # generate 4. adımda duruyor
+    assert short.future.result(timeout=5) == "AB"
+    assert not long.future.done()
+    resume.set()
+    assert long.future.result(timeout=5) == "ABCDEF"
+    # bitmiş satır batch'ten çıkmaz: her adım iki satırla hesaplanır
+    assert model.calls[1] == [2] * 6
+    stats = s.stats()
+    assert stats["batch_sizes"] == {1: 1, 2: 1} and stats["early_exits"] == 1
+
+def test_queue_wait_is_not_limited_by_token_timeout(scheduler, monkeypatch):
+    s, model = scheduler
+    monkeypatch.setattr(generation, "LLM_QUEUE_TIMEOUT_S", 5)
+    monkeypatch.setattr(generation, "STREAM_TIMEOUT_S", 0.1)
+    release = hold_worker(s, model)
+    threading.Timer(0.4, release.set).start()             # kuyrukta token zaman aşımından uzun bekler
+    assert list(s.stream("xyz", 3)) == ["A", "AB", "ABC"]
+    assert s.stats()["timeouts"] == 0
+
+def test_queue_timeout_cancels_request(scheduler, monkeypatch):
+    s, model = scheduler
+    monkeypatch.setattr(generation, "LLM_QUEUE_TIMEOUT_S", 0.1)
+    release = hold_worker(s, model)
+    assert list(s.stream("xyz", 3)) == [LLM_BUSY_MESSAGE]
+    release.set()
+    assert s.generate("ok", 2) == "AB"
+    assert len(model.calls) == 2                          # iptal edilen istek çalıştırılmadı
+    assert s.stats()["timeouts"] == 1
+
+def test_token_timeout_keeps_partial_text(scheduler, monkeypatch):
+    s, model = scheduler
+    monkeypatch.setattr(generation, "STREAM_TIMEOUT_S", 0.1)
+    reached, release = model.pause(2)
+    try:
+        assert list(s.stream("xyz", 5)) == ["A", "AB", f"AB\n\n{LLM_TIMEOUT_MESSAGE}"]
+        assert reached.is_set() and s.stats()["timeouts"] == 1
+    finally:
+        release.set()
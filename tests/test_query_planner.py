@@ -0,0 +1,155 @@
+# Sorgu planlayıcı: soru doğru Plan'a çevrilmeli ve her metrik / gruplama
+# ham satırlar üzerinden pandas ile hesaplanan sonucu vermeli. Çözülemeyen
+# göreli dönem ("son birkaç günde") tüm veri için cevaplanmamalı.
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import GREEN, YELLOW, ORANGE, RED, LEVEL_NAMES, day_ordinal
+from query_planner import Plan, QueryPlanner
+
+planner = QueryPlanner()
+JAN = ("2023-01-01", "2023-01-31")
+FEB = ("2023-02-01", "2023-02-28")
+
+def window(first, last) -> tuple[int, int]:
+    return day_ordinal(first), day_ordinal(last)
+
+def rows_in(df: pd.DataFrame, period) -> pd.DataFrame:
+    if period is None:
+        return df
+    return df[(df['day'] >= day_ordinal(period[0])) & (df['day'] <= day_ordinal(period[1]))]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1️⃣ Ayrıştırma (veri 2022-11-20 … 2023-03-25)
+@pytest.mark.parametrize("question, expected", [
+    ("Ocak 2023'te kaç dakika kırmızı",        Plan(RED, window(*JAN), "minutes")),
+    ("geçen ay kaç saat sarıydı",              Plan(YELLOW, window(*FEB), "hours")),
+    ("son yirmi günde kaç gün kırmızı",        Plan(RED, window("2023-03-06", "2023-03-25"), "days")),
+    ("son on beş günde ortalama titreşim",     Plan(None, window("2023-03-11", "2023-03-25"), "mean")),
+    ("2023'ün ilk on beş gününde kaç gün kırmızı", Plan(RED, window("2023-01-01", "2023-01-15"), "days")),
+    ("kaç ay kırmızı görüldü",                 Plan(RED, None, "months")),
+    ("maksimum titreşim değeri nedir",         Plan(None, None, "max", None, "max")),
+    ("Ocak 2023'te en çok kırmızı hangi gün",  Plan(RED, window(*JAN), "minutes", "day", "max")),
+    ("en çok sarı görülen günler hangileri",   Plan(YELLOW, None, "minutes", "day", "max", 3)),
+    ("hangi günlerde kırmızı görüldü",         Plan(RED, None, "minutes", "day", "present")),
+    ("en son hangi gün kırmızı",               Plan(RED, None, "minutes", "day", "last")),
+    ("hangi yıl ortalama titreşim en yüksek",  Plan(None, None, "mean", "year", "max")),
+])
+def test_plan(year_frame, question, expected):
+    assert planner.plan(question, year_frame) == expected
+
+@pytest.mark.parametrize("question", [
+    "son birkaç günde kaç gün kırmızı",         # göreli dönem çözülemedi
+    "son yüz günde kaç gün kırmızı",
+    "son birkaç ayda kaç saat sarı",
+    "kaç gün kırmızı ve sarı",                  # birden fazla renk
+    "neden kırmızı",                            # desteklenmeyen ifade
+    "kaç dakika",                               # renk yok
+])
+def test_unplanned_questions_fall_through(year_frame, question):
+    assert planner.plan(question, year_frame) is None
+    assert planner.answer(question, year_frame) is None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2️⃣ Tekil metrikler
+def scalar(df: pd.DataFrame, level, metric: str) -> str:
+    lv = df['level']
+    if metric == "minutes":
+        return f"{int((lv == level).sum())} dakika"
+    if metric == "hours":
+        n = int((lv == level).sum())
+        return f"{n / 60:.2f} saat ({n} dakika)"
+    if metric == "days":
+        return f"{df.loc[lv == level, 'day'].nunique()} farklı günde"
+    if metric == "months":
+        return f"{df.loc[lv == level, 'Timestamp'].dt.to_period('M').nunique()} ay boyunca"
+    if metric == "episodes":
+        return f"{int(((lv == level) & (lv.shift() != level)).sum())} kez"
+    if metric == "share":
+        return f"%{100 * (lv == level).mean():.1f}'i"
+    v = df['Value'] if level is None else df.loc[lv == level, 'Value']
+    if metric == "spread":
+        return f"{v.max() - v.min():.2f} mm/s"
+    return f"{getattr(v, metric)():.2f} mm/s"
+
+@pytest.mark.parametrize("question, level, period, metric", [
+    ("Ocak 2023'te kaç dakika kırmızı",                 RED,    JAN,  "minutes"),
+    ("Ocak 2023'te kaç saat sarıydı",                   YELLOW, JAN,  "hours"),
+    ("Aralık 2022'de kaç gün turuncu",                  ORANGE, ("2022-12-01", "2022-12-31"), "days"),
+    ("kaç ay kırmızı görüldü",                          RED,    None, "months"),
+    ("Şubat 2023'te kaç kez kırmızıya geçti",           RED,    FEB,  "episodes"),
+    ("Ocak 2023'te kırmızı oranı yüzde kaç",            RED,    JAN,  "share"),
+    ("Ocak 2023'te ortalama titreşim",                  None,   JAN,  "mean"),
+    ("Ocak 2023'te sarı seviyedeki ortalama titreşim",  YELLOW, JAN,  "mean"),
+    ("maksimum titreşim değeri nedir",                  None,   None, "max"),
+    ("yeşil seviyedeki en düşük titreşim değeri",       GREEN,  None, "min"),
+    ("standart sapma nedir",                            None,   None, "std"),
+    ("Şubat 2023'te titreşim dalgalanması",             None,   FEB,  "spread"),
+])
+def test_scalar_metrics_match_pandas(year_frame, question, level, period, metric):
+    assert planner.plan(question, year_frame).metric == metric
+    answer = planner.answer(question, year_frame)
+    assert scalar(rows_in(year_frame, period), level, metric) in answer
+    assert answer.startswith("Tüm veride" if period is None else f"{period[0]} – {period[1]} arasında")
+
+def test_levels(year_frame):
+    sub = rows_in(year_frame, JAN)
+    minutes = sub[sub['level'] >= 0]['level'].value_counts()
+    seen = ", ".join(LEVEL_NAMES[l] for l in sorted(minutes.index))
+    assert planner.answer("hangi seviyelerde çalıştı", year_frame).endswith(f"seviyeleri: {seen}.")
+    top = minutes.idxmax()
+    assert (f"en uzun süre {LEVEL_NAMES[top]} seviyesinde kalmıştır ({minutes[top]} dakika)"
+            in planner.answer("Ocak 2023'te en uzun hangi seviyede kaldı", year_frame))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3️⃣ Gruplamalar
+def keys(df: pd.DataFrame, group: str) -> pd.Series:
+    ts = df['Timestamp']
+    return {"day": ts.dt.strftime("%Y-%m-%d"), "month": ts.dt.strftime("%Y-%m"),
+            "year": ts.dt.year.astype(str)}[group]
+
+@pytest.mark.parametrize("question, level, period, group, order", [
+    ("Ocak 2023'te en çok kırmızı hangi gün", RED,    JAN,  "day",   "max"),
+    ("hangi ayda en az yeşil",                GREEN,  None, "month", "min"),
+    ("en son hangi gün kırmızı",              RED,    None, "day",   "last"),
+    ("ilk kez hangi ay sarı",                 YELLOW, None, "month", "first"),
+    ("hangi yılda en çok turuncu",            ORANGE, None, "year",  "max"),
+])
+def test_color_groups_match_pandas(year_frame, question, level, period, group, order):
+    sub   = rows_in(year_frame, period)
+    mins  = (sub['level'] == level).groupby(keys(sub, group)).sum()
+    seen  = mins[mins > 0]
+    want  = {"max": seen.idxmax(), "min": mins.idxmin(), "last": seen.index[-1], "first": seen.index[0]}[order]
+    assert planner.plan(question, year_frame)[3:5] == (group, order)
+    assert f": {want}" in planner.answer(question, year_frame)
+
+@pytest.mark.parametrize("question, group", [
+    ("hangi günlerde kırmızı görüldü", "day"),
+    ("hangi aylarda turuncu görüldü",  "month"),
+])
+def test_present_groups_match_pandas(year_frame, question, group):
+    level = RED if "kırmızı" in question else ORANGE
+    want  = sorted(keys(year_frame, group)[year_frame['level'] == level].unique())
+    assert planner.answer(question, year_frame).endswith(": " + ", ".join(want) + ".")
+
+def test_absent_days_match_pandas(year_frame):
+    sub  = rows_in(year_frame, JAN)
+    has  = (sub['level'] == ORANGE).groupby(keys(sub, "day")).any()
+    want = ", ".join(has.index[~has])
+    assert planner.answer("Ocak 2023'te hangi günlerde hiç turuncu görülmedi", year_frame).endswith(f": {want}.")
+
+@pytest.mark.parametrize("question, metric, group", [
+    ("en yüksek değer hangi ayda",              "max",  "month"),
+    ("en düşük değer hangi gün",                "min",  "day"),
+    ("hangi yıl ortalama titreşim en yüksek",   "mean", "year"),
+    ("hangi ay ortalama titreşim en düşük",     "mean", "month"),
+    ("hangi günlerde standart sapma en yüksek", "std",  "day"),
+])
+def test_value_groups_match_pandas(year_frame, question, metric, group):
+    p = planner.plan(question, year_frame)
+    assert (p.metric, p.group) == (metric, group)
+    s = getattr(year_frame['Value'].groupby(keys(year_frame, group)), metric)().dropna()
+    best = s.nlargest(p.top) if p.order == "max" else s.nsmallest(p.top)
+    want = ", ".join(f"{k} ({v:.2f} mm/s)" for k, v in best.items())
+    assert planner.answer(question, year_frame).endswith(f": {want}.")
@@ -0,0 +1,31 @@
+# Zaman filtreli bağlam araması: sorulan gün / dönem verinin dışındaysa başka
+# günlerin metni LLM'e verilmemeli.
+import faiss
+import numpy as np
+import pandas as pd
+
+from data_store import day_ordinal
+from retrieval_corpus import NO_PERIOD_DATA, RetrievalCorpus
+
+def make_corpus() -> RetrievalCorpus:
+    days  = pd.date_range("2023-03-01", periods=4, freq="D")
+    items = pd.DataFrame({"text": [f"{d.date()}: özet" for d in days],
+                          "first": [day_ordinal(d) for d in days],
+                          "last": [day_ordinal(d) for d in days]})
+    embs  = np.eye(len(items), 8, dtype="float32")
+    index = faiss.IndexFlatIP(embs.shape[1])
+    index.add(embs)
+    return RetrievalCorpus(index, embs, items)
+
+def test_date_outside_data_gives_no_context():
+    corpus = make_corpus()
+    q = np.eye(1, 8, dtype="float32")
+    scores, ids = corpus.search(q, 3, pd.Timestamp("2023-06-15"), pd.Timestamp("2023-06-20"))
+    assert len(scores) == len(ids) == 0
+    assert corpus.context(q, 3, pd.Timestamp("2023-06-15")) == NO_PERIOD_DATA
+
+def test_date_inside_data_stays_in_period():
+    corpus = make_corpus()
+    q = np.eye(1, 8, dtype="float32")
+    assert corpus.context(q, 3, pd.Timestamp("2023-03-03")) == "2023-03-03: özet"
+    assert len(corpus.search(q, 3)[1]) == 3           # tarih yoksa genel arama
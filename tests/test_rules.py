@@ -0,0 +1,20 @@
+# Kural tabanlı ön yönlendirmeler: büyük harfli Türkçe girdi (İ / I) küçük
+# harfli yazımla aynı cevabı vermeli, istisna fırlatmamalı.
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from lexical_router import casefold_tr
+from rag_utils import df, rules
+
+@pytest.mark.parametrize("question", [
+    "Son İki ayda kırmızı kaç gün",
+    "SON ÜÇ AYDA KIRMIZI",
+    "KAÇ AY BOYUNCA KIRMIZI DURUM GÖSTERDİ",
+    "HANGİ AYLARDA TURUNCU GÖRÜLDÜ",
+    "NİSAN 2023 KAÇ DAKİKA TURUNCU",
+])
+def test_uppercase_turkish(question):
+    upper = rules.dispatch(question, df)
+    assert upper is not None
+    assert upper == rules.dispatch(casefold_tr(question), df)
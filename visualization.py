@@ -3,6 +3,8 @@ import gradio as gr
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.ensemble import IsolationForest
+from data_store import load_vibration_df
+from dataset import VibrationDataset
 
 # --- Sabit metin ve veriler ---
 EQUIP_TEXT = (
@@ -33,16 +35,18 @@ incidents_df = pd.DataFrame({
 }).set_index('Date')
 
 # --- Fonksiyonlar ---
+_dataset = None
+
 def load_and_process_data():
-    df = pd.read_csv("vibration_df.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-        df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
-    df.dropna(subset=['Timestamp'], inplace=True)
-    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    df.dropna(subset=['Value'], inplace=True)
-    df.sort_values('Timestamp', inplace=True)
-    return df
+    # Veri bir kez yüklenir (yerel snapshot) ve zamana göre sıralı tutulur;
+    # her grafik isteği sadece searchsorted ile aralığı keser.
+    global _dataset
+    if _dataset is None:
+        df = load_vibration_df("vibration_df.csv")
+        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+        df = df.dropna(subset=['Timestamp', 'Value']).reset_index(drop=True)
+        _dataset = VibrationDataset(df)
+    return _dataset
 
 def get_color(v):
     if v < 2.8: return 'green'
@@ -51,10 +55,10 @@ def get_color(v):
     return 'red'
 
 def plot_graphs(start_date, end_date):
-    df = load_and_process_data()
+    data = load_and_process_data()
     start = pd.to_datetime(start_date)
     end = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-    filtered = df[(df['Timestamp'] >= start) & (df['Timestamp'] <= end)].copy()
+    filtered = data.slice(start, end).copy()
     if filtered.empty:
         return "Seçilen tarih aralığında veri bulunamadı.", None
 
@@ -2,6 +2,8 @@ import gradio as gr
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.ensemble import IsolationForest
+from data_store import load_vibration_df
+from dataset import VibrationDataset
 import multiprocessing as mp
 
 # Sabit açıklama metni
@@ -35,16 +37,18 @@ incidents_df = pd.DataFrame({
 }).set_index('Date')
 
 # Veri yükleme
+_dataset = None
+
 def load_and_process_data():
-    df = pd.read_csv("vibration_df.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    if pd.api.types.is_datetime64tz_dtype(df['Timestamp'].dtype):
-        df['Timestamp'] = df['Timestamp'].dt.tz_convert(None)
-    df.dropna(subset=['Timestamp'], inplace=True)
-    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    df.dropna(subset=['Value'], inplace=True)
-    df.sort_values('Timestamp', inplace=True)
-    return df
+    # Veri bir kez yüklenir (yerel snapshot) ve zamana göre sıralı tutulur;
+    # her grafik isteği sadece searchsorted ile aralığı keser.
+    global _dataset
+    if _dataset is None:
+        df = load_vibration_df("vibration_df.csv")
+        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+        df = df.dropna(subset=['Timestamp', 'Value']).reset_index(drop=True)
+        _dataset = VibrationDataset(df)
+    return _dataset
 
 # Renk
 def get_color(v):
@@ -57,10 +61,10 @@ def get_color(v):
 
 def plot_graphs(start_date, end_date):
     with mp.Pool(1):  # multiprocessing ile paralel hazırlık yapılabilir (örn. büyük veri)
-        df = load_and_process_data()
+        data = load_and_process_data()
     start = pd.to_datetime(start_date)
     end = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-    filtered = df[(df['Timestamp'] >= start) & (df['Timestamp'] <= end)].copy()
+    filtered = data.slice(start, end).copy()
     if filtered.empty:
         return "Seçilen tarih aralığında veri bulunamadı.", None
 